@@ -0,0 +1,115 @@
+import json
+import sys
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from rich.console import Console
+from rich.table import Table
+
+# Fields identifying a case of the grid.
+KEYS: tuple[str, ...] = (
+    "engine",
+    "dataset",
+    "feature_types",
+    "n_classes",
+    "n_estimators",
+    "max_depth",
+)
+
+# Metrics compared between the two runs, lower is better.
+METRICS: tuple[str, ...] = (
+    "parse_time",
+    "build_time",
+    "peak_memory",
+    "latency.p50",
+    "latency.p95",
+    "latency.p99",
+)
+
+Key = tuple[Any, ...]
+
+
+@dataclass
+class Args:
+    baseline: Path
+    contender: Path
+    threshold: float
+
+
+def parse_args() -> Args:
+    parser = ArgumentParser()
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("contender", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative increase reported as a regression.",
+    )
+    args = parser.parse_args()
+    return Args(
+        baseline=args.baseline,
+        contender=args.contender,
+        threshold=args.threshold,
+    )
+
+
+CONSOLE = Console()
+
+
+def main() -> None:
+    args = parse_args()
+    baseline = read(args.baseline)
+    contender = read(args.contender)
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Case", style="dim")
+    table.add_column("Metric")
+    table.add_column("Baseline")
+    table.add_column("Contender")
+    table.add_column("Change")
+
+    n_regressions = 0
+    for key in sorted(baseline.keys() & contender.keys(), key=str):
+        for metric in METRICS:
+            old = get(baseline[key], metric)
+            new = get(contender[key], metric)
+            if old is None or new is None or old <= 0:
+                continue
+            change = new / old - 1
+            regression = change > args.threshold
+            n_regressions += regression
+            style = "red" if regression else "green"
+            table.add_row(
+                ", ".join(map(str, key)),
+                metric,
+                f"{old:.4g}",
+                f"{new:.4g}",
+                f"[{style}]{change:+.1%}[/{style}]",
+            )
+    CONSOLE.print(table)
+    CONSOLE.print(f"{n_regressions} regressions above {args.threshold:.0%}")
+    sys.exit(int(n_regressions > 0))
+
+
+def read(path: Path) -> dict[Key, dict[str, Any]]:
+    report = json.loads(path.read_text(encoding="utf-8"))
+    return {
+        tuple(result[key] for key in KEYS): result
+        for result in report["results"]
+    }
+
+
+def get(result: dict[str, Any], metric: str) -> float | None:
+    value: Any = result
+    for name in metric.split("."):
+        if not isinstance(value, dict) or name not in value:
+            return None
+        value = value[name]
+    return None if value is None else float(value)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from collections.abc import Callable
+from enum import Enum
+
+import pandas as pd
+
+from ocean.abc import Mapper
+from ocean.datasets import Generator, load_adult, load_compas, load_credit
+from ocean.feature import Feature
+
+Dataset = tuple[pd.DataFrame, "pd.Series[int]"]
+Loaded = tuple[Dataset, Mapper[Feature]]
+
+
+class FeatureTypes(Enum):
+    BINARY = "binary"
+    CONTINUOUS = "continuous"
+    DISCRETE = "discrete"
+    ENCODED = "encoded"
+    MIXED = "mixed"
+
+
+# Number of features of each type in the synthetic datasets.
+N_FEATURES: int = 4
+
+LOADERS: dict[str, Callable[[], Loaded]] = {
+    "adult": load_adult,
+    "compas": load_compas,
+    "credit": load_credit,
+}
+
+
+def load(dataset: str) -> Loaded:
+    if dataset not in LOADERS:
+        msg = f"Unknown dataset: {dataset}"
+        raise ValueError(msg)
+    return LOADERS[dataset]()
+
+
+def generate(
+    seed: int,
+    *,
+    n_samples: int,
+    n_classes: int,
+    feature_types: FeatureTypes,
+) -> Loaded:
+    counts = {
+        t: N_FEATURES if feature_types in {t, FeatureTypes.MIXED} else 0
+        for t in FeatureTypes
+        if t != FeatureTypes.MIXED
+    }
+    generator = Generator(
+        n_continuous=counts[FeatureTypes.CONTINUOUS],
+        n_discrete=counts[FeatureTypes.DISCRETE],
+        n_binary=counts[FeatureTypes.BINARY],
+        n_encoded=counts[FeatureTypes.ENCODED],
+    )
+    return generator.generate(n_samples, n_classes=n_classes, seed=seed)
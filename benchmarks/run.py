@@ -0,0 +1,407 @@
+import contextlib
+import itertools
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+import gurobipy as gp
+import numpy as np
+import pandas as pd
+from rich.console import Console
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from ocean import ConstraintProgrammingExplainer, MixedIntegerProgramExplainer
+from ocean import cp as ocp
+from ocean import mip as omip
+from ocean.abc import Mapper
+from ocean.feature import Feature
+from ocean.tree import Tree, parse_trees
+from ocean.typing import Array1D
+
+from .datasets import FeatureTypes, Loaded, generate, load
+
+ENGINES: tuple[str, ...] = ("mip", "cp")
+PERCENTILES: tuple[int, ...] = (50, 95, 99)
+PACKAGES: tuple[str, ...] = (
+    "oceanpy",
+    "numpy",
+    "pandas",
+    "scikit-learn",
+    "gurobipy",
+    "ortools",
+)
+
+
+@dataclass
+class Args:
+    seed: int
+    n_samples: int
+    n_queries: int
+    max_time: int
+    n_estimators: list[int]
+    max_depth: list[int]
+    feature_types: list[str]
+    n_classes: list[int]
+    engines: list[str]
+    datasets: list[str]
+    output: Path
+
+
+@dataclass
+class Case:
+    engine: str
+    dataset: str
+    feature_types: str | None
+    n_classes: int
+    n_estimators: int
+    max_depth: int
+
+
+@dataclass
+class Stats:
+    parse_time: float
+    build_time: float | None
+    peak_memory: float | None
+    latency: dict[str, float]
+    statuses: dict[str, int]
+    error: str | None = None
+
+
+def parse_args() -> Args:
+    parser = ArgumentParser()
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--n-samples",
+        type=int,
+        default=500,
+        dest="n_samples",
+    )
+    parser.add_argument(
+        "--n-queries",
+        type=int,
+        default=20,
+        dest="n_queries",
+    )
+    parser.add_argument("--max-time", type=int, default=60, dest="max_time")
+    parser.add_argument(
+        "--n-estimators",
+        type=int,
+        nargs="+",
+        default=[10, 50],
+        dest="n_estimators",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        nargs="+",
+        default=[3, 5],
+        dest="max_depth",
+    )
+    parser.add_argument(
+        "--feature-types",
+        type=str,
+        nargs="+",
+        choices=[t.value for t in FeatureTypes],
+        default=[t.value for t in FeatureTypes],
+        dest="feature_types",
+    )
+    parser.add_argument(
+        "--n-classes",
+        type=int,
+        nargs="+",
+        default=[2, 3],
+        dest="n_classes",
+    )
+    parser.add_argument(
+        "--engines",
+        type=str,
+        nargs="+",
+        choices=ENGINES,
+        default=list(ENGINES),
+    )
+    parser.add_argument(
+        "--datasets",
+        type=str,
+        nargs="*",
+        choices=["adult", "compas", "credit"],
+        default=[],
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("benchmarks/results/latest.json"),
+    )
+    args = parser.parse_args()
+    return Args(
+        seed=args.seed,
+        n_samples=args.n_samples,
+        n_queries=args.n_queries,
+        max_time=args.max_time,
+        n_estimators=args.n_estimators,
+        max_depth=args.max_depth,
+        feature_types=args.feature_types,
+        n_classes=args.n_classes,
+        engines=args.engines,
+        datasets=args.datasets,
+        output=args.output,
+    )
+
+
+CONSOLE = Console()
+
+
+def main() -> None:
+    args = parse_args()
+    results: list[dict[str, Any]] = []
+    for case, loaded in cases(args):
+        stats = run(case, loaded, args=args)
+        results.append({**asdict(case), **asdict(stats)})
+        CONSOLE.print(summary(case, stats))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    report = {"metadata": metadata(args), "results": results}
+    args.output.write_text(
+        json.dumps(report, indent=2) + "\n",
+        encoding="utf-8",
+    )
+    CONSOLE.print(f"Results written to {args.output}")
+
+
+def cases(args: Args) -> list[tuple[Case, Loaded]]:
+    datasets: list[tuple[str, str | None, int, Loaded]] = []
+    for feature_types, n_classes in itertools.product(
+        args.feature_types,
+        args.n_classes,
+    ):
+        loaded = generate(
+            args.seed,
+            n_samples=args.n_samples,
+            n_classes=n_classes,
+            feature_types=FeatureTypes(feature_types),
+        )
+        datasets.append(("synthetic", feature_types, n_classes, loaded))
+    for dataset in args.datasets:
+        loaded = load(dataset)
+        (_, target), _ = loaded
+        datasets.append((dataset, None, int(target.nunique()), loaded))
+
+    return [
+        (
+            Case(
+                engine=engine,
+                dataset=dataset,
+                feature_types=feature_types,
+                n_classes=n_classes,
+                n_estimators=n_estimators,
+                max_depth=max_depth,
+            ),
+            loaded,
+        )
+        for (dataset, feature_types, n_classes, loaded) in datasets
+        for n_estimators, max_depth, engine in itertools.product(
+            args.n_estimators,
+            args.max_depth,
+            args.engines,
+        )
+    ]
+
+
+def run(case: Case, loaded: Loaded, *, args: Args) -> Stats:
+    rf, queries = fit(case, loaded, args=args)
+    mapper = loaded[1]
+
+    start = time.perf_counter()
+    trees = tuple(parse_trees(rf, mapper=mapper))
+    parse_time = time.perf_counter() - start
+
+    try:
+        # The model is built in a fresh process, so that its peak
+        # memory does not include the one of the previous runs.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            future = pool.submit(build, case.engine, trees, mapper=mapper)
+            build_time, peak = future.result()
+        times, statuses = explain(
+            case.engine,
+            rf,
+            mapper,
+            queries,
+            max_time=args.max_time,
+        )
+    except gp.GurobiError as e:
+        return Stats(
+            parse_time=parse_time,
+            build_time=None,
+            peak_memory=None,
+            latency={},
+            statuses={},
+            error=str(e),
+        )
+
+    latency = {
+        f"p{q}": float(v)
+        for q, v in zip(
+            PERCENTILES,
+            np.percentile(times, PERCENTILES),
+            strict=True,
+        )
+    }
+    latency["mean"] = float(np.mean(times))
+    return Stats(
+        parse_time=parse_time,
+        build_time=build_time,
+        peak_memory=peak,
+        latency=latency,
+        statuses=statuses,
+    )
+
+
+def fit(
+    case: Case,
+    loaded: Loaded,
+    *,
+    args: Args,
+) -> tuple[RandomForestClassifier, list[tuple[Array1D, int]]]:
+    (data, target), _ = loaded
+    X_train, X_test, y_train, _ = train_test_split(
+        data,
+        target,
+        test_size=0.2,
+        random_state=args.seed,
+    )
+    rf = RandomForestClassifier(
+        n_estimators=case.n_estimators,
+        max_depth=case.max_depth,
+        random_state=args.seed,
+    )
+    rf.fit(X_train, y_train)
+    X_test = pd.DataFrame(X_test).iloc[: args.n_queries]
+    y_pred = np.asarray(rf.predict(X_test), dtype=int)
+    queries = [
+        (X_test.iloc[i].to_numpy().flatten(), int(y + 1) % case.n_classes)
+        for i, y in enumerate(y_pred)
+    ]
+    return rf, queries
+
+
+@cache
+def get_env() -> gp.Env:
+    # The Gurobi environment is only started by the processes that
+    # run the MIP explainer.
+    env = gp.Env(empty=True)
+    env.setParam("OutputFlag", 0)
+    env.start()
+    return env
+
+
+def build(
+    engine: str,
+    trees: tuple[Tree, ...],
+    *,
+    mapper: Mapper[Feature],
+) -> tuple[float, float]:
+    # The build is timed on the bare models: the explainers also
+    # parse the ensembles, which is measured on its own. The peak
+    # memory is the growth of the peak resident memory in the build.
+    env = get_env() if engine == "mip" else None
+    reset_max_rss()
+    before = max_rss()
+    start = time.perf_counter()
+    if engine == "mip":
+        mip = omip.Model(trees, mapper=mapper, env=env)
+        mip.build()
+        mip.update()
+    else:
+        ocp.Model(trees, mapper=mapper).build()
+    build_time = time.perf_counter() - start
+    return build_time, max_rss() - before
+
+
+def reset_max_rss() -> None:
+    # On Linux, the peak resident memory is reset to the current one,
+    # so that the peak of the imports is left out of the next measure.
+    # Elsewhere the peak is kept, and its growth is a lower bound.
+    if sys.platform == "linux":
+        with contextlib.suppress(OSError):
+            _ = Path("/proc/self/clear_refs").write_text("5", encoding="utf-8")
+
+
+def max_rss() -> float:
+    # Peak resident memory of the process in MB, which includes the
+    # memory of the solvers: ru_maxrss is in kilobytes on Linux and
+    # in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def explain(
+    engine: str,
+    rf: RandomForestClassifier,
+    mapper: Mapper[Feature],
+    queries: list[tuple[Array1D, int]],
+    *,
+    max_time: int,
+) -> tuple[list[float], dict[str, int]]:
+    explainer = (
+        MixedIntegerProgramExplainer(rf, mapper=mapper, env=get_env())
+        if engine == "mip"
+        else ConstraintProgrammingExplainer(rf, mapper=mapper)
+    )
+    times: list[float] = []
+    statuses: dict[str, int] = {}
+    for x, y in queries:
+        start = time.perf_counter()
+        explainer.explain(x, y=y, norm=1, max_time=max_time)
+        times.append(time.perf_counter() - start)
+        status = explainer.get_solving_status()
+        statuses[status] = statuses.get(status, 0) + 1
+        explainer.cleanup()
+    return times, statuses
+
+
+def metadata(args: Args) -> dict[str, Any]:
+    versions: dict[str, str | None] = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    arguments = asdict(args)
+    arguments["output"] = str(args.output)
+    return {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "versions": versions,
+        "args": arguments,
+    }
+
+
+def summary(case: Case, stats: Stats) -> str:
+    name = ", ".join(f"{k}={v}" for k, v in asdict(case).items())
+    if stats.error is not None:
+        return f"[red]{name}: {stats.error}[/red]"
+    return (
+        f"{name}: parse {stats.parse_time:.3f}s, "
+        f"build {stats.build_time:.3f}s, "
+        f"p50 {stats.latency['p50']:.3f}s, "
+        f"p99 {stats.latency['p99']:.3f}s, "
+        f"peak {stats.peak_memory:.1f}MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import contextlib
+import multiprocessing
+import resource
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import gurobipy as gp
+import pandas as pd
+from rich.console import Console
+from rich.table import Table
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from ocean import MixedIntegerProgramExplainer
+from ocean.abc import Mapper
+from ocean.datasets import load_adult, load_compas, load_credit
+from ocean.feature import Feature
+from ocean.mip import Model
+from ocean.typing import Array1D
+
+Loaded = tuple[tuple[pd.DataFrame, "pd.Series[int]"], Mapper[Feature]]
+
+
+@dataclass
+class Args:
+    seed: int
+    n_estimators: int
+    max_depth: int
+    n_isolators: int
+    max_samples: int
+    n_examples: int
+    dataset: str
+
+
+@dataclass
+class Stats:
+    build_time: float
+    peak_memory: float
+    n_vars: int
+    n_constrs: int
+    n_nonzeros: int
+    times: "pd.Series[float]"
+
+
+def parse_args() -> Args:
+    parser = ArgumentParser()
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--n-estimators",
+        type=int,
+        default=500,
+        dest="n_estimators",
+    )
+    parser.add_argument("--max-depth", type=int, default=5, dest="max_depth")
+    parser.add_argument(
+        "--n-isolators",
+        type=int,
+        default=100,
+        dest="n_isolators",
+    )
+    parser.add_argument(
+        "--max-samples",
+        type=int,
+        default=32,
+        dest="max_samples",
+    )
+    parser.add_argument(
+        "--n-examples",
+        type=int,
+        default=20,
+        dest="n_examples",
+    )
+    parser.add_argument(
+        "--dataset",
+        type=str,
+        choices=["adult", "compas", "credit"],
+        default="compas",
+    )
+    args = parser.parse_args()
+    return Args(
+        seed=args.seed,
+        n_estimators=args.n_estimators,
+        max_depth=args.max_depth,
+        n_isolators=args.n_isolators,
+        max_samples=args.max_samples,
+        n_examples=args.n_examples,
+        dataset=args.dataset,
+    )
+
+
+def load(dataset: str) -> Loaded:
+    if dataset == "credit":
+        return load_credit()
+    if dataset == "adult":
+        return load_adult()
+    if dataset == "compas":
+        return load_compas()
+    msg = f"Unknown dataset: {dataset}"
+    raise ValueError(msg)
+
+
+ENV = gp.Env(empty=True)
+ENV.setParam("OutputFlag", 0)
+ENV.start()
+CONSOLE = Console()
+
+
+def main() -> None:
+    args = parse_args()
+    (data, target), mapper = load(args.dataset)
+    X_train, X_test, y_train, _ = train_test_split(
+        data,
+        target,
+        test_size=0.2,
+        random_state=args.seed,
+    )
+    rf = RandomForestClassifier(
+        n_estimators=args.n_estimators,
+        random_state=args.seed,
+        max_depth=args.max_depth,
+    )
+    rf.fit(X_train, y_train)
+    ilf = IsolationForest(
+        n_estimators=args.n_isolators,
+        max_samples=args.max_samples,
+        random_state=args.seed,
+    )
+    ilf.fit(X_train)
+    X_test = pd.DataFrame(X_test).iloc[: args.n_examples]
+    y_pred = rf.predict(X_test)
+    queries = [
+        (X_test.iloc[i].to_numpy().flatten(), int(1 - y_pred[i]))
+        for i in range(len(X_test))
+    ]
+
+    # Each model is built in a fresh process, so that its peak memory
+    # does not include the one of the other model.
+    context = multiprocessing.get_context("spawn")
+    stats: dict[str, Stats] = {}
+    for isolation_type in Model.IsolationType:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            future = pool.submit(
+                run,
+                rf,
+                ilf,
+                mapper,
+                queries,
+                isolation_type=isolation_type,
+            )
+            stats[isolation_type.value] = future.result()
+    display(stats)
+
+
+def run(
+    rf: RandomForestClassifier,
+    ilf: IsolationForest,
+    mapper: Mapper[Feature],
+    queries: list[tuple[Array1D, int]],
+    *,
+    isolation_type: Model.IsolationType,
+) -> Stats:
+    # The peak memory is the growth of the peak resident memory in
+    # the build.
+    reset_max_rss()
+    before = max_rss()
+    start = time.time()
+    mip = MixedIntegerProgramExplainer(
+        rf,
+        mapper=mapper,
+        isolation=ilf,
+        env=ENV,
+        isolation_type=isolation_type,
+    )
+    mip.update()
+    build_time = time.time() - start
+    peak = max_rss() - before
+    n_vars, n_constrs, n_nonzeros = mip.NumVars, mip.NumConstrs, mip.NumNZs
+
+    times: pd.Series[float] = pd.Series()
+    for i, (x, y) in enumerate(queries):
+        start = time.time()
+        mip.explain(x, y=y, norm=1)
+        mip.cleanup()
+        times[i] = time.time() - start
+
+    return Stats(
+        build_time=build_time,
+        peak_memory=peak,
+        n_vars=n_vars,
+        n_constrs=n_constrs,
+        n_nonzeros=n_nonzeros,
+        times=times,
+    )
+
+
+def reset_max_rss() -> None:
+    # On Linux, the peak resident memory is reset to the current one,
+    # so that the peak of the imports is left out of the next measure.
+    # Elsewhere the peak is kept, and its growth is a lower bound.
+    if sys.platform == "linux":
+        with contextlib.suppress(OSError):
+            _ = Path("/proc/self/clear_refs").write_text("5", encoding="utf-8")
+
+
+def max_rss() -> float:
+    # Peak resident memory of the process in MB, which includes the
+    # memory of the solvers: ru_maxrss is in kilobytes on Linux and
+    # in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def display(stats: dict[str, Stats]) -> None:
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Metric", style="dim", width=30)
+    for name in stats:
+        table.add_column(name)
+
+    def row(metric: str, fmt: str, getter: str) -> None:
+        values = [format(getattr(s, getter), fmt) for s in stats.values()]
+        table.add_row(metric, *values)
+
+    row("Build time (seconds)", ".2f", "build_time")
+    row("Peak memory of the build (MB)", ".1f", "peak_memory")
+    row("Variables at build", "d", "n_vars")
+    row("Constraints at build", "d", "n_constrs")
+    row("Non-zeros at build", "d", "n_nonzeros")
+    table.add_row(
+        "Mean time per query (seconds)",
+        *[f"{s.times.mean():.2f}" for s in stats.values()],
+    )
+    table.add_row(
+        "Maximum time per query (seconds)",
+        *[f"{s.times.max():.2f}" for s in stats.values()],
+    )
+    CONSOLE.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from dataclasses import dataclass
+
+import pandas as pd
+from rich.console import Console
+from rich.table import Table
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from ocean import ConstraintProgrammingExplainer
+from ocean.abc import Mapper
+from ocean.cp import FeatureVar
+from ocean.datasets import load_adult, load_compas, load_credit
+from ocean.feature import Feature
+from ocean.typing import Array1D
+
+Loaded = tuple[tuple[pd.DataFrame, "pd.Series[int]"], Mapper[Feature]]
+
+
+@dataclass
+class Args:
+    seed: int
+    n_estimators: int
+    max_depth: int
+    n_examples: int
+    dataset: str
+
+
+@dataclass
+class Stats:
+    build_time: float
+    peak_memory: float
+    n_vars: int
+    n_constrs: int
+    times: "pd.Series[float]"
+
+
+def parse_args() -> Args:
+    parser = ArgumentParser()
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--n-estimators",
+        type=int,
+        default=100,
+        dest="n_estimators",
+    )
+    parser.add_argument("--max-depth", type=int, default=5, dest="max_depth")
+    parser.add_argument(
+        "--n-examples",
+        type=int,
+        default=20,
+        dest="n_examples",
+    )
+    parser.add_argument(
+        "--dataset",
+        type=str,
+        choices=["adult", "compas", "credit"],
+        default="compas",
+    )
+    args = parser.parse_args()
+    return Args(
+        seed=args.seed,
+        n_estimators=args.n_estimators,
+        max_depth=args.max_depth,
+        n_examples=args.n_examples,
+        dataset=args.dataset,
+    )
+
+
+def load(dataset: str) -> Loaded:
+    if dataset == "credit":
+        return load_credit()
+    if dataset == "adult":
+        return load_adult()
+    if dataset == "compas":
+        return load_compas()
+    msg = f"Unknown dataset: {dataset}"
+    raise ValueError(msg)
+
+
+CONSOLE = Console()
+
+
+def main() -> None:
+    args = parse_args()
+    (data, target), mapper = load(args.dataset)
+    X_train, X_test, y_train, _ = train_test_split(
+        data,
+        target,
+        test_size=0.2,
+        random_state=args.seed,
+    )
+    rf = RandomForestClassifier(
+        n_estimators=args.n_estimators,
+        random_state=args.seed,
+        max_depth=args.max_depth,
+    )
+    rf.fit(X_train, y_train)
+    X_test = pd.DataFrame(X_test).iloc[: args.n_examples]
+    y_pred = rf.predict(X_test)
+    queries = [
+        (X_test.iloc[i].to_numpy().flatten(), int(1 - y_pred[i]))
+        for i in range(len(X_test))
+    ]
+
+    stats = {
+        encoding.value: run(rf, mapper, queries, encoding=encoding)
+        for encoding in FeatureVar.Encoding
+    }
+    display(stats)
+
+
+def run(
+    rf: RandomForestClassifier,
+    mapper: Mapper[Feature],
+    queries: list[tuple[Array1D, int]],
+    *,
+    encoding: FeatureVar.Encoding,
+) -> Stats:
+    tracemalloc.start()
+    start = time.time()
+    cp = ConstraintProgrammingExplainer(rf, mapper=mapper, encoding=encoding)
+    build_time = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    proto = cp.Proto()
+    n_vars, n_constrs = len(proto.variables), len(proto.constraints)
+
+    times: pd.Series[float] = pd.Series()
+    for i, (x, y) in enumerate(queries):
+        start = time.time()
+        cp.explain(x, y=y, norm=1)
+        cp.cleanup()
+        times[i] = time.time() - start
+
+    return Stats(
+        build_time=build_time,
+        peak_memory=peak / 2**20,
+        n_vars=n_vars,
+        n_constrs=n_constrs,
+        times=times,
+    )
+
+
+def display(stats: dict[str, Stats]) -> None:
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Metric", style="dim", width=30)
+    for name in stats:
+        table.add_column(name)
+
+    def row(metric: str, fmt: str, getter: str) -> None:
+        values = [format(getattr(s, getter), fmt) for s in stats.values()]
+        table.add_row(metric, *values)
+
+    row("Build time (seconds)", ".2f", "build_time")
+    row("Peak Python memory (MB)", ".1f", "peak_memory")
+    row("Variables at build", "d", "n_vars")
+    row("Constraints at build", "d", "n_constrs")
+    table.add_row(
+        "Mean time per query (seconds)",
+        *[f"{s.times.mean():.2f}" for s in stats.values()],
+    )
+    table.add_row(
+        "Maximum time per query (seconds)",
+        *[f"{s.times.max():.2f}" for s in stats.values()],
+    )
+    CONSOLE.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,26 @@
 from . import abc, cp, datasets, feature, mip, tree
+from ._async import AsyncExplainer, ExplainerBusyError
+from ._footprint import Footprint
+from ._server import ExplanationServer
+from ._stats import Stats
+from ._tune import Profile, tune
 
 MixedIntegerProgramExplainer = mip.Explainer
 ConstraintProgrammingExplainer = cp.Explainer
 
 __all__ = [
+    "AsyncExplainer",
     "ConstraintProgrammingExplainer",
+    "ExplainerBusyError",
+    "ExplanationServer",
+    "Footprint",
     "MixedIntegerProgramExplainer",
+    "Profile",
+    "Stats",
     "abc",
     "datasets",
     "feature",
     "mip",
     "tree",
+    "tune",
 ]
@@ -0,0 +1,194 @@
+import asyncio
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, overload
+
+from .cp import Explainer as ConstraintProgrammingExplainer
+from .typing import (
+    Array1D,
+    BaseExplainer,
+    BaseExplanation,
+    NonNegativeInt,
+    Norm,
+    PositiveInt,
+)
+
+type Explanations = BaseExplanation | tuple[BaseExplanation, ...] | None
+
+
+class ExplainerBusyError(RuntimeError):
+    pass
+
+
+class AsyncExplainer[E: BaseExplainer]:
+    # Interval in seconds between two interruptions of a cancelled
+    # solve: the interruption is ignored by the solvers if it comes
+    # before the search starts, so it is repeated until it stops.
+    INTERRUPT_INTERVAL: float = 0.01
+
+    # Explainers of the pool and the ones waiting for a query.
+    _explainers: tuple[E, ...]
+    _idle: asyncio.Queue[E]
+
+    # Admission control:
+    # - maximum number of queries waiting for an explainer,
+    #   None for no limit.
+    _max_waiting: NonNegativeInt | None
+    _n_waiting: NonNegativeInt
+
+    # Executor running the solves outside of the event loop.
+    _executor: Executor
+
+    def __init__(
+        self,
+        explainers: Iterable[E],
+        *,
+        max_waiting: NonNegativeInt | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        self._explainers = tuple(explainers)
+        if len(self._explainers) == 0:
+            msg = "At least one explainer is required."
+            raise ValueError(msg)
+        self._check_solvers()
+        self._idle = asyncio.Queue()
+        for explainer in self._explainers:
+            self._idle.put_nowait(explainer)
+        self._max_waiting = max_waiting
+        self._n_waiting = 0
+        self._executor = (
+            ThreadPoolExecutor(max_workers=len(self._explainers))
+            if executor is None
+            else executor
+        )
+
+    @property
+    def explainers(self) -> tuple[E, ...]:
+        return self._explainers
+
+    @property
+    def n_idle(self) -> NonNegativeInt:
+        return self._idle.qsize()
+
+    @property
+    def n_waiting(self) -> NonNegativeInt:
+        return self._n_waiting
+
+    @overload
+    async def explain(
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        k: None = None,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> BaseExplanation | None: ...
+
+    @overload
+    async def explain(
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        k: PositiveInt,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> tuple[BaseExplanation, ...]: ...
+
+    async def explain(
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        k: PositiveInt | None = None,
+        **kwargs: Any,
+    ) -> Explanations:
+        if k is not None:
+            kwargs["k"] = k
+        explainer = await self._acquire()
+        loop = asyncio.get_running_loop()
+        solve = partial(self._solve, explainer, x, y=y, norm=norm, **kwargs)
+        future = loop.run_in_executor(self._executor, solve)
+        future.add_done_callback(partial(self._release, explainer))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            self._interrupt(explainer, future)
+            raise
+
+    def shutdown(self) -> None:
+        for explainer in self._explainers:
+            explainer.interrupt()
+        self._executor.shutdown(wait=True)
+
+    def _check_solvers(self) -> None:
+        # A CP-SAT solver runs one search at a time, and interrupting
+        # it stops them all: each CP explainer of the pool needs its
+        # own solver, instead of the default one of the environment.
+        solvers = [
+            id(explainer.solver)
+            for explainer in self._explainers
+            if isinstance(explainer, ConstraintProgrammingExplainer)
+        ]
+        if len(set(solvers)) < len(solvers):
+            msg = "The constraint programming explainers share a solver:"
+            msg += " pass each one its own solver=cp.CpSolver()."
+            raise ValueError(msg)
+
+    async def _acquire(self) -> E:
+        if self._idle.empty() and (
+            self._max_waiting is not None
+            and self._n_waiting >= self._max_waiting
+        ):
+            msg = "All the explainers are busy: "
+            msg += f"{self._n_waiting} queries are already waiting."
+            raise ExplainerBusyError(msg)
+        self._n_waiting += 1
+        try:
+            return await self._idle.get()
+        finally:
+            self._n_waiting -= 1
+
+    def _release(self, explainer: E, future: "asyncio.Future[Any]") -> None:
+        # The exception of a cancelled query is never awaited,
+        # it is retrieved here to avoid asyncio warnings.
+        if not future.cancelled():
+            _ = future.exception()
+        self._idle.put_nowait(explainer)
+
+    def _interrupt(self, explainer: E, future: "asyncio.Future[Any]") -> None:
+        if future.done():
+            return
+        explainer.interrupt()
+        loop = future.get_loop()
+        _ = loop.call_later(
+            self.INTERRUPT_INTERVAL,
+            self._interrupt,
+            explainer,
+            future,
+        )
+
+    @staticmethod
+    def _solve(
+        explainer: E,
+        x: Array1D,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> Explanations:
+        # The explanations are frozen before the cleanup so that they
+        # remain valid once the explainer is back in the pool.
+        # With k, the explainers return a tuple of explanations.
+        explain: Callable[..., Explanations] = explainer.explain
+        try:
+            explanation = explain(x, **kwargs)
+            if isinstance(explanation, tuple):
+                # pyright narrows the protocol to a tuple of unknowns.
+                return tuple(
+                    e.snapshot()
+                    for e in explanation  # pyright: ignore[reportUnknownArgumentType]
+                )
+            return None if explanation is None else explanation.snapshot()
+        finally:
+            explainer.cleanup()
@@ -0,0 +1,137 @@
+import math
+import warnings
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Protocol
+
+import numpy as np
+
+from .abc import Mapper
+from .feature import Feature
+from .tree import Forest, Tree
+from .typing import (
+    Array1D,
+    BaseExplanation,
+    NonNegativeArray1D,
+    NonNegativeInt,
+    NonNegativeNumber,
+    Norm,
+)
+
+# Absolute tolerance under which two objective values are equal.
+GAP_TOLERANCE: float = 1e-9
+
+
+class Snapshot(BaseExplanation, Protocol):
+    @property
+    def bound(self) -> float | None: ...
+
+    @property
+    def gap(self) -> float | None: ...
+
+
+@dataclass(frozen=True)
+class Incumbent[E: BaseExplanation]:
+    explanation: E
+    objective: float
+    bound: float
+    time: float
+
+
+class ExplainerMixin[E: Snapshot]:
+    # Forests of the estimators and of the isolators, used for the
+    # prechecks.
+    _forest: Forest
+    _isolation: Forest | None = None
+
+    # Precheck of the current query.
+    _precheck: Forest.Precheck = Forest.Precheck.PASSED
+
+    @property
+    def precheck(self) -> Forest.Precheck:
+        return self._precheck
+
+    def _set_forest(
+        self,
+        trees: Sequence[Tree],
+        *,
+        mapper: Mapper[Feature],
+        n_estimators: NonNegativeInt,
+        weights: NonNegativeArray1D,
+    ) -> None:
+        self._forest = Forest(
+            trees[:n_estimators],
+            mapper=mapper,
+            weights=weights,
+        )
+        self._isolation = (
+            Forest(trees[n_estimators:], mapper=mapper, isolation=True)
+            if len(trees) > n_estimators
+            else None
+        )
+
+    def _set_precheck(
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        trivial: bool = True,
+    ) -> None:
+        # The queries whose target cannot be reached by the ensemble,
+        # or that are already classified as the target, are answered
+        # without building the query layer of the model. A query is
+        # only its own counterfactual when it is also plausible.
+        epsilon, tolerance = self._get_precheck_tolerances()
+        precheck = self._forest.precheck(
+            x, y, epsilon=epsilon, tolerance=tolerance
+        )
+        if precheck == Forest.Precheck.TRIVIAL and not (
+            trivial and self._is_plausible(x)
+        ):
+            precheck = Forest.Precheck.PASSED
+        if precheck == Forest.Precheck.UNREACHABLE:
+            msg = f"The class {y} cannot be reached by the ensemble:"
+            msg += " there are no counterfactuals for this query."
+            warnings.warn(msg, category=UserWarning, stacklevel=3)
+        self._precheck = precheck
+
+    def _is_plausible(self, x: Array1D) -> bool:
+        if self._isolation is None:
+            return True
+        min_length, tolerance = self._get_min_length()
+        return self._isolation.length(x) >= min_length + tolerance
+
+    def _get_precheck_tolerances(self) -> tuple[float, float]:
+        # Margin of the target over the classes before it, and
+        # tolerance on the scores of the model.
+        raise NotImplementedError
+
+    def _get_min_length(self) -> tuple[float, float]:
+        # Minimum path length of the plausible counterfactuals, and
+        # tolerance on the path lengths of the model.
+        raise NotImplementedError
+
+    def _get_trivial(self, x: Array1D) -> E:
+        # Explanation whose values are the ones of the query, with a
+        # zero bound and gap.
+        raise NotImplementedError
+
+    @staticmethod
+    def _is_far(
+        x: Array1D,
+        other: Array1D,
+        min_distance: NonNegativeNumber,
+        *,
+        norm: Norm,
+    ) -> bool:
+        distance = float(np.linalg.norm(x - other, ord=norm))
+        return distance > 0.0 and distance >= min_distance
+
+
+def relative_gap(objective: float, bound: float) -> float:
+    # Relative gap with the same definition as Gurobi's MIPGap.
+    if math.isclose(objective, bound, abs_tol=GAP_TOLERANCE):
+        return 0.0
+    if math.isclose(objective, 0.0, abs_tol=GAP_TOLERANCE):
+        return float("inf")
+    return abs(objective - bound) / abs(objective)
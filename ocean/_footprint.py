@@ -0,0 +1,164 @@
+import re
+import sys
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from enum import IntEnum
+
+import numpy as np
+
+from .feature import Feature
+from .tree import Tree
+from .tree._keeper import TreeKeeper
+
+type IntArray = np.ndarray[tuple[int], np.dtype[np.intp]]
+type BoolArray = np.ndarray[tuple[int], np.dtype[np.bool_]]
+
+
+class Group(IntEnum):
+    # The constraints are owned by the group of highest rank among
+    # their variables: the split constraints of a tree belong to
+    # the tree, not to the features they read.
+    FEATURES = 0
+    ESTIMATORS = 1
+    ISOLATORS = 2
+
+
+@dataclass(frozen=True)
+class Cost:
+    # Approximate number of bytes held by the solver
+    # for each variable, constraint and nonzero.
+    var: int
+    constr: int
+    nonzero: int
+
+
+@dataclass
+class Size:
+    n_vars: int = 0
+    n_binaries: int = 0
+    n_constrs: int = 0
+    n_nonzeros: int = 0
+    n_objects: int = 0
+    n_bytes: int = 0
+
+    def __add__(self, other: "Size") -> "Size":
+        values = asdict(self)
+        return Size(**{k: v + getattr(other, k) for k, v in values.items()})
+
+    def charge(self, cost: Cost) -> "Size":
+        # Add the bytes held by the solver for the model entities.
+        n_bytes = (
+            self.n_vars * cost.var
+            + self.n_constrs * cost.constr
+            + self.n_nonzeros * cost.nonzero
+        )
+        return self + Size(n_bytes=n_bytes)
+
+
+@dataclass
+class Footprint:
+    estimators: Size = field(default_factory=Size)
+    isolators: Size = field(default_factory=Size)
+    features: Size = field(default_factory=Size)
+    query: Size = field(default_factory=Size)
+
+    @property
+    def total(self) -> Size:
+        return self.estimators + self.isolators + self.features + self.query
+
+    def charge(self, cost: Cost) -> "Footprint":
+        return Footprint(
+            estimators=self.estimators.charge(cost),
+            isolators=self.isolators.charge(cost),
+            features=self.features.charge(cost),
+            query=self.query.charge(cost),
+        )
+
+    def to_dict(self) -> dict[str, dict[str, int]]:
+        groups = {k: asdict(v) for k, v in vars(self).items()}
+        return {**groups, "total": asdict(self.total)}
+
+
+def sizeof(obj: object) -> int:
+    # Shallow size of the object, of its attributes dictionary, and
+    # of the arrays and containers it holds directly.
+    n_bytes = sys.getsizeof(obj)
+    attributes: dict[str, object] | None = getattr(obj, "__dict__", None)
+    if attributes is None:
+        return n_bytes
+    n_bytes += sys.getsizeof(attributes)
+    for value in attributes.values():
+        size = sys.getsizeof(value)
+        if isinstance(value, np.ndarray):
+            # The data of a view is not counted by getsizeof.
+            n_bytes += size
+            if value.base is not None:
+                n_bytes += value.nbytes
+        elif isinstance(value, list | tuple | dict | set):
+            n_bytes += size
+    return n_bytes
+
+
+def measure_trees(trees: Iterable[Tree | TreeKeeper]) -> Size:
+    # Python side of the trees: one object per node.
+    size = Size()
+    for tree in trees:
+        size.n_objects += len(tree.nodes)
+        size.n_bytes += sum(map(sizeof, tree.nodes))
+    return size
+
+
+def measure_features(features: Iterable[Feature]) -> Size:
+    size = Size()
+    for feature in features:
+        size.n_objects += 1
+        size.n_bytes += sizeof(feature)
+    return size
+
+
+def get_groups(
+    names: Iterable[str],
+    *,
+    n_estimators: int,
+    fmt: str,
+) -> IntArray:
+    # The variables of the trees are named after them, all the
+    # other variables of the build belong to the features.
+    pattern = re.compile(re.escape(fmt).replace(r"\{t\}", r"(\d+)"))
+
+    def group(name: str) -> Group:
+        match = pattern.match(name)
+        if match is None:
+            return Group.FEATURES
+        if int(match.group(1)) < n_estimators:
+            return Group.ESTIMATORS
+        return Group.ISOLATORS
+
+    return np.fromiter(map(group, names), dtype=np.intp)
+
+
+def attribute(
+    groups: IntArray,
+    binaries: BoolArray,
+    indptr: IntArray,
+    indices: IntArray,
+    nonzeros: IntArray,
+) -> dict[Group, Size]:
+    # Sizes of the groups of a model given the group of each
+    # variable and the variables of each constraint, in CSR format.
+    # Each constraint has its own count of nonzeros: the empty
+    # constraints are in no group.
+    ranks = np.full(len(indptr) - 1, -1, dtype=np.intp)
+    starts = indptr[:-1][np.diff(indptr) > 0]
+    if starts.size > 0:
+        reached = np.diff(indptr) > 0
+        ranks[reached] = np.maximum.reduceat(groups[indices], starts)
+    return {
+        group: Size(
+            n_vars=int(np.count_nonzero(groups == group)),
+            n_binaries=int(np.count_nonzero(binaries & (groups == group))),
+            n_constrs=int(np.count_nonzero(ranks == group)),
+            n_nonzeros=int(nonzeros[ranks == group].sum()),
+        )
+        for group in Group
+    }
@@ -0,0 +1,443 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Protocol
+
+import numpy as np
+
+from .typing import (
+    Array1D,
+    BaseExplanation,
+    NonNegativeInt,
+    Norm,
+    PositiveInt,
+)
+
+type Payload = dict[str, Any]
+
+# Norms of the requests, by name.
+NORMS: dict[str, Norm] = {"1": 1, "2": 2, "inf": np.inf}
+
+# Number of latencies kept for the percentiles.
+MAX_LATENCIES: int = 1024
+PERCENTILES: tuple[int, ...] = (50, 95, 99)
+
+# Method, path and version of HTTP.
+REQUEST_LINE_SIZE: int = 3
+HEADERS_END: frozenset[bytes] = frozenset({b"\r\n", b"\n", b""})
+
+
+class Servable(Protocol):
+    def explain(
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        max_time: int,
+    ) -> BaseExplanation | None: ...
+    def interrupt(self) -> None: ...
+    def cleanup(self) -> None: ...
+    def get_solving_status(self) -> str: ...
+    def get_objective_value(self) -> float: ...
+
+
+@dataclass
+class Request:
+    x: Array1D
+    y: NonNegativeInt
+    norm: Norm
+    # Time of arrival and deadline, on the clock of the event loop.
+    arrival: float
+    deadline: float
+    future: "asyncio.Future[tuple[HTTPStatus, Payload]]"
+
+
+@dataclass
+class Metrics:
+    # Counters of the requests since the start of the server.
+    n_requests: NonNegativeInt = 0
+    n_rejected: NonNegativeInt = 0
+    n_expired: NonNegativeInt = 0
+    n_errors: NonNegativeInt = 0
+    n_completed: NonNegativeInt = 0
+    n_claims: NonNegativeInt = 0
+    n_claimed: NonNegativeInt = 0
+
+    # Latencies of the last completed requests, from arrival to
+    # response.
+    latencies: deque[float] = field(
+        default_factory=lambda: deque(maxlen=MAX_LATENCIES)
+    )
+    start: float = field(default_factory=time.monotonic)
+
+    def to_dict(self) -> Payload:
+        uptime = time.monotonic() - self.start
+        latencies = np.asarray(self.latencies, dtype=np.float64)
+        percentiles = {
+            f"p{p}": float(np.percentile(latencies, p))
+            for p in PERCENTILES
+            if latencies.size > 0
+        }
+        return {
+            "n_requests": self.n_requests,
+            "n_rejected": self.n_rejected,
+            "n_expired": self.n_expired,
+            "n_errors": self.n_errors,
+            "n_completed": self.n_completed,
+            "n_claims": self.n_claims,
+            "mean_claim_size": self.n_claimed / max(self.n_claims, 1),
+            "latency": percentiles,
+            "throughput": self.n_completed / uptime if uptime > 0 else 0.0,
+            "uptime": uptime,
+        }
+
+
+class ExplanationServer[E: Servable]:
+    # Default size of the queue of the requests waiting for an
+    # explainer: the requests beyond it are rejected at once.
+    DEFAULT_MAX_PENDING: PositiveInt = 64
+
+    # Default claims: an explainer takes up to max_claim queued
+    # requests at once and solves them one after the other, waiting
+    # at most claim_window seconds for more requests to arrive.
+    DEFAULT_MAX_CLAIM: PositiveInt = 8
+    DEFAULT_CLAIM_WINDOW: float = 0.002
+
+    # Default time budget of a request, in seconds.
+    DEFAULT_MAX_TIME: PositiveInt = 60
+
+    # Maximum size of a request body, in bytes.
+    MAX_BODY: PositiveInt = 1 << 20
+
+    _explainers: tuple[E, ...]
+    _host: str
+    _port: int
+
+    # Requests waiting for an explainer.
+    _queue: asyncio.Queue[Request]
+
+    # Parameters of the claims.
+    _max_claim: PositiveInt
+    _claim_window: float
+    _max_time: PositiveInt
+
+    # Executor running the solves outside of the event loop,
+    # one thread per explainer.
+    _executor: Executor
+
+    # Listening server and the loops of the explainers.
+    _server: asyncio.Server | None = None
+    _workers: list["asyncio.Task[None]"]
+    _n_busy: NonNegativeInt = 0
+    _stopping: bool = False
+
+    _metrics: Metrics
+
+    def __init__(
+        self,
+        explainers: Iterable[E],
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        max_pending: PositiveInt = DEFAULT_MAX_PENDING,
+        max_claim: PositiveInt = DEFAULT_MAX_CLAIM,
+        claim_window: float = DEFAULT_CLAIM_WINDOW,
+        max_time: PositiveInt = DEFAULT_MAX_TIME,
+    ) -> None:
+        self._explainers = tuple(explainers)
+        if len(self._explainers) == 0:
+            msg = "At least one explainer is required."
+            raise ValueError(msg)
+        self._host = host
+        self._port = port
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._max_claim = max_claim
+        self._claim_window = claim_window
+        self._max_time = max_time
+        self._executor = ThreadPoolExecutor(max_workers=len(self._explainers))
+        self._workers = []
+        self._metrics = Metrics()
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @property
+    def metrics(self) -> Payload:
+        metrics = self._metrics.to_dict()
+        metrics["n_pending"] = self._queue.qsize()
+        metrics["n_busy"] = self._n_busy
+        return metrics
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(
+            self._handle,
+            host=self._host,
+            port=self._port,
+        )
+        self._port = self._server.sockets[0].getsockname()[1]
+        self._metrics = Metrics()
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._work(explainer))
+            for explainer in self._explainers
+        ]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        if self._server is not None:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        # The running solves are interrupted, and the requests still
+        # waiting are answered as unavailable.
+        self._stopping = True
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in self._workers:
+            _ = task.cancel()
+        for explainer in self._explainers:
+            explainer.interrupt()
+        _ = await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while not self._queue.empty():
+            request = self._queue.get_nowait()
+            self._reply(request, HTTPStatus.SERVICE_UNAVAILABLE, "Stopped.")
+        # The interrupted solves are awaited outside of the event loop.
+        await asyncio.to_thread(self._executor.shutdown, wait=True)
+
+    async def __aenter__(self) -> "ExplanationServer[E]":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.stop()
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        try:
+            method, path, body = await self._read(reader)
+            status, payload = await self._route(method, path, body)
+        except (ValueError, TypeError, KeyError) as e:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except asyncio.IncompleteReadError:
+            writer.close()
+            return
+        content = json.dumps(payload).encode()
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        head += "Content-Type: application/json\r\n"
+        head += f"Content-Length: {len(content)}\r\n"
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            head += "Retry-After: 1\r\n"
+        head += "Connection: close\r\n\r\n"
+        writer.write(head.encode() + content)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _read(
+        self,
+        reader: asyncio.StreamReader,
+    ) -> tuple[str, str, bytes]:
+        line = (await reader.readline()).decode("latin-1")
+        parts = line.split()
+        if len(parts) != REQUEST_LINE_SIZE:
+            msg = f"Malformed request line: {line.strip()!r}"
+            raise ValueError(msg)
+        method, path, _ = parts
+        length = 0
+        while (header := await reader.readline()) not in HEADERS_END:
+            name, _, value = header.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        if length > self.MAX_BODY:
+            msg = f"The body exceeds {self.MAX_BODY} bytes."
+            raise ValueError(msg)
+        body = await reader.readexactly(length) if length > 0 else b""
+        return method, path, body
+
+    async def _route(
+        self,
+        method: str,
+        path: str,
+        body: bytes,
+    ) -> tuple[HTTPStatus, Payload]:
+        match method, path:
+            case "POST", "/explain":
+                return await self._explain(json.loads(body))
+            case "GET", "/metrics":
+                return HTTPStatus.OK, self.metrics
+            case "GET", "/health":
+                return HTTPStatus.OK, {"status": "ok"}
+            case _:
+                msg = f"No route {method} {path}."
+                return HTTPStatus.NOT_FOUND, {"error": msg}
+
+    async def _explain(self, payload: Payload) -> tuple[HTTPStatus, Payload]:
+        # The time budget of the request starts at its arrival: the
+        # time spent in the queue is deducted from the solve.
+        self._metrics.n_requests += 1
+        loop = asyncio.get_running_loop()
+        arrival = loop.time()
+        max_time = float(payload.get("max_time", self._max_time))
+        values: list[float] = payload["x"]
+        x = np.asarray(values, dtype=np.float64)
+        request = Request(
+            x=x,
+            y=int(payload["y"]),
+            norm=NORMS[str(payload.get("norm", 1))],
+            arrival=arrival,
+            deadline=arrival + max_time,
+            future=loop.create_future(),
+        )
+        try:
+            self._queue.put_nowait(request)
+        except asyncio.QueueFull:
+            self._metrics.n_rejected += 1
+            msg = f"All the explainers are busy: {self._queue.qsize()}"
+            msg += " requests are already waiting."
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": msg}
+        status, result = await request.future
+        match status:
+            case HTTPStatus.OK:
+                self._metrics.n_completed += 1
+                self._metrics.latencies.append(loop.time() - arrival)
+            case HTTPStatus.GATEWAY_TIMEOUT:
+                self._metrics.n_expired += 1
+            case HTTPStatus.INTERNAL_SERVER_ERROR:
+                self._metrics.n_errors += 1
+            case _:
+                pass
+        return status, result
+
+    async def _work(self, explainer: E) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            claim = await self._claim()
+            self._metrics.n_claims += 1
+            self._metrics.n_claimed += len(claim)
+            self._n_busy += 1
+            try:
+                await loop.run_in_executor(
+                    self._executor,
+                    self._solve,
+                    explainer,
+                    claim,
+                    loop,
+                )
+            finally:
+                self._n_busy -= 1
+
+    async def _claim(self) -> list[Request]:
+        # The claim starts with the first request and takes the ones
+        # arriving within the window, up to the maximum size. The
+        # requests are only claimed together while all the other
+        # explainers are busy: an idle explainer takes the next
+        # request at once.
+        loop = asyncio.get_running_loop()
+        claim = [await self._queue.get()]
+        end = loop.time() + self._claim_window
+        while len(claim) < self._max_claim and not self._has_idle():
+            if not self._queue.empty():
+                claim.append(self._queue.get_nowait())
+                continue
+            timeout = end - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                request = await asyncio.wait_for(self._queue.get(), timeout)
+            except TimeoutError:
+                break
+            claim.append(request)
+        return claim
+
+    def _has_idle(self) -> bool:
+        # Whether an explainer other than the caller waits for work.
+        return self._n_busy + 1 < len(self._explainers)
+
+    def _solve(
+        self,
+        explainer: E,
+        claim: list[Request],
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        # The requests of the claim are solved one after the other on
+        # the same explainer, with the model it built once. explain
+        # takes whole seconds, so the remaining budget is rounded up.
+        for request in claim:
+            if self._stopping:
+                msg = "The server is stopping."
+                self._reply(request, HTTPStatus.SERVICE_UNAVAILABLE, msg)
+                continue
+            remaining = request.deadline - loop.time()
+            if remaining <= 0:
+                msg = "The time budget expired before the solve."
+                self._reply(request, HTTPStatus.GATEWAY_TIMEOUT, msg)
+                continue
+            start = loop.time()
+            try:
+                explanation = explainer.explain(
+                    request.x,
+                    y=request.y,
+                    norm=request.norm,
+                    max_time=math.ceil(remaining),
+                )
+                result = self._get_result(explainer, explanation)
+            except ValueError as e:
+                self._reply(request, HTTPStatus.BAD_REQUEST, str(e))
+                continue
+            except Exception as e:  # noqa: BLE001
+                self._reply(request, HTTPStatus.INTERNAL_SERVER_ERROR, repr(e))
+                continue
+            finally:
+                explainer.cleanup()
+            result["time"] = loop.time() - start
+            result["queue_time"] = start - request.arrival
+            self._reply(request, HTTPStatus.OK, result)
+
+    @staticmethod
+    def _get_result(
+        explainer: E,
+        explanation: BaseExplanation | None,
+    ) -> Payload:
+        if explanation is None:
+            return {
+                "status": explainer.get_solving_status(),
+                "objective": None,
+                "counterfactual": None,
+            }
+        return {
+            "status": explainer.get_solving_status(),
+            "objective": explainer.get_objective_value(),
+            "counterfactual": explanation.x.tolist(),
+        }
+
+    @staticmethod
+    def _reply(
+        request: Request,
+        status: HTTPStatus,
+        result: Payload | str,
+    ) -> None:
+        # The replies may come from the threads of the executor.
+        payload = {"error": result} if isinstance(result, str) else result
+        loop = request.future.get_loop()
+
+        def reply() -> None:
+            if not request.future.done():
+                request.future.set_result((status, payload))
+
+        _ = loop.call_soon_threadsafe(reply)
@@ -0,0 +1,157 @@
+import json
+import time
+from collections import deque
+from collections.abc import Callable, Generator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+from .typing import NonNegativeInt
+
+type Record = dict[str, Any]
+
+
+class Measurable(Protocol):
+    # Number of variables, constraints and nonzeros of the model.
+    def measure(self) -> tuple[int, int, int]: ...
+
+
+class Instrumented(Protocol):
+    def get_solving_status(self) -> str: ...
+
+    def get_solver_stats(self) -> dict[str, float]: ...
+
+
+@dataclass
+class Stage:
+    time: float = 0.0
+    n_calls: NonNegativeInt = 0
+    n_vars: int = 0
+    n_constrs: int = 0
+    n_nonzeros: int = 0
+
+
+class Stats:
+    # Default number of queries kept in memory.
+    DEFAULT_MAX_QUERIES: int = 1024
+
+    # Whether the stages are recorded: a disabled instance hands out
+    # a no-op context and never measures the models.
+    _enabled: bool
+
+    # Stages recorded outside of a query: parsing and build.
+    _build: dict[str, Stage]
+
+    # Records of the last queries, and the stages of the running one.
+    _queries: deque[Record]
+    _current: dict[str, Stage] | None
+
+    # Called with the record of each query once it is complete.
+    _callback: Callable[[Record], None] | None
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        callback: Callable[[Record], None] | None = None,
+        max_queries: NonNegativeInt | None = DEFAULT_MAX_QUERIES,
+    ) -> None:
+        self._enabled = enabled
+        self._build = {}
+        self._queries = deque(maxlen=max_queries)
+        self._current = None
+        self._callback = callback
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def build(self) -> dict[str, Stage]:
+        return self._build
+
+    @property
+    def queries(self) -> tuple[Record, ...]:
+        return tuple(self._queries)
+
+    @property
+    def last(self) -> Record | None:
+        return self._queries[-1] if self._queries else None
+
+    def enable(self) -> None:
+        self._enabled = True
+
+    def disable(self) -> None:
+        self._enabled = False
+
+    def clear(self) -> None:
+        self._build.clear()
+        self._queries.clear()
+
+    def stage(
+        self,
+        name: str,
+        model: Measurable | None = None,
+    ) -> AbstractContextManager[None]:
+        if not self._enabled:
+            return nullcontext()
+        stages = self._build if self._current is None else self._current
+        return self._stage(stages.setdefault(name, Stage()), model)
+
+    def query(self, explainer: Instrumented) -> AbstractContextManager[None]:
+        if not self._enabled:
+            return nullcontext()
+        return self._query(explainer)
+
+    def to_dict(self) -> Record:
+        return {
+            "build": {k: asdict(v) for k, v in self._build.items()},
+            "queries": list(self._queries),
+        }
+
+    def dump(self, path: str | Path) -> None:
+        # One JSON object per line: the build, then each query.
+        lines = [json.dumps({"build": self.to_dict()["build"]})]
+        lines.extend(json.dumps(record) for record in self._queries)
+        _ = Path(path).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    @staticmethod
+    @contextmanager
+    def _stage(stage: Stage, model: Measurable | None) -> Generator[None]:
+        # The models are measured outside of the timed section.
+        before = (0, 0, 0) if model is None else model.measure()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage.time += time.perf_counter() - start
+            stage.n_calls += 1
+            if model is not None:
+                after = model.measure()
+                stage.n_vars += after[0] - before[0]
+                stage.n_constrs += after[1] - before[1]
+                stage.n_nonzeros += after[2] - before[2]
+
+    @contextmanager
+    def _query(self, explainer: Instrumented) -> Generator[None]:
+        stages: dict[str, Stage] = {}
+        self._current = stages
+        start = time.perf_counter()
+        record: Record = {}
+        try:
+            yield
+        except BaseException as e:
+            record["status"] = "ERROR"
+            record["error"] = repr(e)
+            raise
+        else:
+            record["status"] = explainer.get_solving_status()
+            record["solver"] = explainer.get_solver_stats()
+        finally:
+            self._current = None
+            record["time"] = time.perf_counter() - start
+            record["stages"] = {k: asdict(v) for k, v in stages.items()}
+            self._queries.append(record)
+            if self._callback is not None:
+                self._callback(record)
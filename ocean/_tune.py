@@ -0,0 +1,138 @@
+import json
+import time
+import warnings
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+
+from .typing import (
+    Array1D,
+    BaseExplanation,
+    NonNegativeInt,
+    Norm,
+    Param,
+    PositiveInt,
+)
+
+# Percentile of the latencies taken as the tail latency.
+TAIL_PERCENTILE: int = 95
+
+# Default time limit in seconds of each sample query.
+DEFAULT_MAX_TIME: int = 10
+
+type Query = tuple[Array1D, NonNegativeInt]
+
+
+@dataclass(frozen=True)
+class Profile:
+    # Engine of the explainers the profile applies to, and the
+    # solver parameters set before each of their queries.
+    engine: str
+    params: dict[str, Param] = field(default_factory=dict)
+
+    # Latencies in seconds of the sample queries with the parameters.
+    median: float = 0.0
+    tail: float = 0.0
+    n_queries: NonNegativeInt = 0
+
+    @property
+    def score(self) -> float:
+        return self.median + self.tail
+
+    @staticmethod
+    def path(artifact: str | Path, engine: str) -> Path:
+        # The profile of an engine is saved next to the artifact.
+        artifact = Path(artifact)
+        return artifact.with_name(f"{artifact.name}.{engine}.profile.json")
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Profile":
+        return cls(**json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def dump(self, path: str | Path) -> None:
+        content = json.dumps(asdict(self), indent=2) + "\n"
+        _ = Path(path).write_text(content, encoding="utf-8")
+
+
+class Tunable(Protocol):
+    ENGINE: str
+    PROFILES: tuple[Mapping[str, Param], ...]
+
+    @property
+    def profile(self) -> Profile | None: ...
+
+    @profile.setter
+    def profile(self, profile: Profile | None) -> None: ...
+
+    def explain(
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        max_time: int = ...,
+    ) -> BaseExplanation | None: ...
+
+    def cleanup(self) -> None: ...
+
+
+def tune(
+    explainer: Tunable,
+    sample_queries: Iterable[Query],
+    *,
+    norm: Norm = 1,
+    max_time: PositiveInt = DEFAULT_MAX_TIME,
+    candidates: Sequence[Mapping[str, Param]] | None = None,
+    path: str | Path | None = None,
+) -> Profile:
+    # Each candidate solves all the sample queries, in at most
+    # max_time seconds each. The candidate with the lowest sum of
+    # the median and tail latencies is applied to the explainer:
+    # the default parameters come first and win the ties.
+    queries = list(sample_queries)
+    if len(queries) == 0:
+        msg = "At least one sample query is required."
+        raise ValueError(msg)
+    candidates = explainer.PROFILES if candidates is None else candidates
+    profiles = [
+        _measure(explainer, params, queries, norm=norm, max_time=max_time)
+        for params in candidates
+    ]
+    best = min(profiles, key=lambda profile: profile.score)
+    explainer.profile = best
+    if path is not None:
+        best.dump(path)
+    return best
+
+
+def _measure(
+    explainer: Tunable,
+    params: Mapping[str, Param],
+    queries: Sequence[Query],
+    *,
+    norm: Norm,
+    max_time: PositiveInt,
+) -> Profile:
+    explainer.profile = Profile(engine=explainer.ENGINE, params=dict(params))
+    latencies: list[float] = []
+    # The queries stopped by the time limit warn, and count with
+    # the time limit as their latency.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=UserWarning)
+        for x, y in queries:
+            start = time.perf_counter()
+            try:
+                _ = explainer.explain(x, y=y, norm=norm, max_time=max_time)
+            finally:
+                explainer.cleanup()
+            latencies.append(time.perf_counter() - start)
+    return Profile(
+        engine=explainer.ENGINE,
+        params=dict(params),
+        median=float(np.median(latencies)),
+        tail=float(np.percentile(latencies, TAIL_PERCENTILE)),
+        n_queries=len(queries),
+    )
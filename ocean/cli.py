@@ -0,0 +1,612 @@
+import asyncio
+import importlib
+import json
+import os
+import pickle  # noqa: S403
+import sys
+import time
+from argparse import ArgumentParser
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+)
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from ortools.sat.python import cp_model as cp
+from sklearn.ensemble import IsolationForest
+
+from ._server import NORMS, ExplanationServer
+from ._tune import DEFAULT_MAX_TIME, Profile
+from ._tune import tune as tune_explainer
+from .abc import Mapper
+from .cp import Explainer as ConstraintProgrammingExplainer
+from .feature import Feature
+from .mip import Explainer as MixedIntegerProgramExplainer
+from .typing import (
+    Array1D,
+    BaseExplainableEnsemble,
+    NonNegativeInt,
+    PositiveInt,
+)
+
+ENGINES: tuple[str, ...] = ("mip", "cp")
+PARQUET_SUFFIXES: tuple[str, ...] = (".parquet", ".pq")
+N_BINARY_CLASSES: int = 2
+
+# Number of chunks in flight for each worker: the next chunk is
+# ready when a worker is done, and the memory stays bounded.
+CHUNKS_PER_WORKER: int = 2
+
+# Number of sample queries read from the input to tune a profile.
+DEFAULT_N_QUERIES: int = 20
+
+# Exit status of an interrupted job.
+INTERRUPTED: int = 130
+
+type Record = dict[str, Any]
+type Explainer = MixedIntegerProgramExplainer | ConstraintProgrammingExplainer
+
+
+@dataclass
+class Args:
+    model: Path
+    input: Path
+    output: Path
+    engine: str
+    norm: str
+    target: int | None
+    target_column: str | None
+    chunk_size: int
+    n_workers: int
+    max_time: int
+    checkpoint: Path | None
+    restart: bool
+
+
+@dataclass
+class ServeArgs:
+    model: Path
+    engine: str
+    host: str
+    port: int
+    n_workers: int
+    max_pending: int
+    max_claim: int
+    max_time: int
+
+
+@dataclass
+class TuneArgs:
+    model: Path
+    input: Path
+    engine: str
+    norm: str
+    target: int | None
+    target_column: str | None
+    n_queries: int
+    max_time: int
+
+
+@dataclass
+class Artifact:
+    ensemble: BaseExplainableEnsemble
+    mapper: Mapper[Feature]
+    isolation: IsolationForest | None = None
+
+    # Tuning profiles saved next to the artifact, by engine.
+    profiles: dict[str, Profile] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "Artifact":
+        # The artifact is a pickled dictionary with the keys of the
+        # fields, or a tuple of the fields in order.
+        content: dict[str, Any] | tuple[Any, ...]
+        with path.open("rb") as f:
+            content = pickle.load(f)  # noqa: S301
+        if isinstance(content, dict):
+            artifact = cls(**content)
+        else:
+            artifact = cls(*content)
+        for engine in ENGINES:
+            profile = Profile.path(path, engine)
+            if profile.exists():
+                artifact.profiles[engine] = Profile.load(profile)
+        return artifact
+
+    def build(self, engine: str) -> Explainer:
+        # Each CP explainer has its own solver, so that the explainers
+        # can solve at the same time.
+        explainer: Explainer
+        if engine == "mip":
+            explainer = MixedIntegerProgramExplainer(
+                self.ensemble,
+                mapper=self.mapper,
+                isolation=self.isolation,
+            )
+        else:
+            explainer = ConstraintProgrammingExplainer(
+                self.ensemble,
+                mapper=self.mapper,
+                isolation=self.isolation,
+                solver=cp.CpSolver(),
+            )
+        explainer.profile = self.profiles.get(engine)
+        return explainer
+
+    def build_many(self, engine: str, n: PositiveInt) -> list[Explainer]:
+        # The MIP explainer is built once and cloned, each clone with
+        # its own environment.
+        explainer = self.build(engine)
+        explainers: list[Explainer] = [explainer]
+        for _ in range(n - 1):
+            if isinstance(explainer, MixedIntegerProgramExplainer):
+                explainers.append(explainer.clone())
+            else:
+                explainers.append(self.build(engine))
+        return explainers
+
+
+@dataclass
+class Chunk:
+    # Index of the first row in the input.
+    start: NonNegativeInt
+    x: np.ndarray[tuple[int, int], np.dtype[np.float64]]
+    y: np.ndarray[tuple[int], np.dtype[np.int64]] | None
+
+
+@dataclass
+class Checkpoint:
+    # Number of input rows done, and size of the output once their
+    # records were written: the records after it are discarded.
+    n_rows: NonNegativeInt = 0
+    size: NonNegativeInt = 0
+
+    @classmethod
+    def load(cls, path: Path) -> "Checkpoint | None":
+        if not path.exists():
+            return None
+        return cls(**json.loads(path.read_text(encoding="utf-8")))
+
+    def dump(self, path: Path) -> None:
+        # The checkpoint is replaced atomically.
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        _ = tmp.write_text(json.dumps(asdict(self)), encoding="utf-8")
+        tmp.replace(path)
+
+
+class Worker:
+    # Explainer of the worker, built once and reused for each query.
+    _explainer: Explainer
+    _artifact: Artifact
+    _args: Args
+
+    def __init__(self, args: Args) -> None:
+        self._args = args
+        self._artifact = Artifact.load(args.model)
+        self._explainer = self._artifact.build(args.engine)
+
+    def run(self, chunk: Chunk) -> list[str]:
+        y = get_targets(
+            chunk,
+            artifact=self._artifact,
+            target=self._args.target,
+            n_classes=self._explainer.n_classes,
+        )
+        return [
+            json.dumps(self._explain(chunk.start + i, x, y=int(y[i])))
+            for i, x in enumerate(chunk.x)
+        ]
+
+    def _explain(self, index: int, x: Array1D, *, y: int) -> Record:
+        record: Record = {"index": index, "target": y}
+        start = time.perf_counter()
+        try:
+            explanation = self._explainer.explain(
+                x,
+                y=y,
+                norm=NORMS[self._args.norm],
+                max_time=self._args.max_time,
+            )
+        except Exception as e:  # noqa: BLE001
+            record["status"] = "ERROR"
+            record["error"] = repr(e)
+            explanation = None
+        else:
+            record["status"] = self._explainer.get_solving_status()
+        record["time"] = time.perf_counter() - start
+        if explanation is None:
+            record["objective"] = None
+            record["counterfactual"] = None
+        else:
+            record["objective"] = self._explainer.get_objective_value()
+            record["counterfactual"] = explanation.x.tolist()
+        self._explainer.cleanup()
+        return record
+
+
+class InlineExecutor(Executor):
+    # Runs each task when it is submitted, in the calling process.
+    def submit[T](  # noqa: PLR6301
+        self,
+        fn: Callable[..., T],
+        /,
+        *args: Any,  # noqa: ANN401
+        **kwargs: Any,  # noqa: ANN401
+    ) -> Future[T]:
+        future: Future[T] = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:  # noqa: BLE001
+            future.set_exception(e)
+        return future
+
+
+# Worker of the current process.
+_worker: Worker | None = None
+
+
+def _init_worker(args: Args) -> None:
+    global _worker  # noqa: PLW0603
+    _worker = Worker(args)
+
+
+def _run(chunk: Chunk) -> list[str]:
+    if _worker is None:
+        msg = "The worker is not initialized."
+        raise RuntimeError(msg)
+    return _worker.run(chunk)
+
+
+def get_targets(
+    chunk: Chunk,
+    *,
+    artifact: Artifact,
+    target: int | None,
+    n_classes: int,
+) -> np.ndarray[tuple[int], np.dtype[np.int64]]:
+    # Without a target, the queries of a binary classifier
+    # target the class they are not predicted in.
+    if chunk.y is not None:
+        return chunk.y
+    n = len(chunk.x)
+    if target is not None:
+        return np.full(n, target, dtype=np.int64)
+    if n_classes != N_BINARY_CLASSES:
+        msg = "A target class is required with more than two classes:"
+        msg += " use --target or --target-column."
+        raise ValueError(msg)
+    data = pd.DataFrame(chunk.x, columns=artifact.mapper.columns)
+    predicted: np.ndarray[tuple[int], np.dtype[np.int64]] = np.array(
+        artifact.ensemble.predict(data), dtype=np.int64
+    )
+    return 1 - predicted
+
+
+def read_chunks(
+    path: Path,
+    *,
+    mapper: Mapper[Feature],
+    chunk_size: int,
+    target_column: str | None = None,
+    skip: NonNegativeInt = 0,
+) -> Iterator[Chunk]:
+    # The columns of the input are the columns of the mapper in
+    # order, with the target column anywhere among them.
+    start = 0
+    for frame in _read_frames(path, mapper=mapper, chunk_size=chunk_size):
+        end = start + len(frame)
+        if end > skip:
+            first = max(start, skip)
+            yield _split(
+                frame.iloc[first - start :],
+                mapper,
+                start=first,
+                target_column=target_column,
+            )
+        start = end
+
+
+def _read_frames(
+    path: Path,
+    *,
+    mapper: Mapper[Feature],
+    chunk_size: int,
+) -> Iterator[pd.DataFrame]:
+    if path.suffix in PARQUET_SUFFIXES:
+        try:
+            pq = importlib.import_module("pyarrow.parquet")
+        except ImportError as e:
+            msg = "Reading Parquet files requires pyarrow."
+            raise ImportError(msg) from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+    header = list(range(mapper.n_levels))
+    yield from pd.read_csv(path, header=header, chunksize=chunk_size)
+
+
+def _split(
+    frame: pd.DataFrame,
+    mapper: Mapper[Feature],
+    *,
+    start: NonNegativeInt,
+    target_column: str | None,
+) -> Chunk:
+    y = None
+    if target_column is not None:
+        names = frame.columns.get_level_values(0).astype(str)
+        target = names == target_column
+        if not target.any():
+            msg = f"The target column '{target_column}' is not in the input."
+            raise ValueError(msg)
+        y = frame.loc[:, target].iloc[:, 0].to_numpy(dtype=np.int64)
+        frame = frame.loc[:, ~target]
+    if frame.shape[1] != mapper.n_columns:
+        msg = f"Expected {mapper.n_columns} columns, got {frame.shape[1]}"
+        raise ValueError(msg)
+    x = frame.to_numpy(dtype=np.float64)
+    return Chunk(start=start, x=x, y=y)
+
+
+def explain(args: Args) -> int:
+    checkpoint_path = args.checkpoint or args.output.with_name(
+        f"{args.output.name}.checkpoint"
+    )
+    checkpoint = None if args.restart else Checkpoint.load(checkpoint_path)
+    if checkpoint is None:
+        # Without a checkpoint, an existing output is only
+        # overwritten on restart.
+        exists = args.output.exists() and args.output.stat().st_size > 0
+        if exists and not args.restart:
+            msg = f"The output '{args.output}' already exists and has no"
+            msg += " checkpoint: use --restart to overwrite it."
+            raise FileExistsError(msg)
+        checkpoint = Checkpoint()
+    # Records written after the checkpoint are discarded.
+    with args.output.open("a", encoding="utf-8") as f:
+        _ = f.truncate(checkpoint.size)
+
+    mapper = Artifact.load(args.model).mapper
+    chunks = read_chunks(
+        args.input,
+        mapper=mapper,
+        chunk_size=args.chunk_size,
+        target_column=args.target_column,
+        skip=checkpoint.n_rows,
+    )
+    executor: Executor
+    if args.n_workers == 1:
+        _init_worker(args)
+        executor = InlineExecutor()
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=args.n_workers,
+            initializer=_init_worker,
+            initargs=(args,),
+        )
+
+    try:
+        _stream(
+            chunks,
+            executor=executor,
+            output=args.output,
+            checkpoint=checkpoint,
+            checkpoint_path=checkpoint_path,
+            max_pending=args.n_workers * CHUNKS_PER_WORKER,
+        )
+    except KeyboardInterrupt:
+        msg = f"Interrupted after {checkpoint.n_rows} queries:"
+        msg += " run the same command to resume."
+        print(msg, file=sys.stderr)  # noqa: T201
+        return INTERRUPTED
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    checkpoint_path.unlink(missing_ok=True)
+    print(f"{checkpoint.n_rows} queries written to {args.output}")  # noqa: T201
+    return 0
+
+
+def _stream(
+    chunks: Iterator[Chunk],
+    *,
+    executor: Executor,
+    output: Path,
+    checkpoint: Checkpoint,
+    checkpoint_path: Path,
+    max_pending: int,
+) -> None:
+    # The records are written in the order of the input, and the
+    # checkpoint is saved once the records of a chunk are on disk.
+    pending: deque[tuple[int, Future[list[str]]]] = deque()
+    with output.open("a", encoding="utf-8") as f:
+
+        def write() -> None:
+            n_rows, future = pending.popleft()
+            f.writelines(line + "\n" for line in future.result())
+            f.flush()
+            os.fsync(f.fileno())
+            checkpoint.n_rows += n_rows
+            checkpoint.size = f.tell()
+            checkpoint.dump(checkpoint_path)
+
+        for chunk in chunks:
+            pending.append((len(chunk.x), executor.submit(_run, chunk)))
+            if len(pending) >= max_pending:
+                write()
+        while pending:
+            write()
+
+
+def serve(args: ServeArgs) -> int:
+    artifact = Artifact.load(args.model)
+    server = ExplanationServer(
+        artifact.build_many(args.engine, args.n_workers),
+        host=args.host,
+        port=args.port,
+        max_pending=args.max_pending,
+        max_claim=args.max_claim,
+        max_time=args.max_time,
+    )
+
+    async def run() -> None:
+        async with server:
+            print(f"Serving on http://{args.host}:{server.port}")  # noqa: T201
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        return INTERRUPTED
+    return 0
+
+
+def tune(args: TuneArgs) -> int:
+    # The profile is tuned on the first queries of the input, from
+    # the default parameters, and saved next to the artifact.
+    artifact = Artifact.load(args.model)
+    artifact.profiles.pop(args.engine, None)
+    explainer = artifact.build(args.engine)
+    chunks = read_chunks(
+        args.input,
+        mapper=artifact.mapper,
+        chunk_size=args.n_queries,
+        target_column=args.target_column,
+    )
+    chunk = next(chunks, None)
+    if chunk is None:
+        msg = f"There are no queries in {args.input}."
+        raise ValueError(msg)
+    y = get_targets(
+        chunk,
+        artifact=artifact,
+        target=args.target,
+        n_classes=explainer.n_classes,
+    )
+    path = Profile.path(args.model, args.engine)
+    profile = tune_explainer(
+        explainer,
+        zip(chunk.x, map(int, y), strict=True),
+        norm=NORMS[args.norm],
+        max_time=args.max_time,
+        path=path,
+    )
+    msg = f"Profile {profile.params} written to {path}: median"
+    msg += f" {profile.median:.3f}s, p95 {profile.tail:.3f}s."
+    print(msg)  # noqa: T201
+    return 0
+
+
+def parse_args(
+    argv: Sequence[str] | None = None,
+) -> Args | ServeArgs | TuneArgs:
+    parser = ArgumentParser(prog="ocean")
+    commands = parser.add_subparsers(dest="command", required=True)
+    _add_serve(commands.add_parser("serve", help="Serve explanations."))
+    _add_tune(
+        commands.add_parser(
+            "tune",
+            help="Tune the solver parameters on sample queries.",
+        )
+    )
+    command = commands.add_parser(
+        "explain",
+        help="Explain the queries of a CSV or Parquet file.",
+    )
+    command.add_argument("model", type=Path)
+    command.add_argument("input", type=Path)
+    command.add_argument("output", type=Path)
+    command.add_argument("--engine", choices=ENGINES, default="mip")
+    command.add_argument("--norm", choices=list(NORMS), default="1")
+    command.add_argument("--target", type=int, default=None)
+    command.add_argument(
+        "--target-column",
+        type=str,
+        default=None,
+        dest="target_column",
+    )
+    command.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100,
+        dest="chunk_size",
+    )
+    command.add_argument("--workers", type=int, default=1, dest="n_workers")
+    command.add_argument("--max-time", type=int, default=60, dest="max_time")
+    command.add_argument("--checkpoint", type=Path, default=None)
+    command.add_argument("--restart", action="store_true")
+    namespace = vars(parser.parse_args(argv))
+    match namespace.pop("command"):
+        case "serve":
+            return ServeArgs(**namespace)
+        case "tune":
+            return TuneArgs(**namespace)
+        case _:
+            return Args(**namespace)
+
+
+def _add_serve(command: ArgumentParser) -> None:
+    command.add_argument("model", type=Path)
+    command.add_argument("--engine", choices=ENGINES, default="mip")
+    command.add_argument("--host", type=str, default="127.0.0.1")
+    command.add_argument("--port", type=int, default=8000)
+    command.add_argument("--workers", type=int, default=1, dest="n_workers")
+    command.add_argument(
+        "--max-pending",
+        type=int,
+        default=ExplanationServer.DEFAULT_MAX_PENDING,
+        dest="max_pending",
+    )
+    command.add_argument(
+        "--max-claim",
+        type=int,
+        default=ExplanationServer.DEFAULT_MAX_CLAIM,
+        dest="max_claim",
+    )
+    command.add_argument(
+        "--max-time",
+        type=int,
+        default=ExplanationServer.DEFAULT_MAX_TIME,
+        dest="max_time",
+    )
+
+
+def _add_tune(command: ArgumentParser) -> None:
+    command.add_argument("model", type=Path)
+    command.add_argument("input", type=Path)
+    command.add_argument("--engine", choices=ENGINES, default="mip")
+    command.add_argument("--norm", choices=list(NORMS), default="1")
+    command.add_argument("--target", type=int, default=None)
+    command.add_argument(
+        "--target-column",
+        type=str,
+        default=None,
+        dest="target_column",
+    )
+    command.add_argument(
+        "--queries",
+        type=int,
+        default=DEFAULT_N_QUERIES,
+        dest="n_queries",
+    )
+    command.add_argument(
+        "--max-time",
+        type=int,
+        default=DEFAULT_MAX_TIME,
+        dest="max_time",
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    if isinstance(args, ServeArgs):
+        return serve(args)
+    if isinstance(args, TuneArgs):
+        return tune(args)
+    return explain(args)
@@ -1,7 +1,7 @@
 from ._base import BaseModel
 from ._builder.model import ConstraintProgramBuilder
 from ._env import ENV
-from ._explainer import Explainer
+from ._explainer import Explainer, Incumbent
 from ._explanation import Explanation
 from ._managers import FeatureManager, TreeManager
 from ._model import Model
@@ -15,6 +15,7 @@ __all__ = [
     "Explanation",
     "FeatureManager",
     "FeatureVar",
+    "Incumbent",
     "Model",
     "TreeManager",
     "TreeVar",
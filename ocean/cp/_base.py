@@ -15,6 +15,23 @@ class BaseModel(ABC, cp.CpModel):
         for variable in variables:
             variable.build(model=self)
 
+    def measure(self) -> tuple[int, int, int]:
+        # The nonzeros are the terms of the linear constraints, the
+        # literals of the boolean ones and the expressions of the
+        # others, enforcement literals included.
+        proto = self.Proto()
+        n_nonzeros = 0
+        for constraint in proto.constraints:
+            n_nonzeros += len(constraint.enforcement_literal)
+            kind = constraint.WhichOneof("constraint")
+            if kind is None:
+                continue
+            body = getattr(constraint, kind)
+            for field in ("vars", "literals", "exprs"):
+                if hasattr(body, field):
+                    n_nonzeros += len(getattr(body, field))
+        return len(proto.variables), len(proto.constraints), n_nonzeros
+
 
 class Var(Protocol):
     _name: str
@@ -163,5 +163,55 @@ class ConstraintProgramBuilder(ModelBuilder):
             model.Add(x >= 1).OnlyEnforceIf(y)
 
 
+class OrderConstraintProgramBuilder(ConstraintProgramBuilder):
+    # The numeric splits are enforced on the order literals
+    # of the features: x <= j - 1 is the negation of b[j].
+    @staticmethod
+    def _cset(
+        model: BaseModel,
+        *,
+        node: Node,
+        y: cp.IntVar,
+        v: FeatureVar,
+        sigma: bool,
+    ) -> None:
+        OrderConstraintProgramBuilder._oset(
+            model, node=node, y=y, v=v, sigma=sigma
+        )
+
+    @staticmethod
+    def _dset(
+        model: BaseModel,
+        *,
+        node: Node,
+        y: cp.IntVar,
+        v: FeatureVar,
+        sigma: bool,
+    ) -> None:
+        OrderConstraintProgramBuilder._oset(
+            model, node=node, y=y, v=v, sigma=sigma
+        )
+
+    @staticmethod
+    def _oset(
+        model: BaseModel,
+        *,
+        node: Node,
+        y: cp.IntVar,
+        v: FeatureVar,
+        sigma: bool,
+    ) -> None:
+        threshold = node.threshold
+        j = int(np.searchsorted(v.levels, threshold, side="left"))
+        m = len(v.order)
+        if 1 <= j <= m:
+            b = v.oget(j)
+            model.AddImplication(y, b.Not() if sigma else b)
+        elif (sigma and j < 1) or (not sigma and j > m):
+            # The branch can not be reached.
+            model.Add(y == 0)
+
+
 class ModelBuilderFactory:
     CP: type[ConstraintProgramBuilder] = ConstraintProgramBuilder
+    ORDER: type[OrderConstraintProgramBuilder] = OrderConstraintProgramBuilder
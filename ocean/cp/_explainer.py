@@ -1,51 +1,144 @@
 import time
 import traceback
 import warnings
+from collections.abc import Iterator, Mapping
+from queue import SimpleQueue
+from threading import Thread
+from typing import overload
 
+import numpy as np
+from ortools.sat import sat_parameters_pb2
 from ortools.sat.python import cp_model as cp
+from sklearn.ensemble import IsolationForest
 
+from .._explainer import ExplainerMixin, Incumbent, relative_gap
+from .._footprint import Footprint
+from .._stats import Stats
+from .._tune import Profile
 from ..abc import Mapper
 from ..feature import Feature
-from ..tree import parse_ensembles
+from ..tree import Forest, parse_ensembles
 from ..typing import (
     Array1D,
     BaseExplainableEnsemble,
     BaseExplainer,
     NonNegativeInt,
+    NonNegativeNumber,
+    Norm,
+    Param,
     PositiveInt,
 )
 from ._env import ENV
 from ._explanation import Explanation
+from ._footprint import estimate
 from ._model import Model
+from ._variables import FeatureVar
 
 
-class Explainer(Model, BaseExplainer):
+class Explainer(Model, ExplainerMixin[Explanation], BaseExplainer):
+    ENGINE: str = "cp"
+
+    # Number of solutions searched for each requested
+    # counterfactual when a minimum distance is enforced.
+    POOL_OVERSAMPLING: PositiveInt = 10
+
+    # Parameter sets searched by tune: the number of workers, which
+    # sets the portfolio of subsolvers, the linear relaxation, the
+    # presolve and the symmetry detection.
+    PROFILES: tuple[Mapping[str, Param], ...] = (
+        {},
+        {"num_workers": 1},
+        {"num_workers": 4},
+        {"num_workers": 8},
+        {"linearization_level": 0},
+        {"linearization_level": 2},
+        {"cp_model_presolve": False},
+        {"symmetry_level": 0},
+    )
+
+    # Objective cutoff of the current query.
+    _cutoff: float | None = None
+
+    # Solver parameters set before each query, and the names of the
+    # ones set by the last query.
+    _profile: Profile | None = None
+    _profiled: frozenset[str] = frozenset()
+
     def __init__(
         self,
         ensemble: BaseExplainableEnsemble,
         *,
         mapper: Mapper[Feature],
         weights: Array1D | None = None,
+        isolation: IsolationForest | None = None,
         epsilon: int = Model.DEFAULT_EPSILON,
         model_type: Model.Type = Model.Type.CP,
+        encoding: FeatureVar.Encoding = FeatureVar.Encoding.DIRECT,
+        solver: cp.CpSolver | None = None,
+        stats: Stats | None = None,
     ) -> None:
-        ensembles = (ensemble,)
-        trees = parse_ensembles(*ensembles, mapper=mapper)
+        ensembles = (ensemble,) if isolation is None else (ensemble, isolation)
+        n_isolators, max_samples = self._get_isolation_params(isolation)
+        stats = Stats(enabled=False) if stats is None else stats
+        with stats.stage("parse"):
+            trees = parse_ensembles(*ensembles, mapper=mapper)
         Model.__init__(
             self,
             trees,
             mapper=mapper,
             weights=weights,
+            n_isolators=n_isolators,
+            max_samples=max_samples,
             epsilon=epsilon,
             model_type=model_type,
+            encoding=encoding,
+            stats=stats,
         )
         self.build()
-        self.solver = ENV.solver
+        self.solver = ENV.solver if solver is None else solver
+        self.explanation.solver = self.solver
+        self._set_forest(
+            trees,
+            mapper=mapper,
+            n_estimators=self.n_estimators,
+            weights=self.weights,
+        )
+
+    @classmethod
+    def estimate_footprint(
+        cls,
+        ensemble: BaseExplainableEnsemble,
+        *,
+        mapper: Mapper[Feature],
+        isolation: IsolationForest | None = None,
+    ) -> Footprint:
+        # Dry run of the build: the trees are parsed, but the sizes
+        # of the model are counted without building it.
+        ensembles = (ensemble,) if isolation is None else (ensemble, isolation)
+        n_isolators, _ = cls._get_isolation_params(isolation)
+        trees = parse_ensembles(*ensembles, mapper=mapper)
+        return estimate(trees, mapper, n_estimators=len(trees) - n_isolators)
+
+    @property
+    def profile(self) -> Profile | None:
+        return self._profile
+
+    @profile.setter
+    def profile(self, profile: Profile | None) -> None:
+        if profile is not None and profile.engine != self.ENGINE:
+            msg = f"Expected a profile of the {self.ENGINE} engine,"
+            msg += f" got {profile.engine}."
+            raise ValueError(msg)
+        self._profile = profile
 
     def get_objective_value(self) -> float:
+        if self._precheck == Forest.Precheck.TRIVIAL:
+            return 0.0
         return self.solver.ObjectiveValue() / self._obj_scale
 
     def get_solving_status(self) -> str:
+        if self._precheck != Forest.Precheck.PASSED:
+            return str(self._precheck.value)
         return self.Status
 
     def get_anytime_solutions(self) -> list[dict[str, float]] | None:
@@ -53,31 +146,246 @@ class Explainer(Model, BaseExplainer):
             return self.callback.sollist
         return None
 
+    def get_solver_stats(self) -> dict[str, float]:
+        if self._precheck != Forest.Precheck.PASSED:
+            return {}
+        return {
+            "runtime": self.solver.wall_time,
+            "n_branches": self.solver.num_branches,
+            "n_conflicts": self.solver.num_conflicts,
+        }
+
+    @overload
+    def explain(
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        return_callback: bool = False,
+        verbose: bool = False,
+        max_time: int = 60,
+        num_workers: int | None = None,
+        random_seed: int = 42,
+        mip_gap: NonNegativeNumber | None = None,
+        absolute_gap: NonNegativeNumber | None = None,
+        objective_cutoff: float | None = None,
+        k: None = None,
+        min_distance: NonNegativeNumber = 0.0,
+    ) -> Explanation | None: ...
+
+    @overload
     def explain(
         self,
         x: Array1D,
         *,
         y: NonNegativeInt,
-        norm: PositiveInt,
+        norm: Norm,
         return_callback: bool = False,
         verbose: bool = False,
         max_time: int = 60,
         num_workers: int | None = None,
         random_seed: int = 42,
-    ) -> Explanation | None:
+        mip_gap: NonNegativeNumber | None = None,
+        absolute_gap: NonNegativeNumber | None = None,
+        objective_cutoff: float | None = None,
+        k: PositiveInt,
+        min_distance: NonNegativeNumber = 0.0,
+    ) -> tuple[Explanation, ...]: ...
+
+    def explain(
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        return_callback: bool = False,
+        verbose: bool = False,
+        max_time: int = 60,
+        num_workers: int | None = None,
+        random_seed: int = 42,
+        mip_gap: NonNegativeNumber | None = None,
+        absolute_gap: NonNegativeNumber | None = None,
+        objective_cutoff: float | None = None,
+        k: PositiveInt | None = None,
+        min_distance: NonNegativeNumber = 0.0,
+    ) -> Explanation | tuple[Explanation, ...] | None:
+        with self._stats.query(self):
+            with self._stats.stage("precheck"):
+                self._set_precheck(x, y=y, trivial=k is None)
+            match self._precheck:
+                case Forest.Precheck.UNREACHABLE:
+                    return None if k is None else ()
+                case Forest.Precheck.TRIVIAL:
+                    return self._get_trivial(x)
+                case Forest.Precheck.PASSED:
+                    pass
+            with self._stats.stage("setup", self):
+                self._set_params(
+                    verbose=verbose,
+                    max_time=max_time,
+                    num_workers=num_workers,
+                    random_seed=random_seed,
+                    mip_gap=mip_gap,
+                    absolute_gap=absolute_gap,
+                )
+                self.add_objective(x, norm=norm)
+                self._set_cutoff(objective_cutoff)
+                self.set_majority_class(y=y)
+            self.callback: MySolCallback | None = (
+                MySolCallback(starttime=time.time(), _obj_scale=self._obj_scale)
+                if return_callback
+                else None
+            )
+            with self._stats.stage("solve"):
+                _ = self.solver.Solve(self, solution_callback=self.callback)
+            with self._stats.stage("extract"):
+                explanation = self._get_explanation(x)
+                if k is None:
+                    return explanation
+                if explanation is None:
+                    return ()
+                return self._get_pool(k=k, min_distance=min_distance, norm=norm)
+
+    def explain_iter(
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        verbose: bool = False,
+        max_time: int = 60,
+        num_workers: int | None = None,
+        random_seed: int = 42,
+        mip_gap: NonNegativeNumber | None = None,
+        absolute_gap: NonNegativeNumber | None = None,
+        objective_cutoff: float | None = None,
+    ) -> Iterator[Incumbent[Explanation]]:
+        self._set_precheck(x, y=y)
+        match self._precheck:
+            case Forest.Precheck.UNREACHABLE:
+                return
+            case Forest.Precheck.TRIVIAL:
+                explanation = self._get_trivial(x)
+                yield Incumbent(explanation, objective=0.0, bound=0.0, time=0.0)
+                return
+            case Forest.Precheck.PASSED:
+                pass
+        self._set_params(
+            verbose=verbose,
+            max_time=max_time,
+            num_workers=num_workers,
+            random_seed=random_seed,
+            mip_gap=mip_gap,
+            absolute_gap=absolute_gap,
+        )
+        self.add_objective(x, norm=norm)
+        self._set_cutoff(objective_cutoff)
+        self.set_majority_class(y=y)
+        self.explanation.query = x
+
+        # The solver runs in a separate thread and pushes each new
+        # incumbent to the queue. The end of the solve is signaled
+        # by None. Closing the generator stops the search.
+        incumbents: SimpleQueue[Incumbent[Explanation] | None] = SimpleQueue()
+        errors: list[BaseException] = []
+        callback = IncumbentCallback(
+            self.explanation,
+            incumbents,
+            obj_scale=self._obj_scale,
+        )
+
+        def solve() -> None:
+            try:
+                _ = self.solver.Solve(self, solution_callback=callback)
+                self.Status = self.solver.status_name()
+            except BaseException as e:  # noqa: BLE001
+                errors.append(e)
+            finally:
+                incumbents.put(None)
+
+        thread = Thread(target=solve, daemon=True)
+        thread.start()
+        try:
+            while (incumbent := incumbents.get()) is not None:
+                yield incumbent
+        finally:
+            self.interrupt()
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def interrupt(self) -> None:
+        self.solver.stop_search()
+
+    def _get_precheck_tolerances(self) -> tuple[float, float]:
+        # The scaled margins are integers, off by at most twice the
+        # rounding error of the scores.
+        epsilon = self._epsilon / self.score_scale
+        tolerance = 2 * self.score_error + 0.5 / self.score_scale
+        return epsilon, tolerance
+
+    def _get_min_length(self) -> tuple[float, float]:
+        # The scaled lengths of the leaves and the scaled minimum
+        # are each rounded to the nearest integer.
+        tolerance = 0.5 * (self.n_isolators + 1) / self.LENGTH_SCALE
+        return self.min_length, tolerance
+
+    def _get_trivial(self, x: Array1D) -> Explanation:
+        self.explanation.query = x
+        explanation = self.explanation.snapshot(
+            values=np.asarray(x, dtype=np.float64).ravel()
+        )
+        explanation.bound = 0.0
+        explanation.gap = 0.0
+        return explanation
+
+    def _set_params(
+        self,
+        *,
+        verbose: bool,
+        max_time: int,
+        num_workers: int | None,
+        random_seed: int,
+        mip_gap: NonNegativeNumber | None,
+        absolute_gap: NonNegativeNumber | None,
+    ) -> None:
+        self._set_profile()
         self.solver.parameters.log_search_progress = verbose
         self.solver.parameters.max_time_in_seconds = max_time
         self.solver.parameters.random_seed = random_seed
         if num_workers is not None:
             self.solver.parameters.num_workers = num_workers
-        self.add_objective(x, norm=norm)
-        self.set_majority_class(y=y)
-        self.callback: MySolCallback | None = (
-            MySolCallback(starttime=time.time(), _obj_scale=self._obj_scale)
-            if return_callback
-            else None
+        # None restores the default value of the parameters.
+        defaults = sat_parameters_pb2.SatParameters()
+        self.solver.parameters.relative_gap_limit = (
+            defaults.relative_gap_limit if mip_gap is None else mip_gap
+        )
+        self.solver.parameters.absolute_gap_limit = (
+            defaults.absolute_gap_limit
+            if absolute_gap is None
+            else absolute_gap * self._obj_scale
         )
-        _ = self.solver.Solve(self, solution_callback=self.callback)
+
+    def _set_profile(self) -> None:
+        # The parameters set by the previous profile are restored to
+        # their default values.
+        params = {} if self._profile is None else self._profile.params
+        defaults = sat_parameters_pb2.SatParameters()
+        for name in sorted(self._profiled - params.keys()):
+            setattr(self.solver.parameters, name, getattr(defaults, name))
+        for name, value in params.items():
+            setattr(self.solver.parameters, name, value)
+        self._profiled = frozenset(params)
+
+    def _set_cutoff(self, objective_cutoff: float | None) -> None:
+        self._cutoff = objective_cutoff
+        if objective_cutoff is None:
+            return
+        cutoff = int(objective_cutoff * self._obj_scale)
+        self.add_garbage(self.Add(self._objective <= cutoff))
+
+    def _get_explanation(self, x: Array1D) -> Explanation | None:
         status = self.solver.status_name()
         self.Status = status
 
@@ -91,12 +399,17 @@ class Explainer(Model, BaseExplainer):
                 msg += "the given time frame. \n It can however certify"
                 msg += " that no counterfactual can be closer than"
                 msg += f" {self.solver.BestObjectiveBound()}."
-                warnings.warn(msg, category=UserWarning, stacklevel=2)
+                warnings.warn(msg, category=UserWarning, stacklevel=3)
+            case "INFEASIBLE" if self._cutoff is not None:
+                msg = "There are no counterfactuals closer than the"
+                msg += f" objective cutoff {self._cutoff}."
+                warnings.warn(msg, category=UserWarning, stacklevel=3)
+                return None
             case "INFEASIBLE":
                 msg = "There are no feasible counterfactuals for this query."
                 msg += " If there should be one, please check the model "
                 msg += "constraints or report this issue to the developers."
-                warnings.warn(msg, category=UserWarning, stacklevel=2)
+                warnings.warn(msg, category=UserWarning, stacklevel=3)
                 return None
             case "MODEL_INVALID":
                 msg = "The constraint programming model is invalid. "
@@ -107,14 +420,74 @@ class Explainer(Model, BaseExplainer):
                 msg = "The constraint programming solver could "
                 msg += "not find any valid CF within the given time frame."
                 msg += " Try increasing the time limit."
-                warnings.warn(msg, category=UserWarning, stacklevel=2)
+                warnings.warn(msg, category=UserWarning, stacklevel=3)
                 return None
             case _:
                 msg = "Unexpected solver status: " + status
                 raise RuntimeError(msg)
         self.explanation.query = x
+        objective = self.solver.ObjectiveValue() / self._obj_scale
+        bound = self.solver.BestObjectiveBound() / self._obj_scale
+        self.explanation.bound = bound
+        self.explanation.gap = relative_gap(objective, bound)
         return self.explanation
 
+    def _get_pool(
+        self,
+        *,
+        k: PositiveInt,
+        min_distance: NonNegativeNumber,
+        norm: Norm,
+    ) -> tuple[Explanation, ...]:
+        # The counterfactuals are found by increasing objective value:
+        # each solve excludes the cells of the ones found before it.
+        # More solutions than requested are searched when a minimum
+        # distance has to be enforced between them. The solves share
+        # the time limit of the query, and run on a copy of the solver
+        # so that the solver keeps the result of the query.
+        n_solutions = k * self.POOL_OVERSAMPLING if min_distance > 0.0 else k
+        solver = cp.CpSolver()
+        solver.parameters.CopyFrom(self.solver.parameters)
+        remaining = solver.parameters.max_time_in_seconds
+        remaining -= self.solver.wall_time
+
+        pool: list[Explanation] = []
+        last = self.solver
+        for i in range(n_solutions):
+            explanation = self.explanation.snapshot(last)
+            if all(
+                self._is_far(explanation.x, e.x, min_distance, norm=norm)
+                for e in pool
+            ):
+                pool.append(explanation)
+            if len(pool) == k or i == n_solutions - 1 or remaining <= 0.0:
+                break
+            self._exclude(last)
+            solver.parameters.max_time_in_seconds = remaining
+            _ = solver.Solve(self)
+            remaining -= solver.wall_time
+            if solver.status_name() not in {"OPTIMAL", "FEASIBLE"}:
+                break
+            last = solver
+        return tuple(pool)
+
+    def _exclude(self, solution: cp.CpSolver) -> None:
+        # The cells of the features determine the counterfactual: at
+        # least one of their literals has to change.
+        literals = [
+            v.Not() if solution.BooleanValue(v) else v
+            for v in self._objective_vars
+        ]
+        self.add_garbage(self.AddBoolOr(literals))
+
+    @staticmethod
+    def _get_isolation_params(
+        isolation: IsolationForest | None,
+    ) -> tuple[NonNegativeInt, NonNegativeInt]:
+        if isolation is not None:
+            return len(isolation), int(isolation.max_samples_)  # pyright: ignore[reportUnknownArgumentType]
+        return 0, 0
+
 
 class MySolCallback(cp.CpSolverSolutionCallback):
     """Save intermediate solutions."""
@@ -141,3 +514,33 @@ class MySolCallback(cp.CpSolverSolutionCallback):
 
     def addSol(self, objval: float, time: float) -> None:
         self.sollist.append({"objective_value": objval, "time": time})
+
+
+class IncumbentCallback(cp.CpSolverSolutionCallback):
+    """Push each new incumbent to a queue."""
+
+    def __init__(
+        self,
+        explanation: Explanation,
+        incumbents: "SimpleQueue[Incumbent[Explanation] | None]",
+        obj_scale: float,
+    ) -> None:
+        cp.CpSolverSolutionCallback.__init__(self)
+        self.explanation = explanation
+        self.incumbents = incumbents
+        self._obj_scale = obj_scale
+
+    def on_solution_callback(self) -> None:
+        objective = self.ObjectiveValue() / self._obj_scale
+        bound = self.BestObjectiveBound() / self._obj_scale
+        explanation = self.explanation.snapshot(self)
+        explanation.bound = bound
+        explanation.gap = relative_gap(objective, bound)
+        self.incumbents.put(
+            Incumbent(
+                explanation=explanation,
+                objective=objective,
+                bound=bound,
+                time=self.WallTime(),
+            )
+        )
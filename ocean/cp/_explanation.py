@@ -9,11 +9,24 @@ from ..typing import Array1D, BaseExplanation, Key, Number
 from ._env import ENV
 from ._variables import FeatureVar
 
+type Solution = cp.CpSolver | cp.CpSolverSolutionCallback
+
 
 class Explanation(Mapper[FeatureVar], BaseExplanation):
     _epsilon: float = 1e-6
     _x: Array1D = np.zeros((0,), dtype=int)
 
+    # Values of the columns, only set for the snapshots
+    # that do not read the solution from the solver.
+    _values: Array1D | None = None
+
+    # Objective bound and relative gap certified by the solver.
+    _bound: float | None = None
+    _gap: float | None = None
+
+    # Solver holding the solution, defaults to the shared solver.
+    _solver: cp.CpSolver | None = None
+
     def vget(self, i: int) -> cp.IntVar:
         name = self.names[i]
         if self[name].is_one_hot_encoded:
@@ -22,12 +35,35 @@ class Explanation(Mapper[FeatureVar], BaseExplanation):
         return self[name].xget()
 
     def to_series(self) -> "pd.Series[float]":
+        if self._values is not None:
+            return pd.Series(self._values, index=self.columns)
+        return self._to_series(self.solver)
+
+    def snapshot(
+        self,
+        solution: Solution | None = None,
+        *,
+        values: Array1D | None = None,
+    ) -> "Explanation":
+        solution = self.solver if solution is None else solution
+        snapshot = Explanation(self)
+        snapshot.query = self.query
+        snapshot.frozen_values = (
+            self._to_series(solution).to_numpy().astype(np.float64)
+            if values is None
+            else values
+        )
+        snapshot.bound = self.bound
+        snapshot.gap = self.gap
+        return snapshot
+
+    def _to_series(self, solution: Solution) -> "pd.Series[float]":
         values: list[float] = [
-            ENV.solver.Value(v) for v in map(self.vget, range(self.n_columns))
+            solution.Value(v) for v in map(self.vget, range(self.n_columns))
         ]
         for f in range(self.n_columns):
             name = self.names[f]
-            value = ENV.solver.Value(self.vget(f))
+            value = solution.Value(self.vget(f))
             if self[name].is_continuous:
                 values[f] = self.format_value(
                     f, int(value), list(self[name].levels)
@@ -53,7 +89,10 @@ class Explanation(Mapper[FeatureVar], BaseExplanation):
 
     @property
     def value(self) -> Mapping[Key, Key | Number]:
-        solver = ENV.solver
+        if self._values is not None:
+            return self._decode(self._values)
+
+        solver = self.solver
 
         def get(v: FeatureVar) -> Key | Number:
             if v.is_one_hot_encoded:
@@ -72,6 +111,16 @@ class Explanation(Mapper[FeatureVar], BaseExplanation):
 
         return self.reduce(get)
 
+    def _decode(self, x: Array1D) -> Mapping[Key, Key | Number]:
+        def get(name: Key, v: FeatureVar) -> Key | Number:
+            if v.is_one_hot_encoded:
+                for code in v.codes:
+                    if np.isclose(x[self.idx.get(name, code)], 1.0):
+                        return code
+            return float(x[self.idx.get(name)])
+
+        return {name: get(name, v) for name, v in self.items()}
+
     def format_value(self, f: int, idx: int, levels: list[float]) -> float:
         eps = min(self._epsilon, 0.5 * min(np.diff(levels)))
         if self.query.shape[0] == 0:
@@ -88,6 +137,38 @@ class Explanation(Mapper[FeatureVar], BaseExplanation):
             value = float(levels[idx + 1]) - eps
         return value
 
+    @property
+    def solver(self) -> cp.CpSolver:
+        return ENV.solver if self._solver is None else self._solver
+
+    @solver.setter
+    def solver(self, solver: cp.CpSolver) -> None:
+        self._solver = solver
+
+    @property
+    def frozen_values(self) -> Array1D | None:
+        return self._values
+
+    @frozen_values.setter
+    def frozen_values(self, values: Array1D | None) -> None:
+        self._values = values
+
+    @property
+    def bound(self) -> float | None:
+        return self._bound
+
+    @bound.setter
+    def bound(self, value: float | None) -> None:
+        self._bound = value
+
+    @property
+    def gap(self) -> float | None:
+        return self._gap
+
+    @gap.setter
+    def gap(self, value: float | None) -> None:
+        self._gap = value
+
     @property
     def query(self) -> Array1D:
         return self._x
@@ -0,0 +1,106 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from .._footprint import (
+    Cost,
+    Footprint,
+    Size,
+    measure_features,
+    measure_trees,
+)
+from ..abc import Mapper
+from ..feature import Feature
+from ..tree import Tree
+from ..typing import NonNegativeInt
+
+# Approximate bytes held by the proto of the model for each
+# variable, constraint and nonzero: domain and name of the
+# variables, domain and enforcement of the constraints, and the
+# index and coefficient of each nonzero.
+COST = Cost(var=48, constr=64, nonzero=16)
+
+# Domain of the boolean variables.
+BOOL_DOMAIN: tuple[int, int] = (0, 1)
+
+
+def estimate(
+    trees: Sequence[Tree],
+    mapper: Mapper[Feature],
+    *,
+    n_estimators: NonNegativeInt,
+) -> Footprint:
+    # Sizes of the model built with the direct encoding, and of
+    # the query layer, counted from the trees and the features
+    # without building the model.
+    estimators = sum(
+        map(_tree, trees[:n_estimators]),
+        start=measure_trees(trees[:n_estimators]),
+    )
+    isolators = sum(
+        map(_tree, trees[n_estimators:]),
+        start=measure_trees(trees[n_estimators:]),
+    )
+    if len(trees) > n_estimators:
+        n_leaves = sum(len(tree.leaves) for tree in trees[n_estimators:])
+        isolators += Size(n_constrs=1, n_nonzeros=n_leaves)
+    features = sum(
+        map(_feature, mapper.values()),
+        start=measure_features(mapper.values()),
+    )
+    return Footprint(
+        estimators=estimators,
+        isolators=isolators,
+        features=features,
+        query=_query(trees[:n_estimators]),
+    ).charge(COST)
+
+
+def _feature(feature: Feature) -> Size:
+    if feature.is_binary:
+        return Size(n_vars=1, n_binaries=1)
+    if feature.is_one_hot_encoded:
+        m = len(feature.codes)
+        return Size(n_vars=m, n_binaries=m, n_constrs=1, n_nonzeros=m)
+    # x is the index of the interval or of the level, and each
+    # literal mu is equivalent to one value of x: two enforced
+    # constraints per literal. x is boolean with two values.
+    n_levels = len(feature.levels)
+    m = n_levels - 1 if feature.is_continuous else n_levels
+    return Size(
+        n_vars=1 + m,
+        n_binaries=m + int(m == len(BOOL_DOMAIN)),
+        n_constrs=2 * m,
+        n_nonzeros=4 * m,
+    )
+
+
+def _tree(tree: Tree) -> Size:
+    # One path literal per leaf, exactly one of them is true, and
+    # each literal enforces the splits of the ancestors of its leaf.
+    n_leaves = len(tree.leaves)
+    n_splits = sum(leaf.depth for leaf in tree.leaves)
+    return Size(
+        n_vars=n_leaves,
+        n_binaries=n_leaves,
+        n_constrs=1 + n_splits,
+        n_nonzeros=n_leaves + 2 * n_splits,
+    )
+
+
+def _query(estimators: Sequence[Tree]) -> Size:
+    # The score of the first class exceeds the others on the leaves
+    # where the values differ. The objective is not a constraint.
+    values = np.stack([
+        leaf.value for tree in estimators for leaf in tree.leaves
+    ])
+    n_classes = values.shape[-1]
+    n_nonzeros = sum(
+        int(np.count_nonzero(values[:, 0, 0] != values[:, 0, c]))
+        for c in range(1, n_classes)
+    )
+    return Size(
+        n_constrs=n_classes - 1,
+        n_nonzeros=n_nonzeros,
+        n_objects=n_classes - 1,
+    )
@@ -16,7 +16,16 @@ class FeatureManager:
 
     _mapper: Explanation
 
-    def __init__(self, mapper: Mapper[Feature]) -> None:
+    # Encoding of the numeric features.
+    _encoding: FeatureVar.Encoding
+
+    def __init__(
+        self,
+        mapper: Mapper[Feature],
+        *,
+        encoding: FeatureVar.Encoding = FeatureVar.Encoding.DIRECT,
+    ) -> None:
+        self._encoding = encoding
         self._set_mapper(mapper)
 
     def build_features(self, model: BaseModel) -> None:
@@ -30,6 +39,10 @@ class FeatureManager:
     def n_features(self) -> PositiveInt:
         return len(self.mapper)
 
+    @property
+    def encoding(self) -> FeatureVar.Encoding:
+        return self._encoding
+
     @property
     def mapper(self) -> Explanation:
         return self._mapper
@@ -44,7 +57,7 @@ class FeatureManager:
     def _set_mapper(self, mapper: Mapper[Feature]) -> None:
         def create(key: Key, feature: Feature) -> FeatureVar:
             name = self.FEATURE_VAR_FMT.format(key=key)
-            return FeatureVar(feature, name=name)
+            return FeatureVar(feature, name=name, encoding=self._encoding)
 
         if len(mapper) == 0:
             msg = "At least one feature is required."
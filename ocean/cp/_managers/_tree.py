@@ -1,12 +1,17 @@
+import math
+import warnings
 from collections.abc import Iterable
+from fractions import Fraction
 
 import numpy as np
 from ortools.sat.python import cp_model as cp
 
 from ...tree import Tree
+from ...tree._utils import average_length
 from ...typing import (
     NonNegativeArray1D,
     NonNegativeInt,
+    NonNegativeNumber,
     PositiveInt,
 )
 from .._base import BaseModel
@@ -15,43 +20,85 @@ from .._variables import TreeVar
 
 class TreeManager:
     TREE_VAR_FMT: str = "tree[{t}]"
-    DEFAULT_SCORE_SCALE: int = int(1e10)
+    MAX_SCORE_SCALE: int = int(1e10)
+    DEFAULT_SCORE_TOLERANCE: float = 1e-6
+    LENGTH_SCALE: int = int(1e6)
 
     # Tree variables in the ensemble.
     _trees: tuple[TreeVar, *tuple[TreeVar, ...]]
 
+    # Number of isolators in the model.
+    _n_isolators: NonNegativeInt
+
+    # Maximum number of samples in the isolators.
+    _max_samples: NonNegativeInt
+
     # Weights for the estimators in the ensemble.
     _weights: NonNegativeArray1D
 
+    # Length of the ensemble, scaled by LENGTH_SCALE.
+    _length: cp.LinearExpr
+
     # Function of the ensemble.
     _function: dict[tuple[NonNegativeInt, NonNegativeInt], cp.LinearExpr]
 
-    # Scale for the scores.
-    _score_scale: int = DEFAULT_SCORE_SCALE
+    # Leaves of the estimators, stacked in one array:
+    # - values of the leaves,
+    # - index of the first leaf of each estimator,
+    # - path variables of the leaves and their indices in the model,
+    # - scaled coefficients of the leaves in the class scores.
+    _values: np.ndarray[tuple[int, int, int], np.dtype[np.float64]]
+    _offsets: np.ndarray[tuple[int], np.dtype[np.intp]]
+    _variables: list[cp.IntVar]
+    _indices: list[int]
+    _coefs: np.ndarray[tuple[int, int, int], np.dtype[np.int64]]
+
+    # Scale for the scores, and maximum rounding error of a class
+    # score once scaled, in units of the unscaled scores.
+    _score_scale: float
+    _score_error: float
 
     def __init__(
         self,
         trees: Iterable[Tree],
         *,
         weights: NonNegativeArray1D | None = None,
-        scale: int = DEFAULT_SCORE_SCALE,
+        n_isolators: NonNegativeInt = 0,
+        max_samples: NonNegativeInt = 0,
+        scale: int | None = None,
+        tolerance: float = DEFAULT_SCORE_TOLERANCE,
     ) -> None:
         self._set_trees(trees=trees)
+        self._n_isolators = n_isolators
+        self._max_samples = max_samples
         self._set_weights(weights=weights)
-        self._score_scale = scale
+        self._set_leaves()
+        self._set_score_scale(scale=scale, tolerance=tolerance)
 
     def build_trees(self, model: BaseModel) -> None:
         model.build_vars(*self.trees)
 
+        self._variables = [
+            tree[leaf.node_id]
+            for tree in self.estimators
+            for leaf in tree.leaves
+        ]
+        self._indices = [var.Index() for var in self._variables]
+        self._coefs = self._get_coefs(self.weights)
+        self._length = self._get_length()
         self._function = self._get_function()
 
     @property
     def n_trees(self) -> PositiveInt:
         return len(self.trees)
 
+    @property
+    def n_isolators(self) -> NonNegativeInt:
+        return self._n_isolators
+
     @property
     def n_estimators(self) -> PositiveInt:
-        return self.n_trees
+        return self.n_trees - self.n_isolators
 
     @property
     def trees(self) -> tuple[TreeVar, *tuple[TreeVar, ...]]:
@@ -61,6 +108,10 @@ class TreeManager:
     def estimators(self) -> tuple[TreeVar, *tuple[TreeVar, ...]]:
         return self._trees[0], *self._trees[1 : self.n_estimators]
 
+    @property
+    def isolators(self) -> tuple[TreeVar, ...]:
+        return self._trees[self.n_estimators :]
+
     @property
     def shape(self) -> tuple[NonNegativeInt, ...]:
         return self._trees[0].shape
@@ -70,9 +121,29 @@ class TreeManager:
         return self.shape[-1]
 
     @property
-    def score_scale(self) -> int:
+    def max_samples(self) -> NonNegativeInt:
+        return self._max_samples
+
+    @property
+    def score_scale(self) -> float:
         return self._score_scale
 
+    @property
+    def score_error(self) -> float:
+        return self._score_error
+
+    @property
+    def length(self) -> cp.LinearExpr:
+        return self._length
+
+    @property
+    def min_average_length(self) -> NonNegativeNumber:
+        return average_length(self.max_samples)
+
+    @property
+    def min_length(self) -> NonNegativeNumber:
+        return self.n_isolators * self.min_average_length
+
     @property
     def function(
         self,
@@ -113,28 +184,141 @@ class TreeManager:
         self,
         weights: NonNegativeArray1D,
     ) -> dict[tuple[NonNegativeInt, NonNegativeInt], cp.LinearExpr]:
-        exprs: dict[tuple[NonNegativeInt, NonNegativeInt], cp.LinearExpr] = {}
-        n_classes = self.n_classes
-        n_outputs = self.shape[-2]
-        scale = self._score_scale
-        for op in range(n_outputs):
-            for c in range(n_classes):
-                tree_exprs: list[cp.LinearExpr] = []
-                tree_weights: list[int] = []
-                for tree, weight in zip(self.estimators, weights, strict=True):
-                    coefs: list[int] = []
-                    variables: list[cp.IntVar] = []
-                    for leaf in tree.leaves:
-                        coefs.append(int(leaf.value[op, c] * scale))
-                        variables.append(tree[leaf.node_id])
-                    tree_expr = cp.LinearExpr.WeightedSum(variables, coefs)
-                    tree_exprs.append(tree_expr)
-                    tree_weights.append(int(weight))
-                expr = cp.LinearExpr.WeightedSum(tree_exprs, tree_weights)
-                exprs[op, c] = expr
-        return exprs
+        coefs = self._get_coefs(weights)
+        return self._get_exprs(coefs)
+
+    def add_margin(
+        self,
+        model: BaseModel,
+        *,
+        y: NonNegativeInt,
+        c: NonNegativeInt,
+        rhs: int,
+        op: NonNegativeInt = 0,
+    ) -> cp.Constraint:
+        # The score of y exceeds the score of c by at least rhs. The
+        # constraint is written in the proto of the model directly,
+        # over the leaves that change the margin.
+        coefs = self._coefs[:, op, y] - self._coefs[:, op, c]
+        (nonzero,) = np.nonzero(coefs)
+        constraint = cp.Constraint(model)
+        linear = constraint.proto.linear
+        linear.vars.extend(np.asarray(self._indices)[nonzero].tolist())
+        linear.coeffs.extend(coefs[nonzero].tolist())
+        linear.domain.extend([rhs, cp.INT_MAX])
+        return constraint
+
+    def _set_leaves(self) -> None:
+        leaves = [tree.leaves for tree in self.estimators]
+        sizes = np.array([len(ls) for ls in leaves], dtype=np.intp)
+        self._offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        self._values = np.stack([
+            leaf.value for ls in leaves for leaf in ls
+        ]).astype(np.float64)
+
+    def _get_exprs(
+        self,
+        coefs: np.ndarray[tuple[int, int, int], np.dtype[np.int64]],
+    ) -> dict[tuple[NonNegativeInt, NonNegativeInt], cp.LinearExpr]:
+        n_outputs, n_classes = coefs.shape[1:]
+        return {
+            (op, c): cp.LinearExpr.WeightedSum(
+                self._variables,
+                coefs[:, op, c].tolist(),
+            )
+            for op in range(n_outputs)
+            for c in range(n_classes)
+        }
+
+    def _get_values(
+        self,
+        weights: NonNegativeArray1D,
+    ) -> np.ndarray[tuple[int, int, int], np.dtype[np.float64]]:
+        # Weighted values of the leaves of all the estimators.
+        sizes = np.diff(self._offsets, append=len(self._values))
+        weights = np.repeat(np.asarray(weights, dtype=np.float64), sizes)
+        return self._values * weights[:, None, None]
+
+    def _get_coefs(
+        self,
+        weights: NonNegativeArray1D,
+    ) -> np.ndarray[tuple[int, int, int], np.dtype[np.int64]]:
+        values = self._get_values(weights)
+        return np.rint(values * self._score_scale).astype(np.int64)
+
+    def _set_score_scale(self, *, scale: int | None, tolerance: float) -> None:
+        values = self._get_values(self.weights)
+        if scale is None:
+            scale = self._find_score_scale(values, tolerance=tolerance)
+            # The coefficients are divided by their common divisor.
+            coefs = np.rint(values * scale).astype(np.int64)
+            divisor = int(np.gcd.reduce(coefs, axis=None))
+            self._score_scale = scale / max(divisor, 1)
+        else:
+            self._score_scale = float(scale)
+        self._score_error = self._get_score_error(values, self._score_scale)
+        if self._score_error > tolerance:
+            msg = f"The rounding error of the scores ({self._score_error:.3g})"
+            msg += f" exceeds the tolerance ({tolerance:.3g})"
+            msg += f" with the scale {self._score_scale:.3g}."
+            warnings.warn(msg, category=UserWarning, stacklevel=3)
+
+    def _find_score_scale(
+        self,
+        values: np.ndarray[tuple[int, int, int], np.dtype[np.float64]],
+        *,
+        tolerance: float,
+    ) -> int:
+        # The scores are compared exactly when all the weighted values
+        # are fractions whose denominators have a small common multiple.
+        # Otherwise, the smallest power of ten keeping the rounding
+        # error within the tolerance is used.
+        unique = np.unique(values)
+        fractions = [
+            Fraction(float(v)).limit_denominator(self.MAX_SCORE_SCALE)
+            for v in unique
+        ]
+        if all(
+            abs(float(f) - v) <= np.finfo(np.float64).eps * max(abs(v), 1.0)
+            for f, v in zip(fractions, unique, strict=True)
+        ):
+            scale = math.lcm(*(f.denominator for f in fractions))
+            if scale <= self.MAX_SCORE_SCALE:
+                return scale
+
+        scale = 1
+        while scale < self.MAX_SCORE_SCALE:
+            if self._get_score_error(values, scale) <= tolerance:
+                return scale
+            scale *= 10
+        return self.MAX_SCORE_SCALE
+
+    def _get_score_error(
+        self,
+        values: np.ndarray[tuple[int, int, int], np.dtype[np.float64]],
+        scale: float,
+    ) -> float:
+        # Each class score sums one leaf per estimator, so its error
+        # is at most the sum of the largest errors of the estimators.
+        errors = np.abs(np.rint(values * scale) - values * scale) / scale
+        errors = np.maximum.reduceat(errors, self._offsets, axis=0)
+        return float(errors.sum(axis=0).max())
+
+    def _get_length(self) -> cp.LinearExpr:
+        # The path lengths of the leaves are precomputed by the
+        # trees, they are scaled to integers at once.
+        if self.n_isolators == 0:
+            return cp.LinearExpr.Sum([])
+        variables = [
+            tree[leaf.node_id]
+            for tree in self.isolators
+            for leaf in tree.leaves
+        ]
+        lengths = np.concatenate([tree.lengths for tree in self.isolators])
+        coefs = np.rint(lengths * self.LENGTH_SCALE).astype(np.int64)
+        return cp.LinearExpr.WeightedSum(variables, coefs.tolist())
 
     def _get_function(
         self,
     ) -> dict[tuple[NonNegativeInt, NonNegativeInt], cp.LinearExpr]:
-        return self.weighted_function(weights=self.weights)
+        return self._get_exprs(self._coefs)
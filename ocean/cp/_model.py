@@ -1,3 +1,4 @@
+import itertools
 from collections.abc import Iterable
 from enum import Enum
 
@@ -5,17 +6,28 @@ import numpy as np
 from ortools.sat.python import cp_model as cp
 from pydantic import validate_call
 
+from .._footprint import (
+    Footprint,
+    Group,
+    Size,
+    attribute,
+    get_groups,
+    measure_features,
+    measure_trees,
+)
+from .._stats import Stats
 from ..abc import Mapper
 from ..feature import Feature
 from ..tree import Tree
 from ..typing import (
     Array1D,
-    Key,
     NonNegativeArray1D,
     NonNegativeInt,
+    Norm,
 )
 from ._base import BaseModel
 from ._builder.model import ModelBuilder, ModelBuilderFactory
+from ._footprint import BOOL_DOMAIN, COST
 from ._managers import FeatureManager, GarbageManager, TreeManager
 from ._variables import FeatureVar
 
@@ -33,15 +45,53 @@ class Model(BaseModel, FeatureManager, TreeManager, GarbageManager):
     # Model builder for the ensemble.
     _builder: ModelBuilder
 
+    # Scaled objective expression of the current query.
+    _objective: cp.ObjLinearExprT
+
+    # Cells of the columns, stacked in arrays: the intervals of
+    # the continuous features, the levels of the discrete features
+    # and the two values of the binary variables.
+    # - column, bounds and index in its column of each cell,
+    # - whether each cell is binary or discrete,
+    # - whether each cell is constant, i.e. the first cell of an
+    #   order encoded column, which has no literal,
+    # - whether the literal of each cell pays the increment of
+    #   the cost from the previous cell, or the cost itself,
+    # - first cell of each column.
+    _cell_columns: np.ndarray[tuple[int], np.dtype[np.intp]]
+    _cell_bounds: np.ndarray[tuple[int, int], np.dtype[np.float64]]
+    _cell_indices: np.ndarray[tuple[int], np.dtype[np.intp]]
+    _cell_binaries: np.ndarray[tuple[int], np.dtype[np.bool_]]
+    _cell_discretes: np.ndarray[tuple[int], np.dtype[np.bool_]]
+    _cell_constants: np.ndarray[tuple[int], np.dtype[np.bool_]]
+    _cell_increments: np.ndarray[tuple[int], np.dtype[np.bool_]]
+    _cell_starts: np.ndarray[tuple[int], np.dtype[np.intp]]
+
+    # Terms of the objective: literals of the non-constant cells,
+    # their indices in the model, and the first term of each column.
+    _objective_vars: list[cp.IntVar]
+    _objective_indices: list[int]
+    _objective_starts: np.ndarray[tuple[int], np.dtype[np.intp]]
+
+    # Maximum distance over the columns, created by the first
+    # query with the L-infinity norm.
+    _max_var: cp.IntVar | None = None
+
+    # Timings and sizes of the stages of the build and the queries.
+    _stats: Stats
+
     def __init__(
         self,
         trees: Iterable[Tree],
         mapper: Mapper[Feature],
         *,
         weights: NonNegativeArray1D | None = None,
+        n_isolators: NonNegativeInt = 0,
         max_samples: NonNegativeInt = 0,
         epsilon: int = DEFAULT_EPSILON,
         model_type: Type = Type.CP,
+        encoding: FeatureVar.Encoding = FeatureVar.Encoding.DIRECT,
+        stats: Stats | None = None,
     ) -> None:
         # Initialize the super models.
         BaseModel.__init__(self)
@@ -49,29 +99,81 @@ class Model(BaseModel, FeatureManager, TreeManager, GarbageManager):
             self,
             trees=trees,
             weights=weights,
+            n_isolators=n_isolators,
+            max_samples=max_samples,
         )
-        FeatureManager.__init__(self, mapper=mapper)
+        FeatureManager.__init__(self, mapper=mapper, encoding=encoding)
         GarbageManager.__init__(self)
 
         self._set_weights(weights=weights)
         self._max_samples = max_samples
         self._epsilon = epsilon
         self._scores = {}
-        self._set_builder(model_type=model_type)
+        self._stats = Stats(enabled=False) if stats is None else stats
+        self._set_builder(model_type=model_type, encoding=encoding)
+
+    @property
+    def stats(self) -> Stats:
+        return self._stats
+
+    def footprint(self) -> Footprint:
+        # The query layer is measured by adding the one of an L1
+        # query on the first class, and clearing it right after.
+        if self._garbage:
+            msg = "The footprint cannot be measured during a query."
+            raise ValueError(msg)
+        groups = self._get_footprint_groups()
+        n_vars, n_constrs, n_nonzeros = self.measure()
+        self.add_objective(np.zeros(self.n_columns), norm=1)
+        self.set_majority_class(y=0)
+        after = self.measure()
+        query = Size(
+            n_vars=after[0] - n_vars,
+            n_constrs=after[1] - n_constrs,
+            n_nonzeros=after[2] - n_nonzeros,
+            n_objects=len(self._garbage),
+        )
+        self.cleanup()
+        estimators = measure_trees(self.estimators)
+        isolators = measure_trees(self.isolators)
+        features = measure_features(v.feature for v in self.mapper.values())
+        return Footprint(
+            estimators=groups[Group.ESTIMATORS] + estimators,
+            isolators=groups[Group.ISOLATORS] + isolators,
+            features=groups[Group.FEATURES] + features,
+            query=query,
+        ).charge(COST)
 
     def build(self) -> None:
-        self.build_features(self)
-        self.build_trees(self)
-        self._builder.build(self, trees=self.trees, mapper=self.mapper)
+        with self._stats.stage("features", self):
+            self.build_features(self)
+        with self._stats.stage("trees", self):
+            self.build_trees(self)
+        with self._stats.stage("builder", self):
+            self._builder.build(self, trees=self.trees, mapper=self.mapper)
+        with self._stats.stage("isolation", self):
+            self._set_isolation()
+        with self._stats.stage("objective", self):
+            self._set_terms()
 
     def add_objective(
         self,
         x: Array1D,
         *,
-        norm: int = 1,
+        norm: Norm = 1,
     ) -> None:
-        objective = self._add_objective(x=x, norm=norm)
-        self.Minimize(objective)
+        costs = self._add_objective(x=x, norm=norm)
+        if np.isinf(norm):
+            variables = [self._set_max_distance(costs)]
+            coefs = np.ones(1, dtype=np.int64)
+            offset = 0
+        else:
+            variables = self._objective_vars
+            coefs, offset = self._get_terms(costs)
+        self._write_objective(variables, coefs, offset=offset)
+        self._objective = (
+            cp.LinearExpr.WeightedSum(variables, coefs.tolist()) + offset
+        )
 
     @validate_call
     def set_majority_class(
@@ -86,10 +188,16 @@ class Model(BaseModel, FeatureManager, TreeManager, GarbageManager):
 
         self._set_majority_class(y, op=op)
 
-    def _set_builder(self, model_type: Type) -> None:
-        match model_type:
-            case Model.Type.CP:
+    def _set_builder(
+        self,
+        model_type: Type,
+        encoding: FeatureVar.Encoding,
+    ) -> None:
+        match model_type, encoding:
+            case Model.Type.CP, FeatureVar.Encoding.DIRECT:
                 self._builder = ModelBuilderFactory.CP()
+            case Model.Type.CP, FeatureVar.Encoding.ORDER:
+                self._builder = ModelBuilderFactory.ORDER()
 
     def _set_majority_class(
         self,
@@ -102,78 +210,228 @@ class Model(BaseModel, FeatureManager, TreeManager, GarbageManager):
                 continue
 
             rhs = self._epsilon if class_ < y else 0
-            lhs = cp.LinearExpr.WeightedSum(
-                [self.function[op, y], self.function[op, class_]],
-                [1, -1],
+            self._scores[op, class_] = self.add_margin(
+                self, y=y, c=class_, rhs=rhs, op=op
             )
-            self._scores[op, class_] = self.Add(lhs >= rhs)
             self.add_garbage(self._scores[op, class_])
 
+    def _set_isolation(self) -> None:
+        if self.n_isolators == 0:
+            return
+
+        min_length = round(self.min_length * self.LENGTH_SCALE)
+        self.Add(self.length >= min_length)
+
+    def _get_footprint_groups(self) -> dict[Group, Size]:
+        # The variables of each constraint are gathered from the
+        # proto, the negated literals included. The constraints
+        # cleared by the past queries have no variables.
+        proto = self.Proto()
+        names = [variable.name for variable in proto.variables]
+        binaries = np.array(
+            [tuple(v.domain) == BOOL_DOMAIN for v in proto.variables],
+            dtype=np.bool_,
+        )
+        indices: list[int] = []
+        indptr = [0]
+        nonzeros: list[int] = []
+        for constraint in proto.constraints:
+            literals = list(constraint.enforcement_literal)
+            n_nonzeros = len(literals)
+            kind = constraint.WhichOneof("constraint")
+            body = None if kind is None else getattr(constraint, kind)
+            for field in ("vars", "literals"):
+                if body is not None and hasattr(body, field):
+                    literals.extend(getattr(body, field))
+                    n_nonzeros += len(getattr(body, field))
+            if body is not None and hasattr(body, "exprs"):
+                for expr in body.exprs:
+                    literals.extend(expr.vars)
+                n_nonzeros += len(body.exprs)
+            indices.extend(i if i >= 0 else -i - 1 for i in literals)
+            indptr.append(len(indices))
+            nonzeros.append(n_nonzeros)
+        groups = get_groups(
+            names,
+            n_estimators=self.n_estimators,
+            fmt=self.TREE_VAR_FMT,
+        )
+        return attribute(
+            groups,
+            binaries,
+            np.array(indptr, dtype=np.intp),
+            np.array(indices, dtype=np.intp),
+            np.array(nonzeros, dtype=np.intp),
+        )
+
     def cleanup(self) -> None:
         self.remove_garbage()
 
-    def _add_objective(self, x: Array1D, norm: int) -> cp.ObjLinearExprT:
-        if x.size != self.mapper.n_columns:
-            msg = f"Expected {self.mapper.n_columns} values, got {x.size}"
-            raise ValueError(msg)
-        if norm != 1:
-            msg = f"Unsupported norm: {norm}"
-            raise ValueError(msg)
-        x_arr = np.asarray(x, dtype=float).ravel()
+    def _set_terms(self) -> None:
+        order = self.encoding == FeatureVar.Encoding.ORDER
+        variables: list[cp.IntVar] = []
+        columns: list[NonNegativeInt] = []
+        bounds: list[tuple[float, float]] = []
+        kinds: list[tuple[bool, bool, bool]] = []
 
-        variables = self.mapper.values()
-        objective: cp.LinearExpr = 0  # type: ignore[assignment]
+        def add(
+            k: NonNegativeInt,
+            cells: list[tuple[float, float]],
+            literals: list[cp.IntVar],
+            kind: tuple[bool, bool, bool],
+        ) -> None:
+            variables.extend(literals)
+            columns.extend([k] * len(cells))
+            bounds.extend(cells)
+            kinds.extend([kind] * len(cells))
+
+        # The binary variables are order encoded: the variable is
+        # the literal of the second cell.
+        binary = [(0.0, 0.0), (1.0, 1.0)]
         k = 0
-        for v in variables:
+        for v in self.mapper.values():
             if v.is_one_hot_encoded:
                 for code in v.codes:
-                    objective += self.L1(x_arr[k], v, code=code)
+                    add(k, binary, [v.xget(code)], (True, False, True))
                     k += 1
-            else:
-                objective += self.L1(x_arr[k], v)
+                continue
+            if v.is_binary:
+                add(k, binary, [v.xget()], (True, False, True))
                 k += 1
-        return objective
+                continue
+            levels = list(map(float, v.levels))
+            if v.is_continuous:
+                cells = list(itertools.pairwise(levels))
+            else:
+                cells = [(level, level) for level in levels]
+            if order:
+                literals = list(v.order)
+            else:
+                literals = [v.mget(i) for i in range(len(cells))]
+            add(k, cells, literals, (False, v.is_discrete, order))
+            k += 1
+
+        self._cell_columns = np.array(columns, dtype=np.intp)
+        self._cell_bounds = np.array(bounds, dtype=np.float64)
+        self._cell_starts = np.searchsorted(
+            self._cell_columns, np.arange(self.n_columns)
+        )
+        self._cell_indices = np.arange(len(columns)) - np.repeat(
+            self._cell_starts, np.diff(self._cell_starts, append=len(columns))
+        )
+        binaries, discretes, increments = np.array(kinds, dtype=np.bool_).T
+        self._cell_binaries = binaries
+        self._cell_discretes = discretes
+        self._cell_increments = increments
+        self._cell_constants = increments & (self._cell_indices == 0)
+        self._objective_vars = variables
+        self._objective_indices = [v.Index() for v in variables]
+        self._objective_starts = np.searchsorted(
+            self._cell_columns[~self._cell_constants],
+            np.arange(self.n_columns + 1),
+        )
 
-    def L1(
+    def _write_objective(
         self,
-        x: np.float64,
-        v: FeatureVar,
-        code: Key | None = None,
-    ) -> cp.LinearExpr:
-        obj_exprs: list[cp.LinearExpr] = []
-        obj_coefs: list[int] = []
-        if v.is_discrete:
-            j = int(np.searchsorted(v.levels, x, side="left"))
-            u = v.objvarget()
-            # self.add_garbage(self.AddAbsEquality(u, j- v.xget())) noqa: ERA001
-            self.add_garbage(self.Add(u >= j - v.xget()))
-            self.add_garbage(self.Add(u >= v.xget() - j))
-            obj_exprs.append(u)
-            obj_coefs.append(self._obj_scale)
-        elif v.is_continuous:
-            j = int(np.searchsorted(v.levels, x, side="left"))
-            variables = [v.mget(i) for i in range(len(v.levels) - 1)]
-            intervals_cost = np.zeros(len(v.levels) - 1, dtype=int)
-            for i in range(len(intervals_cost)):
-                if v.levels[i] < x <= v.levels[i + 1]:
-                    continue
-                if v.levels[i] > x:
-                    intervals_cost[i] = int(
-                        abs(x - v.levels[i]) * self._obj_scale
-                    )
-                elif v.levels[i + 1] < x:
-                    intervals_cost[i] = int(
-                        abs(x - v.levels[i + 1]) * self._obj_scale
-                    )
-            obj_expr = cp.LinearExpr.WeightedSum(variables, intervals_cost)
-            obj_exprs.append(obj_expr)
-            obj_coefs.append(1)
-        elif v.is_one_hot_encoded:
-            obj_expr = v.xget(code) if x == 0.0 else 1 - v.xget(code)
-            obj_exprs.append(obj_expr)
-            obj_coefs.append(self._obj_scale)
+        variables: list[cp.IntVar],
+        coefs: np.ndarray[tuple[int], np.dtype[np.int64]],
+        *,
+        offset: int,
+    ) -> None:
+        # The objective is written in the proto of the model directly.
+        if variables is self._objective_vars:
+            indices = self._objective_indices
         else:
-            obj_expr = v.xget() if x == 0.0 else 1 - v.xget()
-            obj_exprs.append(obj_expr)
-            obj_coefs.append(self._obj_scale)
-        return cp.LinearExpr.WeightedSum(obj_exprs, obj_coefs)
+            indices = [v.Index() for v in variables]
+        self.clear_objective()  # type: ignore[no-untyped-call]
+        objective = self.Proto().objective
+        objective.vars.extend(indices)
+        objective.coeffs.extend(coefs.tolist())
+        objective.offset = offset
+        objective.scaling_factor = 1.0
+
+    def _add_objective(
+        self,
+        x: Array1D,
+        norm: Norm,
+    ) -> np.ndarray[tuple[int], np.dtype[np.int64]]:
+        if x.size != self.mapper.n_columns:
+            msg = f"Expected {self.mapper.n_columns} values, got {x.size}"
+            raise ValueError(msg)
+        x = np.asarray(x, dtype=np.float64).ravel()
+        match norm:
+            case 1:
+                return self.L1(x)
+            case 2:
+                return self.L2(x)
+            case _ if np.isinf(norm):
+                return self.Linf(x)
+            case _:
+                msg = f"Unsupported norm: {norm}"
+                raise ValueError(msg)
+
+    def L1(self, x: Array1D) -> np.ndarray[tuple[int], np.dtype[np.int64]]:
+        # Discrete features cost the number of levels moved.
+        distances = self._get_distances(x)
+        xs = x[self._cell_columns]
+        below = self._cell_discretes & (self._cell_bounds[:, 1] < xs)
+        levels = np.add.reduceat(below.astype(np.intp), self._cell_starts)
+        moved = np.abs(self._cell_indices - levels[self._cell_columns])
+        distances = np.where(self._cell_discretes, moved, distances)
+        return self._scale(distances)
+
+    def L2(self, x: Array1D) -> np.ndarray[tuple[int], np.dtype[np.int64]]:
+        return self._scale(self._get_distances(x) ** 2)
+
+    def Linf(self, x: Array1D) -> np.ndarray[tuple[int], np.dtype[np.int64]]:
+        return self._scale(self._get_distances(x))
+
+    def _get_distances(self, x: Array1D) -> Array1D:
+        # Distance of x to each cell. Binary and one-hot encoded
+        # variables cost 1 when flipped.
+        xs = x[self._cell_columns]
+        xs = np.where(self._cell_binaries, xs != 0.0, xs)
+        lower, upper = self._cell_bounds.T
+        return np.maximum(lower - xs, 0.0) + np.maximum(xs - upper, 0.0)
+
+    def _scale(
+        self,
+        distances: Array1D,
+    ) -> np.ndarray[tuple[int], np.dtype[np.int64]]:
+        return (distances * self._obj_scale).astype(np.int64)
+
+    def _get_terms(
+        self,
+        costs: np.ndarray[tuple[int], np.dtype[np.int64]],
+    ) -> tuple[np.ndarray[tuple[int], np.dtype[np.int64]], int]:
+        # The cost of the constant cells is paid in the offset, and
+        # an order literal pays the increment from the previous cell.
+        constants = self._cell_constants
+        increments = np.diff(costs, prepend=0)
+        coefs = np.where(self._cell_increments, increments, costs)
+        return coefs[~constants], int(costs[constants].sum())
+
+    def _set_max_distance(
+        self,
+        costs: np.ndarray[tuple[int], np.dtype[np.int64]],
+    ) -> cp.IntVar:
+        # The maximum distance is above the cost of each column, and
+        # its domain is bounded by the extreme costs of the columns.
+        if self._max_var is None:
+            self._max_var = self.NewIntVar(0, 0, "max_distance")
+        t = self._max_var
+        coefs = self._get_terms(costs)[0].tolist()
+        offsets = np.add.reduceat(
+            np.where(self._cell_constants, costs, 0), self._cell_starts
+        )
+        starts = self._objective_starts.tolist()
+        for k in range(self.n_columns):
+            a, b = starts[k], starts[k + 1]
+            cost = cp.LinearExpr.WeightedSum(
+                self._objective_vars[a:b], coefs[a:b]
+            )
+            self.add_garbage(self.Add(t >= cost + int(offsets[k])))
+        lower = np.minimum.reduceat(costs, self._cell_starts).max()
+        upper = np.maximum.reduceat(costs, self._cell_starts).max()
+        t.Proto().domain[:] = [int(lower), int(upper)]
+        return t
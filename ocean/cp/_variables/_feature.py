@@ -1,3 +1,7 @@
+import itertools
+import warnings
+from enum import Enum
+
 from ortools.sat.python import cp_model as cp
 
 from ...feature import Feature
@@ -12,23 +16,48 @@ class FeatureVar(Var, FeatureKeeper):
     _x: cp.IntVar
     _u: dict[Key, cp.IntVar]
     _mu: list[cp.IntVar]
-    _objvar: cp.IntVar
 
-    def __init__(self, feature: Feature, name: str) -> None:
+    # Order literals b[1], ..., b[m] of the numeric features:
+    # b[j] is true if and only if x >= j.
+    _order: list[cp.IntVar]
+
+    class Encoding(Enum):
+        DIRECT = "DIRECT"
+        ORDER = "ORDER"
+
+    def __init__(
+        self,
+        feature: Feature,
+        name: str,
+        *,
+        encoding: Encoding = Encoding.DIRECT,
+    ) -> None:
         Var.__init__(self, name=name)
         FeatureKeeper.__init__(self, feature=feature)
+        self._encoding = encoding
+
+    @property
+    def encoding(self) -> Encoding:
+        return self._encoding
+
+    @property
+    def order(self) -> tuple[cp.IntVar, ...]:
+        if not self.is_numeric or self._encoding != FeatureVar.Encoding.ORDER:
+            msg = "The order literals are only supported for numeric "
+            msg += "features with the order encoding"
+            raise ValueError(msg)
+        return tuple(self._order)
 
     def build(self, model: BaseModel) -> None:
         if not self.is_one_hot_encoded:
             self._x = self._add_x(model)
-        if self.is_numeric:
+        if self.is_numeric and self._encoding == FeatureVar.Encoding.ORDER:
+            self._order = self._set_order(model)
+        elif self.is_numeric:
             if self.is_continuous:
                 mu = self._set_mu(model, m=len(self.levels) - 1)
             else:
                 mu = self._set_mu(model, m=len(self.levels))
-                self._objvar = model.NewIntVar(
-                    0, len(self.levels) - 1, f"u_{self._name}"
-                )
             model.add_map_domain(self.xget(), mu)
             self._mu = mu
         elif self.is_one_hot_encoded:
@@ -49,15 +78,35 @@ class FeatureVar(Var, FeatureKeeper):
         if not self.is_numeric:
             msg = "The 'mget' method is only supported for numeric features"
             raise ValueError(msg)
+        if self._encoding != FeatureVar.Encoding.DIRECT:
+            msg = "The 'mget' method is only supported for the direct encoding"
+            raise ValueError(msg)
         return self._mu[key]
 
+    def oget(self, j: int) -> cp.IntVar:
+        order = self.order
+        if not 1 <= j <= len(order):
+            msg = f"Expected 1 <= j <= {len(order)}, got {j}"
+            raise ValueError(msg)
+        return order[j - 1]
+
     def objvarget(self) -> cp.IntVar:
+        # Deprecated: the discrete features no longer have an auxiliary
+        # objective variable, since the number of levels moved is paid
+        # on the literals of mget. The level variable is returned.
+        msg = "The 'objvarget' method is deprecated, "
+        msg += "use 'xget' for the level and 'mget' for its literals"
+        warnings.warn(msg, category=DeprecationWarning, stacklevel=2)
         if not self.is_discrete:
             msg = (
                 "The 'objvarget' method is only supported for discrete features"
             )
             raise ValueError(msg)
-        return self._objvar
+        if self._encoding != FeatureVar.Encoding.DIRECT:
+            msg = "The 'objvarget' method is only supported "
+            msg += "for the direct encoding"
+            raise ValueError(msg)
+        return self.xget()
 
     def _add_x(self, model: BaseModel) -> cp.IntVar:
         name = self.X_VAR_NAME_FMT.format(name=self._name)
@@ -84,6 +133,18 @@ class FeatureVar(Var, FeatureKeeper):
     def _set_mu(self, model: BaseModel, m: int) -> list[cp.IntVar]:
         return [model.NewBoolVar(f"{self._name}_mu_{i}") for i in range(m)]
 
+    def _set_order(self, model: BaseModel) -> list[cp.IntVar]:
+        # x is the number of true literals, and the literals
+        # are ordered: b[j + 1] implies b[j].
+        m = len(self.levels) - (2 if self.is_continuous else 1)
+        order = [
+            model.NewBoolVar(f"{self._name}_b_{j}") for j in range(1, m + 1)
+        ]
+        model.Add(self._x == cp.LinearExpr.Sum(order))
+        for prev, b in itertools.pairwise(order):
+            model.AddImplication(b, prev)
+        return order
+
     def _add_one_hot_encoded(
         self,
         model: BaseModel,
@@ -1,13 +1,23 @@
 from functools import partial
 
+from ._generate import Generator
 from ._load import Loader
 
 loader = Loader()
+generator = Generator()
 
 
 load_credit = partial(loader.load, name="Credit")
 load_adult = partial(loader.load, name="Adult")
 load_compas = partial(loader.load, name="COMPAS")
+generate = generator.generate
 
 
-__all__ = ["load_adult", "load_compas", "load_credit"]
+__all__ = [
+    "Generator",
+    "Loader",
+    "generate",
+    "load_adult",
+    "load_compas",
+    "load_credit",
+]
@@ -0,0 +1,160 @@
+from dataclasses import dataclass
+from typing import Any, Literal, overload
+
+import numpy as np
+import pandas as pd
+
+from ..feature import parse_features
+from ..typing import NonNegativeInt, PositiveInt
+from ._load import Dataset, Loaded
+
+MIN_CLASSES: int = 2
+
+
+@dataclass
+class Generator:
+    # Number of features of each type.
+    n_continuous: NonNegativeInt = 4
+    n_discrete: NonNegativeInt = 2
+    n_binary: NonNegativeInt = 2
+    n_encoded: NonNegativeInt = 2
+
+    # Number of levels of the discrete features
+    # and of categories of the one-hot encoded ones.
+    n_levels: PositiveInt = 4
+    n_categories: PositiveInt = 4
+
+    # Standard deviation of the noise on the latent scores
+    # from which the classes are drawn.
+    noise: float = 0.1
+
+    @overload
+    def generate(
+        self,
+        n_samples: PositiveInt,
+        *,
+        n_classes: PositiveInt = 2,
+        weights: tuple[float, ...] | None = None,
+        seed: int | None = None,
+        scale: bool = False,
+        return_mapper: Literal[True] = True,
+    ) -> Loaded: ...
+
+    @overload
+    def generate(
+        self,
+        n_samples: PositiveInt,
+        *,
+        n_classes: PositiveInt = 2,
+        weights: tuple[float, ...] | None = None,
+        seed: int | None = None,
+        scale: bool = False,
+        return_mapper: Literal[False],
+    ) -> Dataset: ...
+
+    def generate(
+        self,
+        n_samples: PositiveInt,
+        *,
+        n_classes: PositiveInt = 2,
+        weights: tuple[float, ...] | None = None,
+        seed: int | None = None,
+        scale: bool = False,
+        return_mapper: bool = True,
+    ) -> Dataset | Loaded:
+        proportions = self._get_proportions(n_classes, weights)
+        generator = np.random.default_rng(seed)
+        data, discretes, encoded = self._generate_features(
+            generator,
+            n_samples,
+        )
+        data, mapper = parse_features(
+            data,
+            discretes=discretes,
+            encoded=encoded,
+            scale=scale,
+        )
+        y = self._generate_target(generator, data, proportions)
+
+        if return_mapper:
+            return (data, y), mapper
+        return data, y
+
+    def _generate_features(
+        self,
+        generator: np.random.Generator,
+        n_samples: PositiveInt,
+    ) -> tuple[pd.DataFrame, tuple[str, ...], tuple[str, ...]]:
+        columns: dict[str, Any] = {}
+        for i in range(self.n_continuous):
+            columns[f"continuous_{i}"] = generator.uniform(-1, 1, n_samples)
+
+        discretes: list[str] = []
+        for i in range(self.n_discrete):
+            # Strictly increasing levels, unevenly spaced.
+            steps = generator.uniform(0.5, 2.0, self.n_levels)
+            levels = np.cumsum(steps).round(2)
+            name = f"discrete_{i}"
+            columns[name] = generator.choice(levels, n_samples)
+            discretes.append(name)
+
+        for i in range(self.n_binary):
+            columns[f"binary_{i}"] = generator.integers(
+                0,
+                2,
+                n_samples,
+                dtype=np.int8,
+            )
+
+        encoded: list[str] = []
+        dtype = pd.CategoricalDtype([f"c{k}" for k in range(self.n_categories)])
+        for i in range(self.n_encoded):
+            # The categories are drawn as codes, which is far
+            # lighter than an array of strings on tall datasets.
+            codes = generator.integers(0, self.n_categories, n_samples)
+            name = f"encoded_{i}"
+            columns[name] = pd.Categorical.from_codes(codes, dtype=dtype)
+            encoded.append(name)
+
+        if not columns:
+            msg = "At least one feature is required."
+            raise ValueError(msg)
+        return pd.DataFrame(columns), tuple(discretes), tuple(encoded)
+
+    def _generate_target(
+        self,
+        generator: np.random.Generator,
+        data: pd.DataFrame,
+        proportions: np.ndarray[tuple[int], np.dtype[np.float64]],
+    ) -> "pd.Series[int]":
+        # The classes are the quantiles of a noisy random projection
+        # of the data: the trees have a structure to learn and the
+        # proportions of the classes are the requested ones. The
+        # projection is accumulated column by column so that wide
+        # datasets are never copied into a single dense matrix.
+        n_samples, n_columns = data.shape
+        scores = generator.normal(scale=self.noise, size=n_samples)
+        coefs = generator.normal(size=n_columns)
+        for j, coef in enumerate(coefs):
+            scores += coef * data.iloc[:, j].to_numpy(dtype=np.float64)
+        quantiles = np.quantile(scores, np.cumsum(proportions)[:-1])
+        return pd.Series(np.digitize(scores, quantiles)).astype(int)
+
+    @staticmethod
+    def _get_proportions(
+        n_classes: PositiveInt,
+        weights: tuple[float, ...] | None,
+    ) -> np.ndarray[tuple[int], np.dtype[np.float64]]:
+        if n_classes < MIN_CLASSES:
+            msg = f"At least two classes are required, got {n_classes}"
+            raise ValueError(msg)
+        if weights is None:
+            return np.full(n_classes, 1 / n_classes)
+        if len(weights) != n_classes:
+            msg = f"Expected {n_classes} weights, got {len(weights)}"
+            raise ValueError(msg)
+        proportions = np.asarray(weights, dtype=np.float64)
+        if np.any(proportions <= 0):
+            msg = "The weights of the classes must be positive."
+            raise ValueError(msg)
+        return proportions / proportions.sum()
@@ -1,4 +1,8 @@
-from dataclasses import dataclass
+import hashlib
+import os
+import pickle  # noqa: S403
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Literal, overload
 
 import pandas as pd
@@ -10,10 +14,37 @@ Dataset = tuple[pd.DataFrame, "pd.Series[int]"]
 Loaded = tuple[Dataset, Mapper[Feature]]
 
 
+def _default_cache() -> Path | None:
+    # OCEAN_CACHE overrides the directory, and an empty value disables
+    # the cache. A relative XDG_CACHE_HOME is ignored, as in the spec.
+    if "OCEAN_CACHE" in os.environ:
+        cache = os.environ["OCEAN_CACHE"]
+        return Path(cache) if cache else None
+    base = Path(os.environ.get("XDG_CACHE_HOME", ""))
+    if not base.is_absolute():
+        base = Path.home() / ".cache"
+    return base / "ocean"
+
+
 @dataclass
 class Loader:
+    """
+    Download and parse the datasets, with a cache on disk.
+
+    The parsed datasets are cached under ``$OCEAN_CACHE`` when it is
+    set, else under ``$XDG_CACHE_HOME/ocean``, or ``~/.cache/ocean``.
+    Setting ``OCEAN_CACHE`` to an empty value, or passing
+    ``cache=None``, disables the cache.
+    """
+
     URL: str = "https://www.github.com/eminyous/ocean-datasets/blob/main"
 
+    # Directory of the parsed datasets, None to disable the cache.
+    # Each dataset is pickled with its mapper next to the SHA-256
+    # checksum of the pickle, and a file that does not match its
+    # checksum is downloaded and parsed again.
+    cache: Path | None = field(default_factory=_default_cache)
+
     @overload
     def load(
         self,
@@ -39,6 +70,27 @@ class Loader:
         scale: bool = False,
         return_mapper: bool = True,
     ) -> Dataset | Loaded:
+        (data, y), mapper = self._load(name, scale=scale)
+
+        if return_mapper:
+            return (data, y), mapper
+        return data, y
+
+    def read(self, path: str) -> pd.DataFrame:
+        url = f"{self.URL}/{path}?raw=true"
+        return pd.read_csv(url, header=[0, 1])
+
+    def _load(self, name: str, *, scale: bool) -> Loaded:
+        if self.cache is None:
+            return self._parse(name, scale=scale)
+        path = self.cache / f"{name}-{'scaled' if scale else 'raw'}.pkl"
+        loaded = self._read_cache(path)
+        if loaded is None:
+            loaded = self._parse(name, scale=scale)
+            self._write_cache(path, loaded)
+        return loaded
+
+    def _parse(self, name: str, *, scale: bool) -> Loaded:
         path = f"{name}/{name}.csv"
         data = self.read(path)
         types: pd.Index[str] = data.columns.get_level_values(1)
@@ -55,11 +107,35 @@ class Loader:
             encoded=encoded,
             scale=scale,
         )
+        return (data, y), mapper
 
-        if return_mapper:
-            return (data, y), mapper
-        return data, y
+    @staticmethod
+    def _read_cache(path: Path) -> Loaded | None:
+        checksum = path.with_suffix(".sha256")
+        if not (path.exists() and checksum.exists()):
+            return None
+        content = path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        if digest != checksum.read_text(encoding="utf-8").strip():
+            return None
+        try:
+            loaded: Loaded = pickle.loads(content)  # noqa: S301
+        except (pickle.UnpicklingError, AttributeError, ImportError):
+            # The pickle was written by another version of the package.
+            return None
+        return loaded
 
-    def read(self, path: str) -> pd.DataFrame:
-        url = f"{self.URL}/{path}?raw=true"
-        return pd.read_csv(url, header=[0, 1])
+    @staticmethod
+    def _write_cache(path: Path, loaded: Loaded) -> None:
+        # The files are replaced atomically so that concurrent loads
+        # never read a partial pickle.
+        content = pickle.dumps(loaded, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha256(content).hexdigest()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for target, data in (
+            (path, content),
+            (path.with_suffix(".sha256"), f"{digest}\n".encode()),
+        ):
+            temporary = target.with_suffix(f"{target.suffix}.{os.getpid()}")
+            temporary.write_bytes(data)
+            temporary.replace(target)
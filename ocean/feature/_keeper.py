@@ -8,6 +8,10 @@ class FeatureKeeper:
     def __init__(self, feature: Feature) -> None:
         self._feature = feature
 
+    @property
+    def feature(self) -> Feature:
+        return self._feature
+
     @property
     def is_continuous(self) -> bool:
         return self._feature.is_continuous
@@ -1,14 +1,17 @@
 from ._base import BaseModel
-from ._explainer import Explainer
+from ._env import EnvPool
+from ._explainer import Explainer, Incumbent
 from ._explanation import Explanation
 from ._model import Model
 from ._variables import FeatureVar, TreeVar
 
 __all__ = [
     "BaseModel",
+    "EnvPool",
     "Explainer",
     "Explanation",
     "FeatureVar",
+    "Incumbent",
     "Model",
     "TreeVar",
 ]
@@ -1,11 +1,23 @@
 from abc import ABC
-from typing import Any, Protocol
+from collections.abc import Sequence
+from typing import Any, Protocol, Self
 
 import gurobipy as gp
+import numpy as np
+
+from ._env import EnvPool
+
+# Names of the parameters of Gurobi.
+PARAMS: tuple[str, ...] = tuple(
+    name for name in dir(gp.GRB.Param) if not name.startswith("_")
+)
 
 
 class BaseModel(ABC, gp.Model):
     def __init__(self, name: str = "", env: gp.Env | None = None) -> None:
+        # The models without an environment borrow one from the
+        # default pool instead of starting their own.
+        env = EnvPool.default().get() if env is None else env
         gp.Model.__init__(self, name=name, env=env)
 
     def __setattr__(self, name: str, value: Any) -> None:  # noqa: ANN401
@@ -15,6 +27,56 @@ class BaseModel(ABC, gp.Model):
         for variable in variables:
             variable.build(model=self)
 
+    def copy_model(self, env: gp.Env) -> Self:
+        # Copy of the variables, the linear constraints, the linear
+        # objective and the parameters of the model into a new model
+        # of the same class.
+        # gp.Model.copy returns a plain gp.Model, which cannot hold
+        # the attributes of the subclasses. The attributes are shared
+        # with the copy: the subclasses replace the ones that refer to
+        # the variables of the model.
+        self.update()
+        if self.NumQConstrs + self.NumGenConstrs + self.NumSOS > 0:
+            msg = "Only the linear constraints of a model can be copied."
+            raise ValueError(msg)
+        if self.NumQNZs > 0:
+            msg = "Only the linear objective of a model can be copied."
+            raise ValueError(msg)
+        model = type(self).__new__(type(self))
+        gp.Model.__init__(model, name=self.ModelName, env=env)
+        state = {k: v for k, v in vars(self).items() if k not in vars(model)}
+        vars(model).update(state)
+        variables = self.getVars()
+        x = model.addMVar(
+            len(variables),
+            lb=np.asarray(self.getAttr("LB", variables)),
+            ub=np.asarray(self.getAttr("UB", variables)),
+            obj=np.asarray(self.getAttr("Obj", variables)),
+            vtype=np.asarray(self.getAttr("VType", variables)),
+            name=self.getAttr("VarName", variables),
+        )
+        constrs = self.getConstrs()
+        if constrs:
+            model.addMConstr(
+                self.getA(),
+                x,
+                np.asarray(self.getAttr("Sense", constrs)),
+                np.asarray(self.getAttr("RHS", constrs)),
+            )
+        model.ModelSense = self.ModelSense
+        model.ObjCon = self.ObjCon
+        for name in PARAMS:
+            value = self.getParamInfo(name)[2]
+            if model.getParamInfo(name)[2] != value:
+                model.setParam(name, value)
+        model.update()
+        return model
+
+    def measure(self) -> tuple[int, int, int]:
+        self.update()
+        n_constrs = self.NumConstrs + self.NumQConstrs + self.NumGenConstrs
+        return self.NumVars, n_constrs, self.NumNZs
+
 
 class Var(Protocol):
     _name: str
@@ -23,3 +85,10 @@ class Var(Protocol):
         self._name = name
 
     def build(self, model: BaseModel) -> None: ...
+
+
+def remap(mvar: gp.MVar, variables: Sequence[gp.Var]) -> gp.MVar:
+    # The variables of a copy of the model at the indices of the
+    # variables of the one-dimensional mvar.
+    items = [variables[v.index] for v in mvar.tolist()]
+    return gp.MVar.fromlist(items)
@@ -1,12 +1,15 @@
+import copy
 import warnings
-from collections.abc import Iterable
-from typing import Protocol
+from collections.abc import Iterable, Mapping
+from typing import Protocol, Self
 
 import numpy as np
 
 from ...abc import Mapper
 from ...tree._node import Node
+from ...typing import Array1D, NonNegativeInt
 from .._base import BaseModel
+from .._typing import Constraint
 from .._variables import FeatureVar, TreeVar
 
 
@@ -39,8 +42,21 @@ class MixedIntegerProgramBuilder(ModelBuilder):
 
     _epsilon: float
 
+    # Trees and features of the last build.
+    _trees: tuple[TreeVar, ...]
+    _mapper: Mapper[FeatureVar]
+
+    # Epsilon of the splits of each continuous feature, found once
+    # so that every split of the feature uses the same one.
+    _epsilons: dict[FeatureVar, float]
+
     def __init__(self, epsilon: float = DEFAULT_EPSILON) -> None:
         self._epsilon = epsilon
+        self._epsilons = {}
+
+    @property
+    def epsilons(self) -> Mapping[FeatureVar, float]:
+        return self._epsilons
 
     def build(
         self,
@@ -49,9 +65,34 @@ class MixedIntegerProgramBuilder(ModelBuilder):
         trees: Iterable[TreeVar],
         mapper: Mapper[FeatureVar],
     ) -> None:
-        for tree in trees:
+        self._trees = tuple(trees)
+        self._mapper = mapper
+        for tree in self._trees:
             self._build(model, tree=tree, mapper=mapper)
 
+    def clone(
+        self,
+        *,
+        trees: Iterable[TreeVar],
+        mapper: Mapper[FeatureVar],
+    ) -> Self:
+        builder: Self = copy.copy(self)
+        builder.rebind(trees=trees, mapper=mapper)
+        return builder
+
+    def rebind(
+        self,
+        *,
+        trees: Iterable[TreeVar],
+        mapper: Mapper[FeatureVar],
+    ) -> None:
+        # The trees and the features of a copy of the model replace
+        # the ones of the build, with the same epsilons.
+        clones = dict(zip(self._mapper.values(), mapper.values(), strict=True))
+        self._epsilons = {clones[v]: e for v, e in self._epsilons.items()}
+        self._trees = tuple(trees)
+        self._mapper = mapper
+
     def _build(
         self,
         model: BaseModel,
@@ -93,8 +134,8 @@ class MixedIntegerProgramBuilder(ModelBuilder):
         elif var.is_one_hot_encoded:
             self._eset(model, tree=tree, node=node, var=var)
 
-    @staticmethod
     def _bset(
+        self,
         model: BaseModel,
         *,
         tree: TreeVar,
@@ -107,8 +148,8 @@ class MixedIntegerProgramBuilder(ModelBuilder):
         #   :: x <= 1 - flow[node.left],
         #   :: x >= flow[node.right].
         x = var.xget()
-        model.addConstr(x <= 1 - tree[node.left.node_id])
-        model.addConstr(x >= tree[node.right.node_id])
+        self._add(model, x <= 1 - tree[node.left.node_id])
+        self._add(model, x >= tree[node.right.node_id])
 
     def _cset(
         self,
@@ -140,16 +181,16 @@ class MixedIntegerProgramBuilder(ModelBuilder):
         #   :: mu[j] <= 1 - flow[node.left],
         #   :: mu[j] >= epsilon * flow[node.right].
 
-        epsilon = self._find_best_epsilon(model, var, self._epsilon)
+        epsilon = self._get_epsilon(model, var)
         threshold = node.threshold
         j = int(np.searchsorted(var.levels, threshold))
 
         if j == 0:  # pragma: no cover
-            model.addConstr(tree[node.left.node_id] == 0.0)
+            self._add(model, tree[node.left.node_id] == 0.0)
             return
 
         if j == var.levels.size:  # pragma: no cover
-            model.addConstr(tree[node.right.node_id] == 0.0)
+            self._add(model, tree[node.right.node_id] == 0.0)
             return
 
         if not np.isclose(threshold, var.levels[j]):  # pragma: no cover
@@ -157,15 +198,15 @@ class MixedIntegerProgramBuilder(ModelBuilder):
             raise ValueError(msg)
 
         mu = var.mget(j - 1)
-        model.addConstr(mu <= 1 - epsilon * tree[node.left.node_id])
-        model.addConstr(mu >= tree[node.right.node_id])
+        self._add(model, mu <= 1 - epsilon * tree[node.left.node_id])
+        self._add(model, mu >= tree[node.right.node_id])
 
         mu = var.mget(j)
-        model.addConstr(mu <= 1 - tree[node.left.node_id])
-        model.addConstr(mu >= epsilon * tree[node.right.node_id])
+        self._add(model, mu <= 1 - tree[node.left.node_id])
+        self._add(model, mu >= epsilon * tree[node.right.node_id])
 
-    @staticmethod
     def _dset(
+        self,
         model: BaseModel,
         *,
         tree: TreeVar,
@@ -197,19 +238,19 @@ class MixedIntegerProgramBuilder(ModelBuilder):
         j = int(np.searchsorted(var.levels, threshold, side="right"))
 
         if j == 0:  # pragma: no cover
-            model.addConstr(tree[node.left.node_id] == 0.0)
+            self._add(model, tree[node.left.node_id] == 0.0)
             return
 
         if j == var.levels.size:  # pragma: no cover
-            model.addConstr(tree[node.right.node_id] == 0.0)
+            self._add(model, tree[node.right.node_id] == 0.0)
             return
 
         mu = var.mget(j - 1)
-        model.addConstr(mu <= 1 - tree[node.left.node_id])
-        model.addConstr(mu >= tree[node.right.node_id])
+        self._add(model, mu <= 1 - tree[node.left.node_id])
+        self._add(model, mu >= tree[node.right.node_id])
 
-    @staticmethod
     def _eset(
+        self,
         model: BaseModel,
         *,
         tree: TreeVar,
@@ -223,8 +264,17 @@ class MixedIntegerProgramBuilder(ModelBuilder):
         #   :: x[code] >= flow[node.right].
 
         x = var.xget(node.code)
-        model.addConstr(x <= 1 - tree[node.left.node_id])
-        model.addConstr(x >= tree[node.right.node_id])
+        self._add(model, x <= 1 - tree[node.left.node_id])
+        self._add(model, x >= tree[node.right.node_id])
+
+    def _add(self, model: BaseModel, constr: Constraint) -> None:  # noqa: PLR6301
+        model.addConstr(constr)
+
+    def _get_epsilon(self, model: BaseModel, var: FeatureVar) -> float:
+        if var not in self._epsilons:
+            epsilon = self._find_best_epsilon(model, var, self._epsilon)
+            self._epsilons[var] = epsilon
+        return self._epsilons[var]
 
     @staticmethod
     def _find_best_epsilon(
@@ -258,5 +308,102 @@ class MixedIntegerProgramBuilder(ModelBuilder):
         return 2 * tol / delta
 
 
+class LazyMixedIntegerProgramBuilder(MixedIntegerProgramBuilder):
+    BINARY_THRESHOLD: float = 0.5
+
+    # Indices of the trees whose split constraints are part of the
+    # model, and of the trees whose split constraints were only added
+    # as lazy constraints during the current solve.
+    _active: set[int]
+    _pending: set[int]
+    _lazy: bool
+
+    def build(
+        self,
+        model: BaseModel,
+        *,
+        trees: Iterable[TreeVar],
+        mapper: Mapper[FeatureVar],
+    ) -> None:
+        # No split constraint is added here: the split constraints
+        # of a tree are only added from the solver callback, once an
+        # incumbent routes through a leaf it cannot reach.
+        self._trees = tuple(trees)
+        self._mapper = mapper
+        self._active = set()
+        self._pending = set()
+        self._lazy = False
+
+        # The epsilon search may change the solver parameters,
+        # which is not allowed from inside a callback.
+        self._epsilons = {}
+        for tree in self._trees:
+            for node in (tree.root, *tree.root.descendants):
+                if node.is_leaf or not mapper[node.feature].is_continuous:
+                    continue
+                self._get_epsilon(model, mapper[node.feature])
+        model.setParam("LazyConstraints", 1)
+
+    def rebind(
+        self,
+        *,
+        trees: Iterable[TreeVar],
+        mapper: Mapper[FeatureVar],
+    ) -> None:
+        # The same active and pending trees, for the variables of a
+        # copy of the model.
+        super().rebind(trees=trees, mapper=mapper)
+        self._active = set(self._active)
+        self._pending = set(self._pending)
+
+    def is_active(self, t: NonNegativeInt) -> bool:
+        return t in self._active
+
+    def add(self, model: BaseModel, *, t: NonNegativeInt) -> None:
+        self._lazy = False
+        self._build(model, tree=self._trees[t], mapper=self._mapper)
+        self._active.add(t)
+
+    def cut(self, model: BaseModel, *, t: NonNegativeInt) -> None:
+        # Gurobi may discard lazy constraints and offer again an
+        # incumbent violating them, so a tree can be cut many times.
+        self._lazy = True
+        self._build(model, tree=self._trees[t], mapper=self._mapper)
+        self._lazy = False
+        self._pending.add(t)
+
+    def flush(self, model: BaseModel) -> None:
+        # Lazy constraints only live for the duration of one solve.
+        # The cuts found are valid for every query, so they are made
+        # part of the model before the next solve.
+        for t in sorted(self._pending):
+            self.add(model, t=t)
+        self._pending.clear()
+
+    def leaf(self, t: NonNegativeInt, x: Array1D) -> Node:
+        # Route the point x through the tree t.
+        node = self._trees[t].root
+        while not node.is_leaf:
+            var = self._mapper[node.feature]
+            if var.is_one_hot_encoded:
+                i = self._mapper.idx.get(node.feature, node.code)
+                go_left = x[i] <= self.BINARY_THRESHOLD
+            elif var.is_numeric:
+                i = self._mapper.idx.get(node.feature)
+                go_left = x[i] <= node.threshold
+            else:
+                i = self._mapper.idx.get(node.feature)
+                go_left = x[i] <= self.BINARY_THRESHOLD
+            node = node.left if go_left else node.right
+        return node
+
+    def _add(self, model: BaseModel, constr: Constraint) -> None:
+        if self._lazy:
+            model.cbLazy(constr)
+        else:
+            model.addConstr(constr)
+
+
 class ModelBuilderFactory:
     MIP: type[MixedIntegerProgramBuilder] = MixedIntegerProgramBuilder
+    LAZY: type[LazyMixedIntegerProgramBuilder] = LazyMixedIntegerProgramBuilder
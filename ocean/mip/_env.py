@@ -0,0 +1,205 @@
+import os
+import threading
+import weakref
+from collections.abc import Mapping
+from enum import Enum
+from types import MappingProxyType, TracebackType
+from typing import Self
+
+import gurobipy as gp
+
+from ..typing import Param
+
+
+class Token:
+    # Object held by a thread for the lifetime of its environment.
+    pass
+
+
+class EnvPool:
+    class Scope(Enum):
+        PROCESS = "PROCESS"
+        THREAD = "THREAD"
+
+    # Parameters of the environments when none are given: the
+    # license banner is not printed, the log of the queries is
+    # still enabled by the verbose flag of explain.
+    DEFAULT_PARAMS: Mapping[str, Param] = MappingProxyType({"LogToConsole": 0})
+
+    # Pool used by the models created without an environment.
+    _default: "EnvPool | None" = None
+    _default_lock: threading.Lock = threading.Lock()
+
+    # Parameters set on each environment before it is started.
+    _params: dict[str, Param]
+
+    # An environment is shared by all the threads of a process, or
+    # owned by a single thread. Gurobi environments are not
+    # thread-safe, so the models of a shared environment must not be
+    # solved concurrently. Each environment is a license checkout.
+    _scope: Scope
+
+    # Environments by process id and, for the thread scope, by
+    # thread id. The environments inherited from the parent of a
+    # forked process are never used nor disposed by the child.
+    _envs: dict[tuple[int, int], gp.Env]
+    _lock: threading.RLock
+
+    # Token of the calling thread: the environment of a thread is
+    # disposed when the thread exits and its token is collected.
+    _local: threading.local
+
+    # Environments owned by a single model, by process id, and the
+    # ones whose model was collected: they are disposed on the next
+    # use of the pool, once the model is freed.
+    _dedicated: list[tuple[int, gp.Env]]
+    _released: list[tuple[int, gp.Env]]
+
+    def __init__(
+        self,
+        params: Mapping[str, Param] | None = None,
+        *,
+        scope: Scope = Scope.PROCESS,
+    ) -> None:
+        self._params = dict(self.DEFAULT_PARAMS if params is None else params)
+        self._scope = scope
+        self._envs = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._dedicated = []
+        self._released = []
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        self._collect()
+        pid = os.getpid()
+        with self._lock:
+            shared = sum(key[0] == pid for key in self._envs)
+            return shared + sum(p == pid for p, _ in self._dedicated)
+
+    @property
+    def params(self) -> dict[str, Param]:
+        return dict(self._params)
+
+    @property
+    def scope(self) -> Scope:
+        return self._scope
+
+    @classmethod
+    def default(cls) -> "EnvPool":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @classmethod
+    def set_default(cls, pool: "EnvPool | None") -> None:
+        # The previous pool is not closed: the models created with
+        # its environments may still be in use.
+        with cls._default_lock:
+            cls._default = pool
+
+    def get(self) -> gp.Env:
+        # The environment of the calling process or thread, started
+        # on first use and then reused: the license is checked out
+        # once per environment.
+        self._collect()
+        key = self._get_key()
+        with self._lock:
+            env = self._envs.get(key)
+            if env is None:
+                env = self._start()
+                self._envs[key] = env
+                if self._scope == EnvPool.Scope.THREAD:
+                    self._local.token = token = Token()
+                    finalizer = weakref.finalize(token, self._release, key, env)
+                    finalizer.atexit = False
+            return env
+
+    def new(self) -> gp.Env:
+        # A new environment that is not shared with the other models,
+        # for a model solved concurrently with them. It is disposed by
+        # release, once its owner is collected, or with the pool.
+        self._collect()
+        env = self._start()
+        with self._lock:
+            self._dedicated.append((os.getpid(), env))
+        return env
+
+    def attach(self, env: gp.Env, owner: object) -> None:
+        # Release a dedicated environment once its owner is collected.
+        finalizer = weakref.finalize(owner, self._discard, env)
+        finalizer.atexit = False
+
+    def release(self, env: gp.Env) -> None:
+        # Dispose a dedicated environment whose models are disposed.
+        if self._pop(self._dedicated, env):
+            env.dispose()
+
+    def close(self) -> None:
+        # Dispose the environments of the calling process. The models
+        # created with them must not be used afterwards.
+        self._collect()
+        pid = os.getpid()
+        with self._lock:
+            keys = [key for key in self._envs if key[0] == pid]
+            envs = [self._envs.pop(key) for key in keys]
+            envs.extend(env for p, env in self._dedicated if p == pid)
+            self._dedicated = [(p, e) for p, e in self._dedicated if p != pid]
+        for env in envs:
+            env.dispose()
+
+    def _discard(self, env: gp.Env) -> None:
+        # The owner of the environment is being collected: its model
+        # is only freed afterwards.
+        if self._pop(self._dedicated, env):
+            with self._lock:
+                self._released.append((os.getpid(), env))
+
+    def _collect(self) -> None:
+        pid = os.getpid()
+        with self._lock:
+            envs = [env for p, env in self._released if p == pid]
+            self._released = [(p, e) for p, e in self._released if p != pid]
+        for env in envs:
+            env.dispose()
+
+    def _pop(self, envs: list[tuple[int, gp.Env]], env: gp.Env) -> bool:
+        # Remove an environment started by the calling process.
+        with self._lock:
+            for i, (pid, other) in enumerate(envs):
+                if other is env and pid == os.getpid():
+                    del envs[i]
+                    return True
+        return False
+
+    def _release(self, key: tuple[int, int], env: gp.Env) -> None:
+        # The environment of an exited thread, unless the pool was
+        # closed or forked since.
+        with self._lock:
+            if key[0] != os.getpid() or self._envs.get(key) is not env:
+                return
+            del self._envs[key]
+        env.dispose()
+
+    def _get_key(self) -> tuple[int, int]:
+        if self._scope == EnvPool.Scope.PROCESS:
+            return os.getpid(), 0
+        return os.getpid(), threading.get_ident()
+
+    def _start(self) -> gp.Env:
+        env = gp.Env(empty=True)
+        for name, value in self._params.items():
+            env.setParam(name, value)
+        env.start()
+        return env
@@ -1,25 +1,63 @@
 import time
 import warnings
+from collections.abc import Iterator, Mapping
+from queue import SimpleQueue
+from threading import Thread
+from typing import overload
 
 import gurobipy as gp
+import numpy as np
 from sklearn.ensemble import IsolationForest
 
+from .._explainer import ExplainerMixin, Incumbent, relative_gap
+from .._footprint import Footprint
+from .._stats import Stats
+from .._tune import Profile
 from ..abc import Mapper
 from ..feature import Feature
-from ..tree import parse_ensembles
+from ..tree import Forest, parse_ensembles
 from ..typing import (
     Array1D,
     BaseExplainableEnsemble,
     BaseExplainer,
     NonNegativeInt,
+    NonNegativeNumber,
+    Norm,
+    Param,
     PositiveInt,
 )
+from ._env import EnvPool
 from ._explanation import Explanation
+from ._footprint import estimate
 from ._model import Model
 from ._variables import TreeVar
 
 
-class Explainer(Model, BaseExplainer):
+class Explainer(Model, ExplainerMixin[Explanation], BaseExplainer):
+    ENGINE: str = "mip"
+
+    # Number of pool solutions searched for each requested
+    # counterfactual when a minimum distance is enforced.
+    POOL_OVERSAMPLING: PositiveInt = 10
+
+    # Parameter sets searched by tune: the focus of the search,
+    # the generation of cuts and the presolve level.
+    PROFILES: tuple[Mapping[str, Param], ...] = (
+        {},
+        {"MIPFocus": 1},
+        {"MIPFocus": 2},
+        {"MIPFocus": 3},
+        {"Cuts": 0},
+        {"Cuts": 2},
+        {"Presolve": 0},
+        {"Presolve": 2},
+    )
+
+    # Solver parameters set before each query, and the names of the
+    # ones set by the last query.
+    _profile: Profile | None = None
+    _profiled: frozenset[str] = frozenset()
+
     def __init__(
         self,
         ensemble: BaseExplainableEnsemble,
@@ -32,11 +70,16 @@ class Explainer(Model, BaseExplainer):
         epsilon: float = Model.DEFAULT_EPSILON,
         num_epsilon: float = Model.DEFAULT_NUM_EPSILON,
         model_type: Model.Type = Model.Type.MIP,
+        isolation_type: Model.IsolationType = Model.IsolationType.FULL,
+        l2_type: Model.L2Type = Model.L2Type.QUADRATIC,
         flow_type: TreeVar.FlowType = TreeVar.FlowType.CONTINUOUS,
+        stats: Stats | None = None,
     ) -> None:
         ensembles = (ensemble,) if isolation is None else (ensemble, isolation)
         n_isolators, max_samples = self._get_isolation_params(isolation)
-        trees = parse_ensembles(*ensembles, mapper=mapper)
+        stats = Stats(enabled=False) if stats is None else stats
+        with stats.stage("parse"):
+            trees = parse_ensembles(*ensembles, mapper=mapper)
         Model.__init__(
             self,
             trees,
@@ -49,14 +92,71 @@ class Explainer(Model, BaseExplainer):
             epsilon=epsilon,
             num_epsilon=num_epsilon,
             model_type=model_type,
+            isolation_type=isolation_type,
+            l2_type=l2_type,
             flow_type=flow_type,
+            stats=stats,
         )
         self.build()
+        self._set_forest(
+            trees,
+            mapper=mapper,
+            n_estimators=self.n_estimators,
+            weights=self.weights,
+        )
+
+    @classmethod
+    def estimate_footprint(
+        cls,
+        ensemble: BaseExplainableEnsemble,
+        *,
+        mapper: Mapper[Feature],
+        isolation: IsolationForest | None = None,
+        flow_type: TreeVar.FlowType = TreeVar.FlowType.CONTINUOUS,
+    ) -> Footprint:
+        # Dry run of the build: the trees are parsed, but the sizes
+        # of the model are counted without building it.
+        ensembles = (ensemble,) if isolation is None else (ensemble, isolation)
+        n_isolators, _ = cls._get_isolation_params(isolation)
+        trees = parse_ensembles(*ensembles, mapper=mapper)
+        return estimate(
+            trees,
+            mapper,
+            n_estimators=len(trees) - n_isolators,
+            flow_type=flow_type,
+        )
+
+    def rebind(
+        self,
+        *,
+        stats: Stats | None = None,
+        lease: tuple[EnvPool, gp.Env] | None = None,
+    ) -> None:
+        # The forest of the prechecks is shared with the clone.
+        super().rebind(stats=stats, lease=lease)
+        self._precheck = Forest.Precheck.PASSED
+        vars(self).pop("callback", None)
+
+    @property
+    def profile(self) -> Profile | None:
+        return self._profile
+
+    @profile.setter
+    def profile(self, profile: Profile | None) -> None:
+        if profile is not None and profile.engine != self.ENGINE:
+            msg = f"Expected a profile of the {self.ENGINE} engine,"
+            msg += f" got {profile.engine}."
+            raise ValueError(msg)
+        self._profile = profile
 
     def get_objective_value(self) -> float:
+        if self._precheck == Forest.Precheck.TRIVIAL:
+            return 0.0
         return self.ObjVal
 
     def get_solving_status(self) -> str:
+        if self._precheck != Forest.Precheck.PASSED:
+            return str(self._precheck.value)
         gurobi_statuses = {
             1: "LOADED",
             2: "OPTIMAL",
@@ -80,37 +180,245 @@ class Explainer(Model, BaseExplainer):
     def get_anytime_solutions(self) -> list[dict[str, float]] | None:
         return self.callback.sollist
 
+    def get_solver_stats(self) -> dict[str, float]:
+        if self._precheck != Forest.Precheck.PASSED:
+            return {}
+        return {
+            "runtime": self.Runtime,
+            "n_nodes": self.NodeCount,
+            "n_iterations": self.IterCount,
+            "n_solutions": self.SolCount,
+        }
+
+    @overload
+    def explain(
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        return_callback: bool = False,
+        verbose: bool = False,
+        max_time: int = 60,
+        num_workers: int | None = None,
+        random_seed: int = 42,
+        mip_gap: NonNegativeNumber | None = None,
+        absolute_gap: NonNegativeNumber | None = None,
+        objective_cutoff: float | None = None,
+        k: None = None,
+        min_distance: NonNegativeNumber = 0.0,
+    ) -> Explanation | None: ...
+
+    @overload
+    def explain(
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        return_callback: bool = False,
+        verbose: bool = False,
+        max_time: int = 60,
+        num_workers: int | None = None,
+        random_seed: int = 42,
+        mip_gap: NonNegativeNumber | None = None,
+        absolute_gap: NonNegativeNumber | None = None,
+        objective_cutoff: float | None = None,
+        k: PositiveInt,
+        min_distance: NonNegativeNumber = 0.0,
+    ) -> tuple[Explanation, ...]: ...
+
     def explain(
         self,
         x: Array1D,
         *,
         y: NonNegativeInt,
-        norm: PositiveInt,
+        norm: Norm,
         return_callback: bool = False,
         verbose: bool = False,
         max_time: int = 60,
         num_workers: int | None = None,
         random_seed: int = 42,
-    ) -> Explanation | None:
+        mip_gap: NonNegativeNumber | None = None,
+        absolute_gap: NonNegativeNumber | None = None,
+        objective_cutoff: float | None = None,
+        k: PositiveInt | None = None,
+        min_distance: NonNegativeNumber = 0.0,
+    ) -> Explanation | tuple[Explanation, ...] | None:
+        with self._stats.query(self):
+            with self._stats.stage("precheck"):
+                self._set_precheck(x, y=y, trivial=k is None)
+            match self._precheck:
+                case Forest.Precheck.UNREACHABLE:
+                    return None if k is None else ()
+                case Forest.Precheck.TRIVIAL:
+                    return self._get_trivial(x)
+                case Forest.Precheck.PASSED:
+                    pass
+            with self._stats.stage("setup", self):
+                self._set_params(
+                    verbose=verbose,
+                    max_time=max_time,
+                    num_workers=num_workers,
+                    random_seed=random_seed,
+                    mip_gap=mip_gap,
+                    absolute_gap=absolute_gap,
+                )
+                self._set_pool(k=k, min_distance=min_distance)
+                self.add_objective(x, norm=norm)
+                self._set_cutoff(objective_cutoff)
+                self.set_majority_class(y=y)
+            with self._stats.stage("solve"):
+                if return_callback:
+                    self.callback = SolutionCallback(starttime=time.time())
+                    self.optimize(self.callback)
+                else:
+                    self.optimize()
+            with self._stats.stage("extract"):
+                explanation = self._get_explanation()
+                if k is None:
+                    return explanation
+                if explanation is None:
+                    return ()
+                return self._get_pool(k=k, min_distance=min_distance, norm=norm)
+
+    def explain_iter(
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        verbose: bool = False,
+        max_time: int = 60,
+        num_workers: int | None = None,
+        random_seed: int = 42,
+        mip_gap: NonNegativeNumber | None = None,
+        absolute_gap: NonNegativeNumber | None = None,
+        objective_cutoff: float | None = None,
+    ) -> Iterator[Incumbent[Explanation]]:
+        self._set_precheck(x, y=y)
+        match self._precheck:
+            case Forest.Precheck.UNREACHABLE:
+                return
+            case Forest.Precheck.TRIVIAL:
+                explanation = self._get_trivial(x)
+                yield Incumbent(explanation, objective=0.0, bound=0.0, time=0.0)
+                return
+            case Forest.Precheck.PASSED:
+                pass
+        self._set_params(
+            verbose=verbose,
+            max_time=max_time,
+            num_workers=num_workers,
+            random_seed=random_seed,
+            mip_gap=mip_gap,
+            absolute_gap=absolute_gap,
+        )
+        self._set_pool(k=None, min_distance=0.0)
+        self.add_objective(x, norm=norm)
+        self._set_cutoff(objective_cutoff)
+        self.set_majority_class(y=y)
+
+        # The solver runs in a separate thread and pushes each new
+        # incumbent to the queue. The end of the solve is signaled
+        # by None. Closing the generator terminates the solver.
+        incumbents: SimpleQueue[Incumbent[Explanation] | None] = SimpleQueue()
+        errors: list[BaseException] = []
+        callback = IncumbentCallback(
+            self.explanation,
+            incumbents,
+            starttime=time.time(),
+        )
+
+        def solve() -> None:
+            try:
+                self.optimize(callback)
+            except BaseException as e:  # noqa: BLE001
+                errors.append(e)
+            finally:
+                incumbents.put(None)
+
+        thread = Thread(target=solve, daemon=True)
+        thread.start()
+        try:
+            while (incumbent := incumbents.get()) is not None:
+                yield incumbent
+        finally:
+            self.interrupt()
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def interrupt(self) -> None:
+        self.terminate()
+
+    def _get_precheck_tolerances(self) -> tuple[float, float]:
+        return self._epsilon, Forest.DEFAULT_TOLERANCE
+
+    def _get_min_length(self) -> tuple[float, float]:
+        return self.min_length, Forest.DEFAULT_TOLERANCE
+
+    def _get_trivial(self, x: Array1D) -> Explanation:
+        explanation = self.explanation.snapshot(
+            np.asarray(x, dtype=np.float64).ravel()
+        )
+        explanation.bound = 0.0
+        explanation.gap = 0.0
+        return explanation
+
+    def _set_params(
+        self,
+        *,
+        verbose: bool,
+        max_time: int,
+        num_workers: int | None,
+        random_seed: int,
+        mip_gap: NonNegativeNumber | None,
+        absolute_gap: NonNegativeNumber | None,
+    ) -> None:
+        self._set_profile()
         self.setParam("LogToConsole", int(verbose))
         self.setParam("TimeLimit", max_time)
         self.setParam("Seed", random_seed)
         if num_workers is not None:
             self.setParam("Threads", num_workers)
-        self.add_objective(x, norm=norm)
-        self.set_majority_class(y=y)
-        if return_callback:
-            self.callback = SolutionCallback(starttime=time.time())
-            self.optimize(self.callback)
-        else:
-            self.optimize()
+        self._set_param("MIPGap", mip_gap)
+        self._set_param("MIPGapAbs", absolute_gap)
+
+    def _set_cutoff(self, objective_cutoff: float | None) -> None:
+        self._set_param("Cutoff", objective_cutoff)
+
+    def _set_profile(self) -> None:
+        # The parameters set by the previous profile are restored to
+        # their default values.
+        params = {} if self._profile is None else self._profile.params
+        for name in sorted(self._profiled - params.keys()):
+            self._set_param(name, None)
+        for name, value in params.items():
+            self._set_param(name, value)
+        self._profiled = frozenset(params)
+
+    def _set_param(self, name: str, value: Param | None) -> None:
+        # None restores the default value of the parameter.
+        default = self.getParamInfo(name)[5]
+        self.setParam(name, default if value is None else value)
+
+    def _get_explanation(self) -> Explanation | None:
         status = self.get_solving_status()
 
+        cutoff = self.Params.Cutoff
+        if status == "CUTOFF" or (
+            status == "INFEASIBLE" and cutoff < gp.GRB.INFINITY
+        ):
+            msg = "There are no counterfactuals closer than the"
+            msg += f" objective cutoff {cutoff}."
+            warnings.warn(msg, category=UserWarning, stacklevel=3)
+            return None
         if status == "INFEASIBLE":
             msg = "There are no feasible counterfactuals for this query."
             msg += " If there should be one, please check the model "
             msg += "constraints or report this issue to the developers."
-            warnings.warn(msg, category=UserWarning, stacklevel=2)
+            warnings.warn(msg, category=UserWarning, stacklevel=3)
             return None
         if status != "OPTIMAL":
             if self.SolCount > 0:
@@ -120,26 +428,67 @@ class Explainer(Model, BaseExplainer):
                 msg += "the given time frame. \n It can however certify"
                 msg += " that no counterfactual can be closer than"
                 msg += f" {self.ObjBound}."
-                warnings.warn(msg, category=UserWarning, stacklevel=2)
+                warnings.warn(msg, category=UserWarning, stacklevel=3)
             elif status == "TIME_LIMIT":
                 msg = "The MILP solver could not find any"
                 msg += " valid CF within the given time frame."
                 msg += " Try increasing the time limit."
-                warnings.warn(msg, category=UserWarning, stacklevel=2)
+                warnings.warn(msg, category=UserWarning, stacklevel=3)
                 return None
             elif status == "MEM_LIMIT":
                 msg = "The MILP solver could not find any"
                 msg += " valid CF within the given max memory."
                 msg += " Try increasing the memory limit."
-                warnings.warn(msg, category=UserWarning, stacklevel=2)
+                warnings.warn(msg, category=UserWarning, stacklevel=3)
                 return None
             else:
                 msg = "The MILP solver could not find any"
                 msg += " valid CF for an un-handled reason."
                 msg += "Unexpected solver status: " + status
                 raise RuntimeError(msg)
+        self.explanation.bound = self.ObjBound
+        self.explanation.gap = self.MIPGap
         return self.explanation
 
+    def _set_pool(
+        self,
+        *,
+        k: PositiveInt | None,
+        min_distance: NonNegativeNumber,
+    ) -> None:
+        # PoolSearchMode=2 searches systematically for the best
+        # solutions. More solutions than requested are kept when
+        # a minimum distance has to be enforced between them.
+        if k is None:
+            self.setParam("PoolSearchMode", 0)
+            self._set_param("PoolSolutions", None)
+            return
+        n_solutions = k * self.POOL_OVERSAMPLING if min_distance > 0.0 else k
+        self.setParam("PoolSearchMode", 2)
+        self.setParam("PoolSolutions", n_solutions)
+
+    def _get_pool(
+        self,
+        *,
+        k: PositiveInt,
+        min_distance: NonNegativeNumber,
+        norm: Norm,
+    ) -> tuple[Explanation, ...]:
+        # The pool is sorted by objective value, so the solutions
+        # are selected greedily from the closest to the farthest.
+        variables = list(map(self.vget, range(self.n_columns)))
+        pool: list[Explanation] = []
+        for i in range(self.SolCount):
+            if len(pool) == k:
+                break
+            self.setParam("SolutionNumber", i)
+            values = np.array([v.Xn for v in variables], dtype=np.float64)
+            if all(
+                self._is_far(values, e.x, min_distance, norm=norm) for e in pool
+            ):
+                pool.append(self.explanation.snapshot(values))
+        return tuple(pool)
+
     @staticmethod
     def _get_isolation_params(
         isolation: IsolationForest | None,
@@ -162,3 +511,43 @@ class SolutionCallback:
                 "objective_value": best_objective,
                 "time": time.time() - self.starttime,
             })
+
+
+class IncumbentCallback:
+    def __init__(
+        self,
+        explanation: Explanation,
+        incumbents: "SimpleQueue[Incumbent[Explanation] | None]",
+        starttime: float,
+    ) -> None:
+        self.explanation = explanation
+        self.incumbents = incumbents
+        self.starttime = starttime
+        self.objective = gp.GRB.INFINITY
+        self.variables = [
+            explanation.vget(i) for i in range(explanation.n_columns)
+        ]
+
+    def __call__(self, model: gp.Model, where: int) -> None:
+        if where == gp.GRB.Callback.MIPSOL:
+            # Gurobi also reports the solutions found by the heuristics
+            # that do not improve the incumbent: they are skipped.
+            objective = model.cbGet(gp.GRB.Callback.MIPSOL_OBJ)
+            if objective >= self.objective:
+                return
+            self.objective = objective
+            bound = model.cbGet(gp.GRB.Callback.MIPSOL_OBJBND)
+            values = model.cbGetSolution(self.variables)
+            explanation = self.explanation.snapshot(
+                np.array(values, dtype=np.float64)
+            )
+            explanation.bound = bound
+            explanation.gap = relative_gap(objective, bound)
+            self.incumbents.put(
+                Incumbent(
+                    explanation=explanation,
+                    objective=objective,
+                    bound=bound,
+                    time=time.time() - self.starttime,
+                )
+            )
@@ -10,6 +10,14 @@ from ._variables import FeatureVar
 
 
 class Explanation(Mapper[FeatureVar], BaseExplanation):
+    # Values of the columns, only set for the snapshots
+    # that do not read the solution from the model.
+    _values: Array1D | None = None
+
+    # Objective bound and relative gap certified by the solver.
+    _bound: float | None = None
+    _gap: float | None = None
+
     def vget(self, i: int) -> gp.Var:
         name = self.names[i]
         if self[name].is_one_hot_encoded:
@@ -18,9 +26,18 @@ class Explanation(Mapper[FeatureVar], BaseExplanation):
         return self[name].xget()
 
     def to_series(self) -> "pd.Series[float]":
+        if self._values is not None:
+            return pd.Series(self._values, index=self.columns)
         values = [v.X for v in map(self.vget, range(self.n_columns))]
         return pd.Series(values, index=self.columns)
 
+    def snapshot(self, values: Array1D | None = None) -> "Explanation":
+        snapshot = Explanation(self)
+        snapshot.frozen_values = self.to_numpy() if values is None else values
+        snapshot.bound = self.bound
+        snapshot.gap = self.gap
+        return snapshot
+
     def to_numpy(self) -> Array1D:
         return (
             self.to_series()
@@ -37,6 +54,9 @@ class Explanation(Mapper[FeatureVar], BaseExplanation):
 
     @property
     def value(self) -> Mapping[Key, Key | Number]:
+        if self._values is not None:
+            return self._decode(self._values)
+
         def get(v: FeatureVar) -> Key | Number:
             if v.is_one_hot_encoded:
                 for code in v.codes:
@@ -47,6 +67,17 @@ class Explanation(Mapper[FeatureVar], BaseExplanation):
 
         return self.reduce(get)
 
+    def _decode(self, x: Array1D) -> Mapping[Key, Key | Number]:
+        def get(name: Key, v: FeatureVar) -> Key | Number:
+            if v.is_one_hot_encoded:
+                for code in v.codes:
+                    if np.isclose(x[self.idx.get(name, code)], 1.0):
+                        return code
+            value = float(x[self.idx.get(name)])
+            return 0 if np.isclose(value, 0.0) else value
+
+        return {name: get(name, v) for name, v in self.items()}
+
     def __repr__(self) -> str:
         mapping = self.value
         prefix = f"{self.__class__.__name__}:\n"
@@ -55,6 +86,30 @@ class Explanation(Mapper[FeatureVar], BaseExplanation):
 
         return prefix + root + suffix
 
+    @property
+    def frozen_values(self) -> Array1D | None:
+        return self._values
+
+    @frozen_values.setter
+    def frozen_values(self, values: Array1D | None) -> None:
+        self._values = values
+
+    @property
+    def bound(self) -> float | None:
+        return self._bound
+
+    @bound.setter
+    def bound(self, value: float | None) -> None:
+        self._bound = value
+
+    @property
+    def gap(self) -> float | None:
+        return self._gap
+
+    @gap.setter
+    def gap(self, value: float | None) -> None:
+        self._gap = value
+
     @property
     def query(self) -> Array1D:
         raise NotImplementedError
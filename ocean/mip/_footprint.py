@@ -0,0 +1,137 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from .._footprint import (
+    Cost,
+    Footprint,
+    Size,
+    measure_features,
+    measure_trees,
+)
+from ..abc import Mapper
+from ..feature import Feature
+from ..tree import Node, Tree
+from ..typing import NonNegativeInt
+from ._variables import TreeVar
+
+# Approximate bytes held by Gurobi for each variable, constraint
+# and nonzero: bounds, objective, type and name of the variables,
+# sense and right-hand side of the constraints, and the index and
+# coefficient of each nonzero, stored by row and by column.
+COST = Cost(var=64, constr=48, nonzero=24)
+
+
+def estimate(
+    trees: Sequence[Tree],
+    mapper: Mapper[Feature],
+    *,
+    n_estimators: NonNegativeInt,
+    flow_type: TreeVar.FlowType = TreeVar.FlowType.CONTINUOUS,
+) -> Footprint:
+    # Sizes of the model built by the MIP builder with the full
+    # isolation, and of the query layer of the L1 norm, counted
+    # from the trees and the features without building the model.
+    estimators = sum(
+        (_tree(tree, mapper, flow_type) for tree in trees[:n_estimators]),
+        start=measure_trees(trees[:n_estimators]),
+    )
+    isolators = sum(
+        (_tree(tree, mapper, flow_type) for tree in trees[n_estimators:]),
+        start=measure_trees(trees[n_estimators:]),
+    )
+    if len(trees) > n_estimators:
+        n_leaves = sum(len(tree.leaves) for tree in trees[n_estimators:])
+        isolators += Size(n_constrs=1, n_nonzeros=n_leaves)
+    features = sum(
+        map(_feature, mapper.values()),
+        start=measure_features(mapper.values()),
+    )
+    return Footprint(
+        estimators=estimators,
+        isolators=isolators,
+        features=features,
+        query=_query(trees[:n_estimators], mapper),
+    ).charge(COST)
+
+
+def _feature(feature: Feature) -> Size:
+    if feature.is_binary:
+        return Size(n_vars=1, n_binaries=1)
+    if feature.is_one_hot_encoded:
+        m = len(feature.codes)
+        return Size(n_vars=m, n_binaries=m, n_constrs=1, n_nonzeros=m)
+    # x is the weighted sum of the n variables mu, which are
+    # decreasing.
+    n = len(feature.levels) - 1
+    return Size(
+        n_vars=1 + n,
+        n_binaries=0 if feature.is_continuous else n,
+        n_constrs=1 + max(n - 1, 0),
+        n_nonzeros=1 + n + 2 * max(n - 1, 0),
+    )
+
+
+def _tree(
+    tree: Tree,
+    mapper: Mapper[Feature],
+    flow_type: TreeVar.FlowType,
+) -> Size:
+    # The flow is one at the root and conserved at each internal
+    # node. The continuous flow branches on one binary per depth.
+    n_internal = tree.n_nodes - len(tree.leaves)
+    size = Size(
+        n_vars=tree.n_nodes,
+        n_constrs=1 + n_internal,
+        n_nonzeros=1 + 3 * n_internal,
+    )
+    match flow_type:
+        case TreeVar.FlowType.BINARY:
+            size.n_binaries += tree.n_nodes
+        case TreeVar.FlowType.CONTINUOUS:
+            size.n_vars += tree.max_depth
+            size.n_binaries += tree.max_depth
+            size.n_constrs += 2 * n_internal
+            size.n_nonzeros += 4 * n_internal
+    for node in tree.nodes:
+        if node.is_leaf:
+            continue
+        size += _split(mapper[node.feature], node)
+    return size
+
+
+def _split(feature: Feature, node: Node) -> Size:
+    # A split out of the levels only closes one branch.
+    if feature.is_continuous:
+        j = int(np.searchsorted(feature.levels, node.threshold))
+        n_constrs = 4
+    elif feature.is_discrete:
+        levels, threshold = feature.levels, node.threshold
+        j = int(np.searchsorted(levels, threshold, side="right"))
+        n_constrs = 2
+    else:
+        return Size(n_constrs=2, n_nonzeros=4)
+    if j in {0, feature.levels.size}:
+        return Size(n_constrs=1, n_nonzeros=1)
+    return Size(n_constrs=n_constrs, n_nonzeros=2 * n_constrs)
+
+
+def _query(estimators: Sequence[Tree], mapper: Mapper[Feature]) -> Size:
+    # Each column is at a distance u of the query, above its
+    # difference in both directions. The score of the first class
+    # exceeds the others on the leaves where the values differ.
+    n_columns = mapper.n_columns
+    values = np.stack([
+        leaf.value for tree in estimators for leaf in tree.leaves
+    ])
+    n_classes = values.shape[-1]
+    n_nonzeros = sum(
+        int(np.count_nonzero(values[:, 0, 0] != values[:, 0, c]))
+        for c in range(1, n_classes)
+    )
+    return Size(
+        n_vars=n_columns,
+        n_constrs=2 * n_columns + n_classes - 1,
+        n_nonzeros=4 * n_columns + n_nonzeros,
+        n_objects=3 * n_columns + n_classes - 1,
+    )
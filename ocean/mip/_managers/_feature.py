@@ -1,3 +1,5 @@
+from collections.abc import Sequence
+
 import gurobipy as gp
 
 from ...abc import Mapper
@@ -41,6 +43,12 @@ class FeatureManager:
     def vget(self, i: int) -> gp.Var:
         return self.mapper.vget(i)
 
+    def _clone_features(self, variables: Sequence[gp.Var]) -> None:
+        def clone(_: Key, var: FeatureVar) -> FeatureVar:
+            return var.clone(variables)
+
+        self._mapper = Explanation(self.mapper.apply(clone))
+
     def _set_mapper(self, mapper: Mapper[Feature]) -> None:
         def create(key: Key, feature: Feature) -> FeatureVar:
             name = self.FEATURE_VAR_FMT.format(key=key)
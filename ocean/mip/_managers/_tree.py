@@ -1,4 +1,4 @@
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 
 import gurobipy as gp
 import numpy as np
@@ -138,6 +138,12 @@ class TreeManager:
 
         self._trees = tree_vars[0], *tree_vars[1:]
 
+    def _clone_trees(self, variables: Sequence[gp.Var]) -> None:
+        trees = tuple(tree.clone(variables) for tree in self.trees)
+        self._trees = trees[0], *trees[1:]
+        self._length = self._get_length()
+        self._function = self._get_function()
+
     def _set_weights(self, weights: NonNegativeArray1D | None = None) -> None:
         if weights is None:
             weights = np.ones(self.n_estimators, dtype=np.float64)
@@ -1,23 +1,41 @@
 from collections.abc import Iterable
 from enum import Enum
+from typing import Self
 
 import gurobipy as gp
 import numpy as np
 from pydantic import validate_call
 
+from .._footprint import (
+    Footprint,
+    Group,
+    Size,
+    attribute,
+    get_groups,
+    measure_features,
+    measure_trees,
+)
+from .._stats import Stats
 from ..abc import Mapper
 from ..feature import Feature
-from ..tree import Tree
+from ..tree import Node, Tree
 from ..typing import (
     Array1D,
     NonNegativeArray1D,
     NonNegativeInt,
+    Norm,
     Unit,
 )
 from ._base import BaseModel
-from ._builders.model import ModelBuilder, ModelBuilderFactory
+from ._builders.model import (
+    LazyMixedIntegerProgramBuilder,
+    MixedIntegerProgramBuilder,
+    ModelBuilderFactory,
+)
+from ._env import EnvPool
+from ._footprint import COST
 from ._managers import FeatureManager, GarbageManager, TreeManager
-from ._typing import Objective
+from ._typing import Callback, Objective
 from ._variables import TreeVar
 
 
@@ -27,12 +45,42 @@ class Model(BaseModel, FeatureManager, TreeManager, GarbageManager):
 
     class Type(Enum):
         MIP = "MIP"
+        LAZY = "LAZY"
+
+    class IsolationType(Enum):
+        FULL = "FULL"
+        LAZY = "LAZY"
+
+    class L2Type(Enum):
+        QUADRATIC = "QUADRATIC"
+        PIECEWISE_LINEAR = "PIECEWISE_LINEAR"
 
     # Constraints for the majority class.
     _scores: gp.tupledict[tuple[NonNegativeInt, NonNegativeInt], gp.Constr]
 
+    # Majority class for each output.
+    _targets: dict[NonNegativeInt, NonNegativeInt]
+
     # Model builder for the ensemble.
-    _builder: ModelBuilder
+    _builder: MixedIntegerProgramBuilder
+
+    # Types of the model and of the encoding of the isolators: with
+    # the lazy encoding, the split constraints of the isolators are
+    # only added once an incumbent is implausible.
+    _model_type: Type
+    _isolation_type: IsolationType
+
+    # Objective of the L2 norm: the squared distance, or its
+    # piecewise-linear interpolation at the levels of the columns,
+    # which keeps the problem a MILP.
+    _l2_type: L2Type
+
+    # Breakpoints of the piecewise-linear L2 objective in each
+    # column: the levels of the numeric features, the values 0 and 1
+    # of the binary variables, and the values next to the levels at
+    # which the splits of the continuous features leave them, with
+    # the epsilon of the builder.
+    _column_points: list[Array1D]
 
     # Numerical parameters for the model.
     # - epsilon: the minimum difference between two scores.
@@ -40,6 +88,13 @@ class Model(BaseModel, FeatureManager, TreeManager, GarbageManager):
     _epsilon: Unit
     _num_epsilon: Unit
 
+    # Timings and sizes of the stages of the build and the queries.
+    _stats: Stats
+
+    # Pool and dedicated environment of a clone: the environment is
+    # released when the clone is disposed or collected.
+    _lease: tuple[EnvPool, gp.Env] | None = None
+
     def __init__(
         self,
         trees: Iterable[Tree],
@@ -53,7 +108,10 @@ class Model(BaseModel, FeatureManager, TreeManager, GarbageManager):
         epsilon: Unit = DEFAULT_EPSILON,
         num_epsilon: Unit = DEFAULT_NUM_EPSILON,
         model_type: Type = Type.MIP,
+        isolation_type: IsolationType = IsolationType.FULL,
+        l2_type: L2Type = L2Type.QUADRATIC,
         flow_type: TreeVar.FlowType = TreeVar.FlowType.CONTINUOUS,
+        stats: Stats | None = None,
     ) -> None:
         # Initialize the super models.
         BaseModel.__init__(self, name=name, env=env)
@@ -73,19 +131,57 @@ class Model(BaseModel, FeatureManager, TreeManager, GarbageManager):
         self._epsilon = epsilon
         self._num_epsilon = num_epsilon
         self._scores = gp.tupledict()
+        self._targets = {}
+        self._model_type = model_type
+        self._isolation_type = isolation_type
+        self._l2_type = l2_type
+        self._stats = Stats(enabled=False) if stats is None else stats
         self._set_builder(model_type=model_type)
 
     def build(self) -> None:
-        self.build_features(self)
-        self.build_trees(self)
-        self._builder.build(self, trees=self.trees, mapper=self.mapper)
-        self._set_isolation()
+        with self._stats.stage("features", self):
+            self.build_features(self)
+        with self._stats.stage("trees", self):
+            self.build_trees(self)
+        with self._stats.stage("builder", self):
+            self._builder.build(self, trees=self.trees, mapper=self.mapper)
+            if isinstance(self._builder, LazyMixedIntegerProgramBuilder):
+                for t in self._eager_trees:
+                    self._builder.add(self, t=t)
+            self._column_points = self._get_column_points()
+        with self._stats.stage("isolation", self):
+            self._set_isolation()
+
+    def optimize(
+        self,
+        callback: Callback | None = None,
+        wheres: list[int] | None = None,
+    ) -> None:
+        if not isinstance(self._builder, LazyMixedIntegerProgramBuilder):
+            if wheres is None:
+                gp.Model.optimize(self, callback)
+            else:
+                gp.Model.optimize(self, callback, wheres)
+            return
+
+        builder = self._builder
+        builder.flush(self)
+
+        def separate(model: gp.Model, where: int) -> None:
+            # Incumbents cut off by the separation are rejected
+            # by Gurobi and are therefore not passed to the callback.
+            if where == gp.GRB.Callback.MIPSOL and self._separate(builder):
+                return
+            if callback is not None and (wheres is None or where in wheres):
+                callback(model, where)
+
+        gp.Model.optimize(self, separate)
 
     def add_objective(
         self,
         x: Array1D,
         *,
-        norm: int = 1,
+        norm: Norm = 1,
         sense: int = gp.GRB.MINIMIZE,
     ) -> None:
         objective = self._add_objective(x=x, norm=norm)
@@ -107,16 +203,136 @@ class Model(BaseModel, FeatureManager, TreeManager, GarbageManager):
     def clear_majority_class(self) -> None:
         self.remove(self._scores)
         self._scores.clear()
+        self._targets.clear()
 
     def cleanup(self) -> None:
         self.clear_majority_class()
         self.remove_garbage(self)
 
+    def clone(
+        self,
+        *,
+        env: gp.Env | None = None,
+        stats: Stats | None = None,
+    ) -> Self:
+        # Copy of the built model that can be solved concurrently with
+        # it: the builders are not run again, the variables of the
+        # features and the trees are replaced by the ones of the copy.
+        # Without an environment, the copy gets its own one from the
+        # default pool, released with the copy.
+        if self._scores or self._garbage:
+            msg = "The model cannot be cloned during a query."
+            raise ValueError(msg)
+        if env is None:
+            pool = EnvPool.default()
+            env = pool.new()
+            model: Self = self.copy_model(env)
+            pool.attach(env, model)
+            model.rebind(stats=stats, lease=(pool, env))
+        else:
+            model = self.copy_model(env)
+            model.rebind(stats=stats)
+        return model
+
+    def rebind(
+        self,
+        *,
+        stats: Stats | None = None,
+        lease: tuple[EnvPool, gp.Env] | None = None,
+    ) -> None:
+        # The variables of a copy of the model replace the ones of
+        # the features and the trees, and the copy starts with no
+        # query of its own.
+        variables = self.getVars()
+        self._clone_features(variables)
+        self._clone_trees(variables)
+        self._garbage = []
+        self._scores = gp.tupledict()
+        self._targets = {}
+        self._stats = Stats(enabled=False) if stats is None else stats
+        self._lease = lease
+        self._builder = self._builder.clone(
+            trees=self.trees,
+            mapper=self.mapper,
+        )
+
+    def dispose(self) -> None:
+        lease, self._lease = self._lease, None
+        super().dispose()
+        if lease is not None:
+            pool, env = lease
+            pool.release(env)
+
+    def footprint(self) -> Footprint:
+        # The query layer is measured by adding the one of an L1
+        # query on the first class, and removing it right after.
+        if self._scores:
+            msg = "The footprint cannot be measured during a query."
+            raise ValueError(msg)
+        groups = self._get_footprint_groups()
+        n_vars, n_constrs, n_nonzeros = self.measure()
+        n_garbage = len(self._garbage)
+        self.add_objective(np.zeros(self.n_columns), norm=1)
+        self.set_majority_class(y=0)
+        after = self.measure()
+        query = Size(
+            n_vars=after[0] - n_vars,
+            n_constrs=after[1] - n_constrs,
+            n_nonzeros=after[2] - n_nonzeros,
+            n_objects=len(self._garbage) - n_garbage + len(self._scores),
+        )
+        self.cleanup()
+        estimators = measure_trees(self.estimators)
+        isolators = measure_trees(self.isolators)
+        features = measure_features(v.feature for v in self.mapper.values())
+        return Footprint(
+            estimators=groups[Group.ESTIMATORS] + estimators,
+            isolators=groups[Group.ISOLATORS] + isolators,
+            features=groups[Group.FEATURES] + features,
+            query=query,
+        ).charge(COST)
+
+    @property
+    def isolation_type(self) -> IsolationType:
+        return self._isolation_type
+
+    @property
+    def l2_type(self) -> L2Type:
+        return self._l2_type
+
+    @property
+    def stats(self) -> Stats:
+        return self._stats
+
+    @property
+    def _eager_trees(self) -> tuple[NonNegativeInt, ...]:
+        # Trees whose split constraints are part of the model from
+        # the start when the lazy builder is used.
+        estimators = range(self.n_estimators)
+        isolators = range(self.n_estimators, self.n_trees)
+        eager: list[NonNegativeInt] = []
+        if self._model_type == Model.Type.MIP:
+            eager.extend(estimators)
+        if self._isolation_type == Model.IsolationType.FULL:
+            eager.extend(isolators)
+        return tuple(eager)
+
     def _set_builder(self, model_type: Type) -> None:
+        # The lazy isolators need the lazy builder, even when the
+        # estimators are all part of the model.
+        lazy = (
+            self._isolation_type == Model.IsolationType.LAZY
+            and self.n_isolators > 0
+        )
+        if lazy:
+            model_type = Model.Type.LAZY
         match model_type:
             case Model.Type.MIP:
                 epsilon = self._num_epsilon
                 self._builder = ModelBuilderFactory.MIP(epsilon=epsilon)
+            case Model.Type.LAZY:
+                epsilon = self._num_epsilon
+                self._builder = ModelBuilderFactory.LAZY(epsilon=epsilon)
 
     def _set_majority_class(
         self,
@@ -125,6 +341,7 @@ class Model(BaseModel, FeatureManager, TreeManager, GarbageManager):
         op: NonNegativeInt,
     ) -> None:
         function = self.function
+        self._targets[op] = y
 
         for class_ in range(self.n_classes):
             if class_ == y:
@@ -134,23 +351,103 @@ class Model(BaseModel, FeatureManager, TreeManager, GarbageManager):
             lhs = (function[op, y] - function[op, class_]).item()
             self._scores[op, class_] = self.addConstr(lhs >= rhs)
 
+    def _separate(self, builder: LazyMixedIntegerProgramBuilder) -> bool:
+        # The incumbent only needs to be cut off when the leaves
+        # reached by its features do not give the majority to the
+        # target class, or are too short for the isolators. In this
+        # case, the split constraints of the trees whose flow does
+        # not follow the features are added.
+        variables = list(map(self.vget, range(self.n_columns)))
+        x = np.asarray(self.cbGetSolution(variables), dtype=np.float64)
+        leaves = [builder.leaf(t, x=x) for t in range(self.n_trees)]
+
+        trees: list[NonNegativeInt] = []
+        if self._is_misclassified(leaves[: self.n_estimators]):
+            trees.extend(range(self.n_estimators))
+        if self._is_implausible(leaves[self.n_estimators :]):
+            trees.extend(range(self.n_estimators, self.n_trees))
+        if not trees:
+            return False
+
+        for t in trees:
+            if builder.is_active(t):
+                continue
+            leaf = leaves[t]
+            if self.cbGetSolution(self.trees[t][leaf.node_id]) < 1.0 / 2.0:
+                builder.cut(self, t=t)
+        return True
+
+    def _is_misclassified(self, leaves: list[Node]) -> bool:
+        if not self._targets:
+            return False
+
+        values = (leaf.value for leaf in leaves)
+        scores = sum(
+            map(np.multiply, self.weights, values),
+            start=np.zeros(self.shape, dtype=np.float64),
+        )
+
+        def violated(op: NonNegativeInt, y: NonNegativeInt, c: int) -> bool:
+            rhs = self._epsilon if c < y else 0.0
+            return bool(scores[op, y] - scores[op, c] < rhs)
+
+        return any(
+            violated(op, y, class_)
+            for op, y in self._targets.items()
+            for class_ in range(self.n_classes)
+            if class_ != y
+        )
+
+    def _is_implausible(self, leaves: list[Node]) -> bool:
+        if self._isolation_type != Model.IsolationType.LAZY or not leaves:
+            return False
+
+        length = sum(leaf.length for leaf in leaves)
+        return bool(length < self.min_length)
+
+    def _get_footprint_groups(self) -> dict[Group, Size]:
+        self.update()
+        variables = self.getVars()
+        names = self.getAttr("VarName", variables)
+        vtypes = np.asarray(self.getAttr("VType", variables))
+        matrix = self.getA().tocsr()
+        groups = get_groups(
+            names,
+            n_estimators=self.n_estimators,
+            fmt=self.TREE_VAR_FMT,
+        )
+        return attribute(
+            groups,
+            vtypes == gp.GRB.BINARY,
+            matrix.indptr,
+            matrix.indices,
+            np.diff(matrix.indptr),
+        )
+
     def _set_isolation(self) -> None:
         if self.n_isolators == 0:
             return
 
         self.addConstr(self.length >= self.min_length)
 
-    def _add_objective(self, x: Array1D, norm: int) -> Objective:
+    def _add_objective(self, x: Array1D, norm: Norm) -> Objective:
         if x.size != self.mapper.n_columns:
             msg = f"Expected {self.mapper.n_columns} values, got {x.size}"
             raise ValueError(msg)
-        if norm not in {1, 2}:
+        if norm not in {1, 2} and not np.isinf(norm):
             msg = f"Unsupported norm: {norm}"
             raise ValueError(msg)
 
-        variables = map(self.vget, range(self.n_columns))
+        variables = list(map(self.vget, range(self.n_columns)))
+        if np.isinf(norm):
+            return self.Linf(x, variables)
         if norm == 1:
             return sum(map(self.L1, x, variables), start=gp.LinExpr())
+        if self._l2_type == Model.L2Type.PIECEWISE_LINEAR:
+            return sum(
+                map(self.L2PWL, x, variables, self._column_points),
+                start=gp.LinExpr(),
+            )
         return sum(map(self.L2, x, variables), start=gp.QuadExpr())
 
     def L1(self, x: np.float64, v: gp.Var) -> gp.LinExpr:
@@ -163,3 +460,48 @@ class Model(BaseModel, FeatureManager, TreeManager, GarbageManager):
     @staticmethod
     def L2(x: np.float64, v: gp.Var) -> gp.QuadExpr:
         return (v - x) ** 2
+
+    def L2PWL(self, x: np.float64, v: gp.Var, points: Array1D) -> gp.LinExpr:
+        # The square of u = |v - x| is bounded below by its secants
+        # between the distances of the breakpoints to x: the cost is
+        # exact when v is at a breakpoint or at x.
+        u = self.addMVar(1)
+        z = self.addMVar(1)
+        neg = self.addConstr(u >= v - x)
+        pos = self.addConstr(u >= x - v)
+        distances: Array1D = np.unique(np.append(np.abs(points - x), 0.0))
+        lower, upper = distances[:-1], distances[1:]
+        secants = self.addConstr(z >= (lower + upper) * u - lower * upper)
+        self.add_garbage(u, z, neg, pos, secants)
+        return gp.LinExpr(z.item())
+
+    def Linf(self, x: Array1D, variables: list[gp.Var]) -> gp.LinExpr:
+        # A single epigraph variable is above the distance of each
+        # column.
+        t = self.addVar()
+        v = gp.MVar.fromlist(variables)
+        neg = self.addConstr(t >= v - x)
+        pos = self.addConstr(t >= x - v)
+        self.add_garbage(t, neg, pos)
+        return gp.LinExpr(t)
+
+    def _get_column_points(self) -> list[Array1D]:
+        points: list[Array1D] = []
+        for i in range(self.n_columns):
+            v = self.mapper[self.mapper.names[i]]
+            if not v.is_numeric:
+                points.append(np.array([0.0, 1.0]))
+                continue
+            levels = np.asarray(v.levels, dtype=np.float64)
+            epsilon = self._builder.epsilons.get(v)
+            if v.is_continuous and epsilon is not None:
+                # The splits move mu by at least the epsilon of the
+                # feature away from the levels.
+                delta = epsilon * np.diff(levels)
+                levels = np.concatenate((
+                    levels,
+                    levels[:-1] + delta,
+                    levels[1:] - delta,
+                ))
+            points.append(levels)
+        return points
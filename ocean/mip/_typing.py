@@ -1,3 +1,7 @@
+from collections.abc import Callable
+
 import gurobipy as gp
 
 type Objective = gp.LinExpr | gp.QuadExpr
+type Constraint = gp.TempLConstr
+type Callback = Callable[[gp.Model, int], None]
@@ -1,10 +1,14 @@
+import copy
+from collections.abc import Sequence
+from typing import Self
+
 import gurobipy as gp
 import numpy as np
 
 from ...feature import Feature
 from ...feature._keeper import FeatureKeeper
 from ...typing import Key
-from .._base import BaseModel, Var
+from .._base import BaseModel, Var, remap
 
 
 class FeatureVar(Var, FeatureKeeper):
@@ -29,6 +33,18 @@ class FeatureVar(Var, FeatureKeeper):
 
         self._x = x
 
+    def clone(self, variables: Sequence[gp.Var]) -> Self:
+        var: Self = copy.copy(self)
+        var.rebind(variables)
+        return var
+
+    def rebind(self, variables: Sequence[gp.Var]) -> None:
+        # The variables of a copy of the model replace the ones of
+        # the feature.
+        self._x = remap(self._x, variables)
+        if self.is_numeric:
+            self._mu = remap(self._mu, variables)
+
     def xget(self, code: Key | None = None) -> gp.Var:
         if self.is_one_hot_encoded:
             return self._xget_one_hot_encoded(code)
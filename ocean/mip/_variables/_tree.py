@@ -1,5 +1,7 @@
-from collections.abc import Iterator, Mapping
+import copy
+from collections.abc import Iterator, Mapping, Sequence
 from enum import Enum
+from typing import Self
 
 import gurobipy as gp
 from pydantic import validate_call
@@ -7,7 +9,7 @@ from pydantic import validate_call
 from ...tree._keeper import TreeKeeper, TreeLike
 from ...tree._node import Node
 from ...typing import NonNegativeInt
-from .._base import BaseModel, Var
+from .._base import BaseModel, Var, remap
 from .._builders.flow import FlowBuilder, FlowBuilderFactory
 
 
@@ -56,6 +58,18 @@ class TreeVar(Var, TreeKeeper, Mapping[NonNegativeInt, gp.Var]):
         # Set Average Path Length
         self._length = self._get_length()
 
+    def clone(self, variables: Sequence[gp.Var]) -> Self:
+        var: Self = copy.copy(self)
+        var.rebind(variables)
+        return var
+
+    def rebind(self, variables: Sequence[gp.Var]) -> None:
+        # The variables of a copy of the model replace the flow of
+        # the tree, and the expressions built on it.
+        self._flow = remap(self._flow, variables)
+        self._value = self._get_value()
+        self._length = self._get_length()
+
     def __len__(self) -> int:
         return self.n_nodes
 
@@ -91,7 +105,5 @@ class TreeVar(Var, TreeKeeper, Mapping[NonNegativeInt, gp.Var]):
         return value
 
     def _get_length(self) -> gp.LinExpr:
-        def length(node: Node) -> gp.LinExpr:
-            return node.length * self[node.node_id]
-
-        return sum(map(length, self.leaves), gp.LinExpr())
+        variables = [self[leaf.node_id] for leaf in self.leaves]
+        return gp.LinExpr(self.lengths.tolist(), variables)
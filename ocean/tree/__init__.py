@@ -1,5 +1,13 @@
+from ._forest import Forest
 from ._node import Node
 from ._parse import parse_ensembles, parse_tree, parse_trees
 from ._tree import Tree
 
-__all__ = ["Node", "Tree", "parse_ensembles", "parse_tree", "parse_trees"]
+__all__ = [
+    "Forest",
+    "Node",
+    "Tree",
+    "parse_ensembles",
+    "parse_tree",
+    "parse_trees",
+]
@@ -0,0 +1,198 @@
+from collections.abc import Iterable
+from enum import Enum
+
+import numpy as np
+
+from ..abc import Mapper
+from ..feature import Feature
+from ..typing import (
+    Array1D,
+    IntArray1D,
+    NonNegativeArray1D,
+    NonNegativeInt,
+)
+from ._tree import Tree
+
+
+class Forest:
+    # Threshold used for the binary and one-hot encoded splits.
+    BINARY_THRESHOLD: float = 0.5
+
+    # Default tolerance on the scores: a precheck is only
+    # conclusive when the margins are beyond the tolerance.
+    DEFAULT_TOLERANCE: float = 1e-6
+
+    class Precheck(Enum):
+        PASSED = "PASSED"
+        UNREACHABLE = "UNREACHABLE"
+        TRIVIAL = "TRIVIAL"
+
+    # Arrays of the trees, padded to the largest tree:
+    # - column of the split of each node,
+    # - threshold of the split of each node,
+    # - left and right children of each node,
+    # - whether each node is a leaf,
+    # - value of each leaf.
+    _columns: np.ndarray[tuple[int, int], np.dtype[np.intp]]
+    _thresholds: np.ndarray[tuple[int, int], np.dtype[np.float64]]
+    _lefts: np.ndarray[tuple[int, int], np.dtype[np.intp]]
+    _rights: np.ndarray[tuple[int, int], np.dtype[np.intp]]
+    _leaves: np.ndarray[tuple[int, int], np.dtype[np.bool_]]
+    _values: np.ndarray[tuple[int, ...], np.dtype[np.float64]]
+
+    # Path length of each leaf, only kept for the isolators.
+    _lengths: np.ndarray[tuple[int, int], np.dtype[np.float64]] | None = None
+
+    # Weights of the trees.
+    _weights: NonNegativeArray1D
+
+    # Number of columns of the inputs.
+    _n_columns: NonNegativeInt
+
+    def __init__(
+        self,
+        trees: Iterable[Tree],
+        *,
+        mapper: Mapper[Feature],
+        weights: NonNegativeArray1D | None = None,
+        isolation: bool = False,
+    ) -> None:
+        trees = tuple(trees)
+        if len(trees) == 0:
+            msg = "At least one tree is required."
+            raise ValueError(msg)
+        self._set_arrays(trees, mapper=mapper)
+        if isolation:
+            self._set_lengths(trees)
+        self._n_columns = mapper.n_columns
+        if weights is None:
+            weights = np.ones(len(trees), dtype=np.float64)
+        if len(weights) != len(trees):
+            msg = "The number of weights must match the number of trees."
+            raise ValueError(msg)
+        self._weights = np.asarray(weights, dtype=np.float64)
+
+    @property
+    def n_trees(self) -> NonNegativeInt:
+        return self._values.shape[0]
+
+    @property
+    def n_classes(self) -> NonNegativeInt:
+        return self._values.shape[-1]
+
+    def apply(self, x: Array1D) -> IntArray1D:
+        # All the trees are traversed simultaneously:
+        # one step per level of the deepest tree.
+        x = np.asarray(x, dtype=np.float64).ravel()
+        if x.size != self._n_columns:
+            msg = f"Expected {self._n_columns} values, got {x.size}"
+            raise ValueError(msg)
+        trees = np.arange(self.n_trees)
+        nodes = np.zeros(self.n_trees, dtype=np.intp)
+        while not np.all(leaves := self._leaves[trees, nodes]):
+            columns = self._columns[trees, nodes]
+            left = x[columns] <= self._thresholds[trees, nodes]
+            children = np.where(
+                left,
+                self._lefts[trees, nodes],
+                self._rights[trees, nodes],
+            )
+            nodes = np.where(leaves, nodes, children)
+        return nodes
+
+    def scores(self, x: Array1D) -> Array1D:
+        nodes = self.apply(x)
+        values = self._values[np.arange(self.n_trees), nodes]
+        return np.tensordot(self._weights, values, axes=1)
+
+    def length(self, x: Array1D) -> float:
+        # Sum of the path lengths of the query in the isolators.
+        if self._lengths is None:
+            msg = "The path lengths are only kept for the isolators."
+            raise ValueError(msg)
+        nodes = self.apply(x)
+        return float(self._lengths[np.arange(self.n_trees), nodes].sum())
+
+    def max_margins(
+        self,
+        y: NonNegativeInt,
+        *,
+        op: NonNegativeInt = 0,
+    ) -> Array1D:
+        # Upper bound of the margin of y over each class: each tree
+        # is maximized independently over its leaves.
+        values = self._values[:, :, op, :]
+        margins = values[:, :, y, None] - values
+        margins = np.where(self._leaves[:, :, None], margins, -np.inf)
+        return self._weights @ margins.max(axis=1)
+
+    def precheck(
+        self,
+        x: Array1D,
+        y: NonNegativeInt,
+        *,
+        epsilon: float,
+        tolerance: float = DEFAULT_TOLERANCE,
+        op: NonNegativeInt = 0,
+    ) -> Precheck:
+        if y >= self.n_classes:
+            msg = f"Expected class < {self.n_classes}, got {y}"
+            raise ValueError(msg)
+
+        # Class y wins over the classes c < y with a margin of at
+        # least epsilon, and over the classes c > y on ties.
+        classes = np.arange(self.n_classes)
+        rhs = np.where(classes < y, epsilon, 0.0)
+        others = classes != y
+
+        margins = self.max_margins(y, op=op)
+        if np.any(margins[others] < rhs[others] - tolerance):
+            return Forest.Precheck.UNREACHABLE
+
+        scores = self.scores(x)[op]
+        margins = scores[y] - scores
+        if np.all(margins[others] >= rhs[others] + tolerance):
+            return Forest.Precheck.TRIVIAL
+        return Forest.Precheck.PASSED
+
+    def _set_arrays(
+        self,
+        trees: tuple[Tree, ...],
+        *,
+        mapper: Mapper[Feature],
+    ) -> None:
+        n_trees = len(trees)
+        n_nodes = max(tree.n_nodes for tree in trees)
+        shape = (n_trees, n_nodes)
+        self._columns = np.zeros(shape, dtype=np.intp)
+        self._thresholds = np.zeros(shape, dtype=np.float64)
+        self._lefts = np.zeros(shape, dtype=np.intp)
+        self._rights = np.zeros(shape, dtype=np.intp)
+        self._leaves = np.ones(shape, dtype=np.bool_)
+        self._values = np.zeros((*shape, *trees[0].shape), dtype=np.float64)
+
+        for t, tree in enumerate(trees):
+            for node in tree.nodes:
+                i = node.node_id
+                if node.is_leaf:
+                    self._values[t, i] = node.value
+                    continue
+                self._leaves[t, i] = False
+                self._lefts[t, i] = node.left.node_id
+                self._rights[t, i] = node.right.node_id
+                name = node.feature
+                if mapper[name].is_one_hot_encoded:
+                    self._columns[t, i] = mapper.idx.get(name, node.code)
+                else:
+                    self._columns[t, i] = mapper.idx.get(name)
+                self._thresholds[t, i] = (
+                    node.threshold
+                    if mapper[name].is_numeric
+                    else self.BINARY_THRESHOLD
+                )
+
+    def _set_lengths(self, trees: tuple[Tree, ...]) -> None:
+        self._lengths = np.zeros(self._leaves.shape, dtype=np.float64)
+        for t, tree in enumerate(trees):
+            leaves = [leaf.node_id for leaf in tree.leaves]
+            self._lengths[t, leaves] = tree.lengths
@@ -2,7 +2,7 @@ from collections.abc import Iterator
 
 from pydantic import validate_call
 
-from ..typing import NonNegativeInt
+from ..typing import Array1D, NonNegativeInt
 from ._node import Node
 from ._tree import Tree
 
@@ -25,6 +25,10 @@ class TreeKeeper:
     def n_nodes(self) -> NonNegativeInt:
         return self._tree.n_nodes
 
+    @property
+    def nodes(self) -> tuple[Node, *tuple[Node, ...]]:
+        return self._tree.nodes
+
     @property
     def leaves(self) -> tuple[Node, *tuple[Node, ...]]:
         return self._tree.leaves
@@ -33,6 +37,10 @@ class TreeKeeper:
     def max_depth(self) -> NonNegativeInt:
         return self._tree.max_depth
 
+    @property
+    def lengths(self) -> Array1D:
+        return self._tree.lengths
+
     @property
     def shape(self) -> tuple[NonNegativeInt, ...]:
         return self._tree.shape
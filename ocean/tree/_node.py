@@ -12,6 +12,10 @@ class Node(NodeMixin):
     _id: NonNegativeInt
     _n_samples: NonNegativeInt
 
+    # Path length of the node, set by the parser for the leaves of
+    # the isolators.
+    _length: NonNegativeNumber | None = None
+
     __sigma: bool | None = None
     __left: "Node | None" = None
     __right: "Node | None" = None
@@ -97,7 +101,13 @@ class Node(NodeMixin):
 
     @property
     def length(self) -> NonNegativeNumber:
-        return self.depth + average_length(self.n_samples)
+        if self._length is None:
+            self._length = self.depth + average_length(self.n_samples)
+        return self._length
+
+    @length.setter
+    def length(self, length: NonNegativeNumber) -> None:
+        self._length = length
 
     @property
     def left(self) -> "Node":
@@ -30,6 +30,8 @@ class Node(NodeMixin):
     def n_samples(self) -> NonNegativeInt: ...
     @property
     def length(self) -> NonNegativeNumber: ...
+    @length.setter
+    def length(self, length: NonNegativeNumber) -> None: ...
     @property
     def is_leaf(self) -> bool: ...
     @property
@@ -1,8 +1,10 @@
 import operator
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from functools import partial
 from itertools import chain
 
+import numpy as np
+from sklearn.ensemble import IsolationForest
 from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
 
 from ..abc import Mapper
@@ -11,6 +13,7 @@ from ..typing import NonNegativeInt, ParsableEnsemble
 from ._node import Node
 from ._protocol import SKLearnTree, SKLearnTreeProtocol, TreeProtocol
 from ._tree import Tree
+from ._utils import average_lengths
 
 type DecisionTree = DecisionTreeClassifier | DecisionTreeRegressor
 
@@ -82,7 +85,23 @@ def parse_trees(
     mapper: Mapper[Feature],
 ) -> tuple[Tree, ...]:
     parser = partial(parse_tree, mapper=mapper)
-    return tuple(map(parser, trees))
+    parsed = tuple(map(parser, trees))
+    if isinstance(trees, IsolationForest):
+        _set_lengths(parsed)
+    return parsed
+
+
+def _set_lengths(trees: Sequence[Tree]) -> None:
+    # The path length of a leaf is its depth plus the average length
+    # of the samples left in it. The lengths of all the leaves of the
+    # isolators are computed in one pass, then split between them.
+    leaves = [leaf for tree in trees for leaf in tree.leaves]
+    depths = np.array([leaf.depth for leaf in leaves], dtype=np.float64)
+    n_samples = np.array([leaf.n_samples for leaf in leaves])
+    lengths = depths + average_lengths(n_samples)
+    sections = np.cumsum([len(tree.leaves) for tree in trees])[:-1]
+    for tree, values in zip(trees, np.split(lengths, sections), strict=True):
+        tree.lengths = values
 
 
 def parse_ensembles(
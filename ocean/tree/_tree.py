@@ -1,8 +1,9 @@
 from collections.abc import Iterator
 
+import numpy as np
 from pydantic import validate_call
 
-from ..typing import NonNegativeInt, PositiveInt
+from ..typing import Array1D, NonNegativeInt, PositiveInt
 from ._node import Node
 
 
@@ -10,6 +11,11 @@ class Tree:
     root: Node
     _shape: tuple[NonNegativeInt, ...]
 
+    # Path lengths of the leaves, in the order of the leaves: set by
+    # the parser for the isolators, and computed on first use for the
+    # other trees.
+    _lengths: Array1D | None = None
+
     def __init__(self, root: Node) -> None:
         self.root = root
         self._shape = root.leaves[0].value.shape
@@ -22,6 +28,10 @@ class Tree:
     def max_depth(self) -> NonNegativeInt:
         return self.root.height
 
+    @property
+    def nodes(self) -> tuple[Node, *tuple[Node, ...]]:
+        return (self.root, *self.root.descendants)
+
     @property
     def leaves(self) -> tuple[Node, *tuple[Node, ...]]:
         return self.root.leaves
@@ -30,6 +40,21 @@ class Tree:
     def shape(self) -> tuple[NonNegativeInt, ...]:
         return self._shape
 
+    @property
+    def lengths(self) -> Array1D:
+        if self._lengths is None:
+            self._lengths = np.array(
+                [leaf.length for leaf in self.leaves],
+                dtype=np.float64,
+            )
+        return self._lengths
+
+    @lengths.setter
+    def lengths(self, lengths: Array1D) -> None:
+        for leaf, length in zip(self.leaves, lengths, strict=True):
+            leaf.length = float(length)
+        self._lengths = lengths
+
     @validate_call
     def nodes_at(self, depth: NonNegativeInt) -> Iterator[Node]:
         return self._nodes_at(self.root, depth=depth)
@@ -1,9 +1,14 @@
+import numpy as np
 from sklearn.ensemble._iforest import (
     _average_path_length,  # pyright: ignore[reportAttributeAccessIssue, reportUnknownVariableType, reportPrivateUsage, reportArgumentType] # noqa: PLC2701
 )
 
-from ..typing import NonNegativeInt, NonNegativeNumber
+from ..typing import Array1D, NonNegativeInt, NonNegativeNumber
 
 
 def average_length(n: NonNegativeInt) -> NonNegativeNumber:
     return float(_average_path_length([n])[0])  # pyright: ignore[reportUnknownVariableType, reportUnknownArgumentType]
+
+
+def average_lengths(n: Array1D) -> Array1D:
+    return np.asarray(_average_path_length(n), dtype=np.float64)  # pyright: ignore[reportUnknownArgumentType]
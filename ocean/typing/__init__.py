@@ -18,11 +18,20 @@ Unit = Annotated[float, Field(gt=0.0, lt=1.0)]
 UnitO = Annotated[float, Field(ge=0.0, lt=1.0)]
 NodeId = Annotated[np.int64, Field(ge=-1)]
 
+# Norm alias:
+# - a positive integer p for the Lp norm,
+#   or np.inf for the L-infinity norm.
+type Norm = PositiveInt | float
+
 # Key alias:
 # - This is used to represent the name of a feature
 #   or the code of a one-hot encoded feature.
 type Key = int | str
 
+# Param alias:
+# - This is used to represent the value of a solver parameter.
+type Param = int | float | str
+
 # Index alias:
 type Index1L = pd.Index[Key]
 type Index = pd.Index[int] | pd.Index[str] | pd.MultiIndex
@@ -82,6 +91,7 @@ class BaseExplanation(Protocol):
     def value(self) -> Mapping[Key, Key | Number]: ...
     @property
     def query(self) -> Array1D: ...
+    def snapshot(self) -> "BaseExplanation": ...
 
 
 class BaseExplainer(Protocol):
@@ -90,8 +100,10 @@ class BaseExplainer(Protocol):
         x: Array1D,
         *,
         y: NonNegativeInt,
-        norm: PositiveInt,
+        norm: Norm,
     ) -> BaseExplanation | None: ...
+    def interrupt(self) -> None: ...
+    def cleanup(self) -> None: ...
 
 
 __all__ = [
@@ -118,7 +130,9 @@ __all__ = [
     "NonNegativeIntArray1D",
     "NonNegativeIntArray2D",
     "NonNegativeIntDtype",
+    "Norm",
     "Number",
+    "Param",
     "ParsableEnsemble",
     "PositiveInt",
     "Unit",
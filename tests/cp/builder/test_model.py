@@ -205,7 +205,7 @@ class TestConstraintProgramBuilder:
         builder.build(model, trees=[tree_var], mapper=mapper)  # 8 constraints
 
         assert len(model.Proto().constraints) == 15
-        assert len(model.Proto().variables) == 9
+        assert len(model.Proto().variables) == 8
 
     @staticmethod
     def test_build_one_hot_feature(
@@ -256,7 +256,7 @@ class TestConstraintProgramBuilder:
 
         tree_var = TreeVar(tree=tree, name="tree")
         for feature_var in feature_vars:
-            # 6 variables and 3 constraints
+            # 5 variables and 3 constraints
             feature_var.build(model)
 
         tree_var.build(model)  # 6 variables and 1 constraint
@@ -272,7 +272,7 @@ class TestConstraintProgramBuilder:
         )
         builder.build(model, trees=[tree_var], mapper=mapper)  # 16 constraints
         assert len(model.Proto().constraints) == 20
-        assert len(model.Proto().variables) == 13
+        assert len(model.Proto().variables) == 12
 
     @staticmethod
     def test_build_multiple_trees(
@@ -302,7 +302,7 @@ class TestConstraintProgramBuilder:
             TreeVar(tree=tree, name=f"tree_{i}") for i, tree in enumerate(trees)
         ]
         for feature_var in feature_vars:
-            # 7 variables and 3 constraints
+            # 6 variables and 3 constraints
             feature_var.build(model)
         for tree_var in tree_vars:
             # 18 variables and 3 constraint
@@ -320,4 +320,4 @@ class TestConstraintProgramBuilder:
         builder.build(model, trees=tree_vars, mapper=mapper)
         # 48 constraints
         assert len(model.Proto().constraints) == 54
-        assert len(model.Proto().variables) == 25
+        assert len(model.Proto().variables) == 24
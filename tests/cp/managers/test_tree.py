@@ -150,9 +150,102 @@ class TestTreeManager:
             create_simple_tree(seed + i, n_classes) for i in range(n_estimators)
         ]
         custom_scale = 1000
-        manager = TreeManager(trees=trees, scale=custom_scale)
+        with pytest.warns(UserWarning, match="rounding error"):
+            manager = TreeManager(trees=trees, scale=custom_scale)
 
         model = BaseModel()
         manager.build_trees(model)
 
         assert manager.score_scale == custom_scale
+
+    @staticmethod
+    def test_adaptive_scale(
+        seed: int,
+        n_estimators: int,
+        n_classes: int,
+    ) -> None:
+        generator = np.random.default_rng(seed)
+        trees = [
+            create_simple_tree(seed + i, n_classes) for i in range(n_estimators)
+        ]
+        weights = generator.random(n_estimators).flatten()
+        manager = TreeManager(trees=trees, weights=weights)
+
+        assert manager.score_scale <= TreeManager.MAX_SCORE_SCALE
+        assert manager.score_error <= TreeManager.DEFAULT_SCORE_TOLERANCE
+
+        # The scaled scores of the first leaves of the trees match
+        # the weighted scores up to the rounding error.
+        model = BaseModel()
+        manager.build_trees(model)
+        for tree in manager.estimators:
+            model.Add(tree[tree.leaves[0].node_id] == 1)
+        solver = cp.CpSolver()
+        solver.Solve(model)
+        assert solver.status_name() == "OPTIMAL"
+        values = [tree.leaves[0].value for tree in manager.estimators]
+        for (op, c), expr in manager.function.items():
+            expected = sum(
+                weight * value[op, c]
+                for value, weight in zip(values, weights, strict=True)
+            )
+            score = solver.Value(expr) / manager.score_scale
+            assert abs(score - expected) <= manager.score_error + 1e-12
+
+    @staticmethod
+    def test_add_margin(
+        seed: int,
+        n_estimators: int,
+        n_classes: int,
+    ) -> None:
+        trees = [
+            create_simple_tree(seed + i, n_classes) for i in range(n_estimators)
+        ]
+        manager = TreeManager(trees=trees)
+        model = BaseModel()
+        manager.build_trees(model)
+
+        # The margin constraint matches the difference of the scores
+        # for any choice of the leaves.
+        constraint = manager.add_margin(model, y=1, c=0, rhs=1)
+        linear = constraint.proto.linear
+        assert list(linear.domain) == [1, cp.INT_MAX]
+        terms = list(zip(linear.vars, linear.coeffs, strict=True))
+        constraint.proto.Clear()
+        for t, tree in enumerate(manager.estimators):
+            leaf = tree.leaves[t % len(tree.leaves)]
+            model.Add(tree[leaf.node_id] == 1)
+        solver = cp.CpSolver()
+        solver.Solve(model)
+        assert solver.status_name() == "OPTIMAL"
+        values = solver.ResponseProto().solution
+        margin = sum(coef * values[var] for var, coef in terms)
+        expr = manager.function[0, 1] - manager.function[0, 0]
+        assert margin == solver.Value(expr)
+
+
+@pytest.mark.parametrize("n_classes", N_CLASSES)
+@pytest.mark.parametrize("n_samples", [2, 3, 7])
+def test_exact_scale(n_classes: int, n_samples: int) -> None:
+    # Leaves whose values are fractions of a few samples are scaled
+    # exactly, by the least common multiple of the denominators.
+    generator = np.random.default_rng(n_samples)
+    probabilities = np.full(n_classes, 1.0 / n_classes)
+    trees: list[Tree] = []
+    for _ in range(2):
+        counts = generator.multinomial(n_samples, probabilities, (4, 1))
+        values = counts / n_samples
+        left = Node(2, value=values[0])
+        right = Node(3, value=values[1])
+        root1 = Node(1, threshold=0.5, feature="x", left=left, right=right)
+        left = Node(5, value=values[2])
+        right = Node(6, value=values[3])
+        root2 = Node(4, threshold=0.5, feature="x", left=left, right=right)
+        root = Node(0, threshold=0.5, feature="x", left=root1, right=root2)
+        trees.append(Tree(root=root))
+
+    # Non-integer weights are part of the coefficients.
+    weights = np.array([0.5, 1.5])
+    manager = TreeManager(trees=trees, weights=weights)
+    assert manager.score_error <= 1e-12
+    assert manager.score_scale <= 2 * n_samples
@@ -3,15 +3,18 @@ import pytest
 from ortools.sat.python import cp_model as cp
 
 from ocean.cp import ENV, Model
-from ocean.tree import parse_trees
+from ocean.tree import parse_ensembles, parse_trees
 
 from ..utils import (
     MAX_DEPTH,
+    MAX_SAMPLES,
     N_CLASSES,
     N_ESTIMATORS,
+    N_ISOLATORS,
     N_SAMPLES,
     SEEDS,
     train_rf,
+    train_rf_isolation,
     validate_paths,
     validate_sklearn_paths,
     validate_sklearn_pred,
@@ -54,7 +57,7 @@ class TestNoIsolation:
                 feature_vars += len(feature.levels)
                 feature_constraints += 2 * (len(feature.levels) - 1)
             elif feature.is_discrete:
-                feature_vars += len(feature.levels) + 2
+                feature_vars += len(feature.levels) + 1
                 feature_constraints += 2 * len(feature.levels)
             else:
                 feature_vars += len(feature.codes)
@@ -116,3 +119,55 @@ class TestNoIsolation:
             validate_sklearn_pred(clf, explanation, m_class=class_, model=model)
 
             model.cleanup()
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("n_estimators", N_ESTIMATORS)
+@pytest.mark.parametrize("max_depth", MAX_DEPTH)
+@pytest.mark.parametrize("n_samples", N_SAMPLES)
+@pytest.mark.parametrize("n_classes", N_CLASSES)
+@pytest.mark.parametrize("n_isolators", N_ISOLATORS)
+@pytest.mark.parametrize("max_samples", MAX_SAMPLES)
+class TestIsolation:
+    @staticmethod
+    def test_build(
+        seed: int,
+        n_estimators: int,
+        max_depth: int,
+        n_samples: int,
+        n_classes: int,
+        n_isolators: int,
+        max_samples: int,
+    ) -> None:
+        clf, ilf, mapper = train_rf_isolation(
+            seed,
+            n_estimators,
+            max_depth,
+            n_isolators,
+            max_samples,
+            n_samples,
+            n_classes,
+        )
+        trees = parse_ensembles(clf, ilf, mapper=mapper)
+        model = Model(
+            trees=trees,
+            mapper=mapper,
+            n_isolators=n_isolators,
+            max_samples=max_samples,
+        )
+        model.build()
+        assert model.n_estimators == n_estimators
+        assert len(model.isolators) == n_isolators
+
+        solver = ENV.solver
+        solver.Solve(model)
+        assert solver.status_name() == "OPTIMAL"
+
+        explanation = model.explanation
+
+        validate_solution(explanation)
+        validate_paths(*model.trees, explanation=explanation)
+        validate_sklearn_paths(clf, explanation, model.estimators)
+
+        length = solver.Value(model.length) / model.LENGTH_SCALE
+        assert length >= model.min_length - 1e-6
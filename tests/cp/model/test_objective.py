@@ -2,7 +2,7 @@ import numpy as np
 import pytest
 from ortools.sat.python import cp_model as cp
 
-from ocean.cp import ENV, Model
+from ocean.cp import ENV, FeatureVar, Model
 from ocean.tree import parse_trees
 
 from ..utils import (
@@ -51,6 +51,8 @@ class TestNoIsolation:
         solver = ENV.solver
         status = solver.Solve(model)
         assert status == cp.OPTIMAL
+        # The query itself is feasible: its distance is zero.
+        assert solver.ObjectiveValue() == 0
         model.explanation.query = x
         explanation = model.explanation
 
@@ -104,3 +106,61 @@ class TestNoIsolation:
             validate_sklearn_paths(clf, explanation, model.estimators)
             validate_sklearn_pred(clf, explanation, m_class=class_, model=model)
             model.cleanup()
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("n_estimators", N_ESTIMATORS)
+@pytest.mark.parametrize("max_depth", MAX_DEPTH)
+@pytest.mark.parametrize("n_classes", N_CLASSES)
+@pytest.mark.parametrize("norm", [1, 2, np.inf])
+def test_order_encoding(
+    seed: int,
+    n_estimators: int,
+    max_depth: int,
+    n_classes: int,
+    norm: float,
+) -> None:
+    clf, mapper, data = train_rf(
+        seed,
+        n_estimators,
+        max_depth,
+        200,
+        n_classes,
+        return_data=True,
+    )
+    trees = tuple(parse_trees(clf, mapper=mapper))
+    generator = np.random.default_rng(seed)
+
+    # The query is moved out of the data, and possibly
+    # beyond the levels of the numeric features.
+    x = np.array(data.iloc[0].to_numpy(), dtype=np.float64).flatten()
+    x += generator.normal(0.0, 1.0, x.size)
+    y = int(np.array(clf.predict(data.iloc[:1]), dtype=np.int64)[0])
+
+    for class_ in range(n_classes):
+        if class_ == y:
+            continue
+        statuses: list[str] = []
+        objectives: list[float] = []
+        for encoding in FeatureVar.Encoding:
+            model = Model(trees=trees, mapper=mapper, encoding=encoding)
+            model.build()
+            model.set_majority_class(y=class_)
+            model.add_objective(x=x, norm=norm)
+
+            solver = ENV.solver
+            solver.Solve(model)
+            status = solver.status_name()
+            statuses.append(status)
+            if status != "OPTIMAL":
+                continue
+            objectives.append(solver.ObjectiveValue())
+
+            explanation = model.explanation
+            validate_solution(explanation)
+            validate_paths(*model.trees, explanation=explanation)
+            validate_sklearn_pred(clf, explanation, m_class=class_, model=model)
+            model.cleanup()
+
+        assert statuses[0] == statuses[1]
+        assert np.allclose(objectives[:1], objectives[1:])
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from ocean.cp import Explainer
+
+from .utils import train_rf, train_rf_isolation
+
+
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize("max_samples", [4, 8])
+def test_explain_isolation(
+    seed: int,
+    n_classes: int,
+    max_samples: int,
+) -> None:
+    clf, ilf, mapper, data = train_rf_isolation(
+        seed, 5, 3, 3, max_samples, 200, n_classes, return_data=True
+    )
+    predictions = np.array(clf.predict(data), dtype=np.int64)
+    i = int(np.flatnonzero(predictions != 0)[0])
+    x = data.iloc[i, :].to_numpy().astype(float).flatten()
+
+    model = Explainer(clf, mapper=mapper, isolation=ilf)
+    assert model.n_estimators == 5
+    assert model.n_isolators == 3
+    assert model.max_samples == max_samples
+    explanation = model.explain(x, y=0, norm=1)
+    assert model.get_solving_status() == "OPTIMAL"
+    assert explanation is not None
+    prediction = np.array(
+        clf.predict(explanation.x.reshape(1, -1)), dtype=np.int64
+    )
+    assert int(prediction[0]) == 0
+    length = model.solver.Value(model.length) / model.LENGTH_SCALE
+    assert length >= model.min_length - 1e-6
+
+
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_explain_linf(seed: int, n_classes: int) -> None:
+    clf, mapper, data = train_rf(seed, 5, 3, 200, n_classes, return_data=True)
+    predictions = np.array(clf.predict(data), dtype=np.int64)
+    i = int(np.flatnonzero(predictions != 0)[0])
+    x = data.iloc[i, :].to_numpy().astype(float).flatten()
+
+    model = Explainer(clf, mapper=mapper)
+    distances: list[float] = []
+    for norm in (1, np.inf):
+        explanation = model.explain(x, y=0, norm=norm)
+        assert model.get_solving_status() == "OPTIMAL"
+        assert explanation is not None
+        prediction = np.array(
+            clf.predict(explanation.x.reshape(1, -1)), dtype=np.int64
+        )
+        assert int(prediction[0]) == 0
+        distances.append(model.get_objective_value())
+        model.cleanup()
+
+    # The maximum distance is bounded by the sum of the distances.
+    assert 0.0 < distances[1] <= distances[0]
@@ -1,3 +1,5 @@
+from typing import Literal
+
 import numpy as np
 import pytest
 from ortools.sat.python import cp_model as cp
@@ -45,6 +47,10 @@ def test_discrete(seed: int, n_levels: int, lower: int, upper: int) -> None:
     with pytest.raises(ValueError, match=msg):
         _ = var.xget("a")
 
+    msg = r"The 'objvarget' method is deprecated"
+    with pytest.warns(DeprecationWarning, match=msg):
+        assert var.objvarget() is v
+
 
 @pytest.mark.parametrize("seed", SEEDS)
 @pytest.mark.parametrize("n_levels", N_LEVELS)
@@ -94,3 +100,46 @@ def test_one_hot_encoded(seed: int, n_codes: int) -> None:
     msg = r"Code 'none' not found in the feature codes"
     with pytest.raises(ValueError, match=msg):
         _ = var.xget(code)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("n_levels", N_LEVELS)
+@pytest.mark.parametrize(
+    "ftype", [Feature.Type.CONTINUOUS, Feature.Type.DISCRETE]
+)
+def test_order(
+    seed: int,
+    n_levels: int,
+    ftype: Literal[Feature.Type.CONTINUOUS, Feature.Type.DISCRETE],
+) -> None:
+    generator = np.random.default_rng(seed)
+    levels = np.sort(generator.uniform(0.0, 1.0, n_levels))
+    model = BaseModel()
+    feature = Feature(ftype, levels=levels)
+    var = FeatureVar(
+        feature=feature,
+        name="x",
+        encoding=FeatureVar.Encoding.ORDER,
+    )
+    var.build(model)
+    n = len(var.levels) - (2 if var.is_continuous else 1)
+    assert len(var.order) == n
+    for j in range(1, n + 1):
+        assert var.oget(j) is var.order[j - 1]
+
+    msg = rf"Expected 1 <= j <= {n}, got 0"
+    with pytest.raises(ValueError, match=msg):
+        _ = var.oget(0)
+
+    msg = r"The 'mget' method is only supported for the direct encoding"
+    with pytest.raises(ValueError, match=msg):
+        _ = var.mget(0)
+
+    # Fixing x sets the literals below it.
+    j = int(generator.integers(0, n + 1))
+    model.Add(var.xget() == j)
+    solver = cp.CpSolver()
+    solver.Solve(model)
+    assert solver.status_name() == "OPTIMAL"
+    values = [solver.Value(b) for b in var.order]
+    assert values == [1] * j + [0] * (n - j)
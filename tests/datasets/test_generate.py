@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ocean.abc import Mapper
+from ocean.datasets import Generator, generate
+
+
+@pytest.mark.parametrize("seed", [0, 42])
+@pytest.mark.parametrize("n_classes", [2, 3, 5])
+def test_generate(seed: int, n_classes: int) -> None:
+    n_samples = 200
+    (data, y), mapper = generate(n_samples, n_classes=n_classes, seed=seed)
+    assert isinstance(mapper, Mapper)
+    assert isinstance(data, pd.DataFrame)
+    assert data.shape == (n_samples, mapper.n_columns)
+    assert len(y) == n_samples
+    assert set(y) == set(range(n_classes))
+
+    (other, z), _ = generate(n_samples, n_classes=n_classes, seed=seed)
+    pd.testing.assert_frame_equal(data, other)
+    pd.testing.assert_series_equal(y, z)
+
+
+def test_generate_features() -> None:
+    generator = Generator(
+        n_continuous=3,
+        n_discrete=2,
+        n_binary=4,
+        n_encoded=1,
+        n_levels=5,
+        n_categories=6,
+    )
+    (data, _), mapper = generator.generate(500, seed=0)
+    features = list(mapper.values())
+    assert sum(f.is_continuous for f in features) == 3
+    assert sum(f.is_discrete for f in features) == 2
+    assert sum(f.is_binary for f in features) == 4
+    assert sum(f.is_one_hot_encoded for f in features) == 1
+    assert all(len(f.levels) == 5 for f in features if f.is_discrete)
+    assert all(len(f.codes) == 6 for f in features if f.is_one_hot_encoded)
+    assert data.shape[1] == 3 + 2 + 4 + 6
+
+
+def test_generate_weights() -> None:
+    n_samples = 1000
+    weights = (1.0, 3.0, 6.0)
+    data, y = generate(
+        n_samples,
+        n_classes=3,
+        weights=weights,
+        seed=0,
+        return_mapper=False,
+    )
+    assert len(data) == n_samples
+    proportions = np.bincount(y) / n_samples
+    assert np.allclose(proportions, np.array(weights) / 10, atol=0.01)
+
+
+def test_generate_invalid() -> None:
+    with pytest.raises(ValueError, match="two classes"):
+        generate(10, n_classes=1)
+    with pytest.raises(ValueError, match="Expected 2 weights"):
+        generate(10, weights=(1.0, 2.0, 3.0))
+    with pytest.raises(ValueError, match="positive"):
+        generate(10, weights=(0.0, 1.0))
+    with pytest.raises(ValueError, match="At least one feature"):
+        Generator(0, 0, 0, 0).generate(10)
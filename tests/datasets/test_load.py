@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ocean.datasets import Loader
+
+RAW = pd.DataFrame(
+    {
+        ("age", "C"): [20.0, 35.0, 50.0, 65.0],
+        ("children", "D"): [0, 1, 2, 1],
+        ("city", "E"): ["a", "b", "c", "a"],
+        ("target", "T"): [0, 1, 1, 0],
+    },
+)
+
+
+@dataclass
+class OfflineLoader(Loader):
+    n_reads: int = 0
+
+    def read(self, path: str) -> pd.DataFrame:
+        assert path.endswith(".csv")
+        self.n_reads += 1
+        return RAW.copy()
+
+
+def test_load_cache(tmp_path: Path) -> None:
+    loader = OfflineLoader(cache=tmp_path)
+    (data, y), mapper = loader.load("toy")
+    assert loader.n_reads == 1
+    assert (tmp_path / "toy-raw.pkl").exists()
+    assert (tmp_path / "toy-raw.sha256").exists()
+
+    (cached, z), other = loader.load("toy")
+    assert loader.n_reads == 1
+    pd.testing.assert_frame_equal(data, cached)
+    pd.testing.assert_series_equal(y, z)
+    assert list(mapper.keys()) == list(other.keys())
+    assert mapper["children"].is_discrete
+    assert other["city"].is_one_hot_encoded
+
+    # The scaled dataset is cached on its own.
+    _ = loader.load("toy", scale=True)
+    assert loader.n_reads == 2
+
+
+@pytest.mark.parametrize("corrupt", ["pickle", "checksum"])
+def test_load_cache_corrupted(tmp_path: Path, corrupt: str) -> None:
+    loader = OfflineLoader(cache=tmp_path)
+    (data, _), _ = loader.load("toy")
+    path = tmp_path / "toy-raw.pkl"
+    if corrupt == "pickle":
+        _ = path.write_bytes(path.read_bytes()[:-1])
+    else:
+        _ = path.with_suffix(".sha256").write_text("0" * 64)
+
+    (reloaded, _), _ = loader.load("toy")
+    assert loader.n_reads == 2
+    pd.testing.assert_frame_equal(data, reloaded)
+
+    _ = loader.load("toy")
+    assert loader.n_reads == 2
+
+
+def test_load_no_cache() -> None:
+    loader = OfflineLoader(cache=None)
+    _ = loader.load("toy")
+    data, _ = loader.load("toy", return_mapper=False)
+    assert loader.n_reads == 2
+    assert isinstance(data, pd.DataFrame)
+
+
+def test_load_cache_env(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("OCEAN_CACHE", str(tmp_path))
+    assert Loader().cache == tmp_path
+    monkeypatch.setenv("OCEAN_CACHE", "")
+    assert Loader().cache is None
+
+
+def test_load_cache_xdg(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.delenv("OCEAN_CACHE", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert Loader().cache == tmp_path / "ocean"
+    monkeypatch.setenv("XDG_CACHE_HOME", "relative")
+    assert Loader().cache == Path.home() / ".cache" / "ocean"
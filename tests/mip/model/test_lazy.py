@@ -0,0 +1,167 @@
+import gurobipy as gp
+import numpy as np
+import pytest
+
+from ocean.mip import Model
+from ocean.tree import Forest, parse_ensembles, parse_trees
+
+from ...utils import ENV
+from ..utils import (
+    MAX_DEPTH,
+    N_CLASSES,
+    N_ESTIMATORS,
+    SEEDS,
+    train_rf,
+    train_rf_isolation,
+    validate_solution,
+)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("n_estimators", N_ESTIMATORS)
+@pytest.mark.parametrize("max_depth", MAX_DEPTH)
+@pytest.mark.parametrize("n_classes", N_CLASSES)
+def test_lazy_matches_full(
+    seed: int,
+    n_estimators: int,
+    max_depth: int,
+    n_classes: int,
+) -> None:
+    clf, mapper, data = train_rf(
+        seed,
+        n_estimators,
+        max_depth,
+        200,
+        n_classes,
+        return_data=True,
+    )
+    trees = tuple(parse_trees(clf, mapper=mapper))
+    full = Model(trees=trees, mapper=mapper, env=ENV)
+    full.build()
+    lazy = Model(
+        trees=trees,
+        mapper=mapper,
+        env=ENV,
+        model_type=Model.Type.LAZY,
+    )
+    lazy.build()
+    full.update()
+    lazy.update()
+    assert lazy.NumConstrs < full.NumConstrs
+
+    x = np.array(data.to_numpy()[0], dtype=np.float64).flatten()
+    y = int(np.array(clf.predict(data.iloc[:1]), dtype=np.int64)[0])
+
+    n_skipped = 0
+    for class_ in range(n_classes):
+        if class_ == y:
+            continue
+
+        statuses: list[int] = []
+        objectives: list[float] = []
+        for model in (full, lazy):
+            model.add_objective(x=x)
+            model.set_majority_class(y=class_)
+            try:
+                model.optimize()
+            except gp.GurobiError:
+                n_skipped += 1
+                break
+            statuses.append(model.Status)
+            if model.Status == gp.GRB.OPTIMAL:
+                explanation = model.explanation
+                validate_solution(explanation)
+                prediction = np.array(
+                    clf.predict(explanation.x.reshape(1, -1)), dtype=np.int64
+                )
+                assert int(prediction[0]) == class_
+                objectives.append(model.ObjVal)
+            model.cleanup()
+        else:
+            assert statuses[0] == statuses[1]
+            assert np.allclose(objectives[:1], objectives[1:])
+
+    if n_skipped > 0:
+        msg = f"Skipped {n_skipped} tests due to GurobiErrors"
+        pytest.skip(msg)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_lazy_isolation(seed: int) -> None:
+    n_isolators = 2
+    clf, ilf, mapper = train_rf_isolation(seed, 4, 3, n_isolators, 8, 200, 2)
+    trees = parse_ensembles(clf, ilf, mapper=mapper)
+    model = Model(
+        trees=trees,
+        mapper=mapper,
+        n_isolators=n_isolators,
+        env=ENV,
+        model_type=Model.Type.LAZY,
+    )
+    model.build()
+
+    try:
+        model.optimize()
+    except gp.GurobiError as e:
+        pytest.skip(f"Skipping test due to {e}")
+
+    assert model.Status == gp.GRB.OPTIMAL
+    assert model.length.getValue() >= model.min_length - 1e-6
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("model_type", [Model.Type.MIP, Model.Type.LAZY])
+def test_lazy_isolation_cut(seed: int, model_type: Model.Type) -> None:
+    n_isolators = 4
+    clf, ilf, mapper, data = train_rf_isolation(
+        seed,
+        4,
+        3,
+        n_isolators,
+        8,
+        200,
+        2,
+        return_data=True,
+    )
+    trees = parse_ensembles(clf, ilf, mapper=mapper)
+    x = np.array(data.to_numpy()[0], dtype=np.float64).flatten()
+    y = 1 - int(np.array(clf.predict(data.iloc[:1]), dtype=np.int64)[0])
+
+    objectives: list[float] = []
+    n_constrs: list[int] = []
+    for isolation_type in Model.IsolationType:
+        model = Model(
+            trees=trees,
+            mapper=mapper,
+            n_isolators=n_isolators,
+            max_samples=8,
+            env=ENV,
+            model_type=model_type,
+            isolation_type=isolation_type,
+        )
+        model.build()
+        model.update()
+        n_constrs.append(model.NumConstrs)
+        model.add_objective(x=x)
+        model.set_majority_class(y=y)
+        try:
+            model.optimize()
+        except gp.GurobiError as e:
+            pytest.skip(f"Skipping test due to {e}")
+        assert model.Status == gp.GRB.OPTIMAL
+        objectives.append(model.ObjVal)
+
+        # The leaves reached by the explanation are long enough.
+        explanation = model.explanation.x
+        isolators = Forest(trees[len(clf) :], mapper=mapper)
+        nodes = isolators.apply(explanation)
+        length = sum(
+            leaf.length
+            for tree, node in zip(trees[len(clf) :], nodes, strict=True)
+            for leaf in tree.leaves
+            if leaf.node_id == node
+        )
+        assert length >= model.min_length - 1e-6
+
+    assert n_constrs[1] < n_constrs[0]
+    assert np.isclose(objectives[0], objectives[1])
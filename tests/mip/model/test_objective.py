@@ -144,3 +144,106 @@ class TestNoIsolation:
             msg = f"Skipped {n_skipped} tests due to GurobiErrors"
             # This test passes but some tests were skipped
             pytest.skip(msg)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("n_estimators", N_ESTIMATORS)
+@pytest.mark.parametrize("max_depth", MAX_DEPTH)
+@pytest.mark.parametrize("n_classes", N_CLASSES)
+def test_piecewise_l2(
+    seed: int,
+    n_estimators: int,
+    max_depth: int,
+    n_classes: int,
+) -> None:
+    clf, mapper, data = train_rf(
+        seed,
+        n_estimators,
+        max_depth,
+        200,
+        n_classes,
+        return_data=True,
+    )
+    trees = tuple(parse_trees(clf, mapper=mapper))
+    x = np.array(data.to_numpy()[0], dtype=np.float64).flatten()
+    y = int(np.array(clf.predict(data.iloc[:1]), dtype=np.int64)[0])
+
+    models = [
+        Model(trees=trees, mapper=mapper, env=ENV, l2_type=l2_type)
+        for l2_type in Model.L2Type
+    ]
+    for model in models:
+        model.build()
+
+    for class_ in range(n_classes):
+        if class_ == y:
+            continue
+        objectives: list[float] = []
+        for model in models:
+            model.set_majority_class(y=class_)
+            model.add_objective(x=x, norm=2)
+            try:
+                model.optimize()
+            except gp.GurobiError as e:
+                pytest.skip(f"Skipping test due to {e}")
+            if model.Status != gp.GRB.OPTIMAL:
+                break
+            if model.l2_type == Model.L2Type.PIECEWISE_LINEAR:
+                assert not model.IsQP
+            validate_sklearn_pred(
+                clf, model.explanation, m_class=class_, model=model
+            )
+            objectives.append(model.ObjVal)
+            model.clear_majority_class()
+            model.cleanup()
+        else:
+            # The interpolation is exact at the levels, and above
+            # the squared distance in between.
+            quadratic, piecewise = objectives
+            assert piecewise >= quadratic - 1e-6
+            assert np.isclose(piecewise, quadratic, rtol=1e-2, atol=1e-3)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("n_estimators", N_ESTIMATORS)
+@pytest.mark.parametrize("max_depth", MAX_DEPTH)
+@pytest.mark.parametrize("n_classes", N_CLASSES)
+def test_linf(
+    seed: int,
+    n_estimators: int,
+    max_depth: int,
+    n_classes: int,
+) -> None:
+    clf, mapper, data = train_rf(
+        seed,
+        n_estimators,
+        max_depth,
+        200,
+        n_classes,
+        return_data=True,
+    )
+    trees = tuple(parse_trees(clf, mapper=mapper))
+    model = Model(trees=trees, mapper=mapper, env=ENV)
+    model.build()
+    x = np.array(data.to_numpy()[0], dtype=np.float64).flatten()
+    y = int(np.array(clf.predict(data.iloc[:1]), dtype=np.int64)[0])
+
+    for class_ in range(n_classes):
+        if class_ == y:
+            continue
+        model.set_majority_class(y=class_)
+        model.add_objective(x=x, norm=np.inf)
+        try:
+            model.optimize()
+        except gp.GurobiError as e:
+            pytest.skip(f"Skipping test due to {e}")
+        if model.Status == gp.GRB.OPTIMAL:
+            assert not model.IsQP
+            explanation = model.explanation
+            validate_solution(explanation)
+            validate_sklearn_pred(clf, explanation, m_class=class_, model=model)
+            # The epigraph variable is the largest distance.
+            distance = np.abs(explanation.x - x).max()
+            assert np.isclose(model.ObjVal, distance, atol=1e-6)
+        model.clear_majority_class()
+        model.cleanup()
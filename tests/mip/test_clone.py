@@ -0,0 +1,110 @@
+import gc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+
+from ocean.mip import EnvPool, Explainer, Model, TreeVar
+
+from ..utils import ENV
+from .utils import train_rf
+
+N_QUERIES = 4
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"flow_type": TreeVar.FlowType.BINARY},
+        {"model_type": Model.Type.LAZY},
+        {"isolation_type": Model.IsolationType.FULL},
+        {"isolation_type": Model.IsolationType.LAZY},
+    ],
+)
+def test_clone(kwargs: dict[str, object]) -> None:
+    rf, mapper, data = train_rf(42, 5, 3, 100, 2, return_data=True)
+    isolation = None
+    if "isolation_type" in kwargs:
+        isolation = IsolationForest(
+            n_estimators=3,
+            max_samples=16,  # pyright: ignore[reportArgumentType]
+        )
+        isolation.fit(data)
+    explainer = Explainer(
+        rf,
+        mapper=mapper,
+        isolation=isolation,
+        env=ENV,
+        **kwargs,  # type: ignore[arg-type]
+    )
+    x = data.iloc[:N_QUERIES, :].to_numpy().astype(float)
+    y = 1 - np.array(rf.predict(data.iloc[:N_QUERIES]), dtype=np.int64)
+
+    def solve(model: Explainer, i: int) -> float:
+        explanation = model.explain(x[i], y=int(y[i]), norm=1)
+        assert explanation is not None
+        assert rf.predict(explanation.to_numpy().reshape(1, -1))[0] == y[i]
+        objective = model.get_objective_value()
+        model.cleanup()
+        return objective
+
+    expected = [solve(explainer, i) for i in range(N_QUERIES)]
+    clones = [explainer.clone() for _ in range(N_QUERIES)]
+    assert all(clone.measure() == explainer.measure() for clone in clones)
+    assert clones[0].vget(0) is not explainer.vget(0)
+    assert clones[0].vget(0).VarName == explainer.vget(0).VarName
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        objectives = list(executor.map(solve, clones, range(N_QUERIES)))
+    assert np.allclose(objectives, expected)
+    assert np.isclose(solve(explainer, 0), expected[0])
+
+
+def test_clone_during_query() -> None:
+    rf, mapper, data = train_rf(42, 3, 2, 100, 2, return_data=True)
+    explainer = Explainer(rf, mapper=mapper, env=ENV)
+    x = data.iloc[0, :].to_numpy().astype(float)
+    explainer.add_objective(x, norm=1)
+    explainer.set_majority_class(y=0)
+    msg = r"The model cannot be cloned during a query."
+    with pytest.raises(ValueError, match=msg):
+        explainer.clone()
+    explainer.cleanup()
+    clone = explainer.clone(env=ENV)
+    assert clone.measure() == explainer.measure()
+
+
+def test_clone_quadratic() -> None:
+    rf, mapper = train_rf(42, 3, 2, 100, 2)
+    explainer = Explainer(rf, mapper=mapper, env=ENV)
+    x = explainer.vget(0)
+    explainer.setObjective(x * x + 1.0)
+    msg = r"Only the linear objective of a model can be copied."
+    with pytest.raises(ValueError, match=msg):
+        explainer.clone(env=ENV)
+    explainer.setObjective(2.0 * x + 1.0)
+    clone = explainer.clone(env=ENV)
+    clone.update()
+    assert clone.ObjCon == 1.0
+    assert clone.vget(0).Obj == 2.0
+
+
+def test_clone_release() -> None:
+    rf, mapper = train_rf(42, 3, 2, 100, 2)
+    explainer = Explainer(rf, mapper=mapper, env=ENV)
+    pool = EnvPool({"OutputFlag": 0})
+    default = EnvPool.default()
+    EnvPool.set_default(pool)
+    try:
+        baseline = len(pool)
+        clones = [explainer.clone() for _ in range(N_QUERIES)]
+        assert len(pool) == baseline + N_QUERIES
+        clones.pop().dispose()
+        assert len(pool) == baseline + N_QUERIES - 1
+        del clones
+        gc.collect()
+        assert len(pool) == baseline
+    finally:
+        EnvPool.set_default(default)
+        pool.close()
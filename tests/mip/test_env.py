@@ -0,0 +1,112 @@
+import os
+import threading
+from collections.abc import Iterator
+
+import gurobipy as gp
+import numpy as np
+import pytest
+
+from ocean.mip import BaseModel, EnvPool, Explainer
+
+from .utils import train_rf
+
+
+@pytest.fixture
+def pool() -> Iterator[EnvPool]:
+    pool = EnvPool({"OutputFlag": 0, "Threads": 1, "Seed": 7})
+    default = EnvPool.default()
+    EnvPool.set_default(pool)
+    try:
+        yield pool
+    finally:
+        EnvPool.set_default(default)
+        pool.close()
+
+
+def get_in_thread(pool: EnvPool) -> gp.Env:
+    envs: list[gp.Env] = []
+    thread = threading.Thread(target=lambda: envs.append(pool.get()))
+    thread.start()
+    thread.join()
+    return envs[0]
+
+
+@pytest.mark.parametrize("scope", list(EnvPool.Scope))
+def test_env_pool_scope(scope: EnvPool.Scope) -> None:
+    with EnvPool({"OutputFlag": 0}, scope=scope) as pool:
+        env = pool.get()
+        assert pool.get() is env
+        other = get_in_thread(pool)
+        # The environment of a thread is released when it exits.
+        assert (other is env) == (scope == EnvPool.Scope.PROCESS)
+        assert len(pool) == 1
+    assert len(pool) == 0
+
+
+def test_env_pool_default_scope() -> None:
+    # One environment, and license checkout, per process by default.
+    with EnvPool({"OutputFlag": 0}) as pool:
+        assert pool.scope == EnvPool.Scope.PROCESS
+
+
+def test_env_pool_thread_release() -> None:
+    pool = EnvPool({"OutputFlag": 0}, scope=EnvPool.Scope.THREAD)
+    started, release = threading.Event(), threading.Event()
+
+    def work() -> None:
+        _ = pool.get()
+        started.set()
+        _ = release.wait()
+
+    threads = [threading.Thread(target=work) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+        _ = started.wait()
+        started.clear()
+    assert len(pool) == 3
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(pool) == 0
+    pool.close()
+
+
+def test_env_pool_params(pool: EnvPool) -> None:
+    model = BaseModel()
+    assert model.Params.OutputFlag == 0
+    assert model.Params.Threads == 1
+    assert model.Params.Seed == 7
+    assert pool.params == {"OutputFlag": 0, "Threads": 1, "Seed": 7}
+    model.dispose()
+
+
+def test_env_pool_explainers(pool: EnvPool) -> None:
+    rf, mapper, data = train_rf(42, 3, 2, 100, 2, return_data=True)
+    explainers = [Explainer(rf, mapper=mapper) for _ in range(3)]
+    assert len(pool) == 1
+    x = data.iloc[0, :].to_numpy().astype(float)
+    y = 1 - int(np.array(rf.predict(data.iloc[:1]), dtype=np.int64)[0])
+    for explainer in explainers:
+        explanation = explainer.explain(x, y=y, norm=1)
+        assert explanation is not None
+        assert explainer.Params.Threads == 1
+        explainer.dispose()
+
+
+def test_env_pool_fork() -> None:
+    if not hasattr(os, "fork"):
+        pytest.skip("The platform cannot fork.")
+    with EnvPool({"OutputFlag": 0}, scope=EnvPool.Scope.PROCESS) as pool:
+        env = pool.get()
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            code = int(pool.get() is env or len(pool) != 1)
+            os.write(write, bytes([code]))
+            os._exit(0)
+        os.close(write)
+        status = os.read(read, 1)
+        os.close(read)
+        _ = os.waitpid(pid, 0)
+        assert status == bytes([0])
+        assert pool.get() is env
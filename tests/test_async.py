@@ -0,0 +1,212 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+import gurobipy as gp
+import numpy as np
+import pytest
+from ortools.sat.python import cp_model as cp
+from sklearn.ensemble import RandomForestClassifier
+
+from ocean import (
+    AsyncExplainer,
+    ConstraintProgrammingExplainer,
+    ExplainerBusyError,
+    MixedIntegerProgramExplainer,
+)
+
+from .utils import ENV, generate_data
+
+if TYPE_CHECKING:
+    from ocean.typing import BaseExplainer
+
+
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("n_explainers", [1, 2])
+def test_async_mip_explain(seed: int, n_explainers: int) -> None:
+    data, y, mapper = generate_data(seed, 200, 2)
+    clf = RandomForestClassifier(
+        random_state=seed,
+        n_estimators=5,
+        max_depth=3,
+    )
+    clf.fit(data, y)
+    explainer = AsyncExplainer(
+        MixedIntegerProgramExplainer(clf, mapper=mapper, env=ENV)
+        for _ in range(n_explainers)
+    )
+    queries = [
+        (data.iloc[i, :].to_numpy().astype(float).flatten(), int(1 - p))
+        for i, p in enumerate(
+            np.array(clf.predict(data.iloc[:4]), dtype=np.int64)
+        )
+    ]
+
+    async def main() -> list[np.ndarray | None]:
+        explanations = await asyncio.gather(
+            *(explainer.explain(x, y=target, norm=1) for x, target in queries)
+        )
+        return [None if e is None else e.x for e in explanations]
+
+    try:
+        results = asyncio.run(main())
+    except gp.GurobiError as e:
+        pytest.skip(f"Skipping test due to {e}")
+    finally:
+        explainer.shutdown()
+
+    assert explainer.n_idle == n_explainers
+    for (_, target), x in zip(queries, results, strict=True):
+        assert x is not None
+        prediction = np.array(clf.predict(x.reshape(1, -1)), dtype=np.int64)
+        assert int(prediction[0]) == target
+
+
+@pytest.mark.parametrize("seed", [42, 43, 44])
+def test_async_cp_explain(seed: int) -> None:
+    data, y, mapper = generate_data(seed, 200, 2)
+    clf = RandomForestClassifier(
+        random_state=seed,
+        n_estimators=5,
+        max_depth=3,
+    )
+    clf.fit(data, y)
+    explainer = AsyncExplainer(
+        ConstraintProgrammingExplainer(
+            clf,
+            mapper=mapper,
+            solver=cp.CpSolver(),
+        )
+        for _ in range(2)
+    )
+    queries = [
+        (data.iloc[i, :].to_numpy().astype(float).flatten(), int(1 - p))
+        for i, p in enumerate(
+            np.array(clf.predict(data.iloc[:4]), dtype=np.int64)
+        )
+    ]
+
+    async def main() -> list[np.ndarray | None]:
+        explanations = await asyncio.gather(
+            *(explainer.explain(x, y=target, norm=1) for x, target in queries)
+        )
+        return [None if e is None else e.x for e in explanations]
+
+    results = asyncio.run(main())
+    explainer.shutdown()
+
+    assert explainer.n_idle == 2
+    for (_, target), x in zip(queries, results, strict=True):
+        assert x is not None
+        prediction = np.array(clf.predict(x.reshape(1, -1)), dtype=np.int64)
+        assert int(prediction[0]) == target
+
+
+@pytest.mark.parametrize("seed", [42, 43])
+def test_async_explain_pool(seed: int) -> None:
+    data, y, mapper = generate_data(seed, 200, 2)
+    clf = RandomForestClassifier(
+        random_state=seed,
+        n_estimators=5,
+        max_depth=3,
+    )
+    clf.fit(data, y)
+    explainers: list[BaseExplainer] = [
+        MixedIntegerProgramExplainer(clf, mapper=mapper, env=ENV),
+        ConstraintProgrammingExplainer(clf, mapper=mapper),
+    ]
+    explainer = AsyncExplainer(explainers)
+    x = data.iloc[0, :].to_numpy().astype(float).flatten()
+    target = 1 - int(np.array(clf.predict(data.iloc[:1]), dtype=np.int64)[0])
+
+    async def main() -> list[tuple[np.ndarray, ...]]:
+        pools = await asyncio.gather(
+            *(explainer.explain(x, y=target, norm=1, k=3) for _ in range(2))
+        )
+        return [tuple(e.x for e in pool) for pool in pools]
+
+    try:
+        results = asyncio.run(main())
+    except gp.GurobiError as e:
+        pytest.skip(f"Skipping test due to {e}")
+    finally:
+        explainer.shutdown()
+
+    assert explainer.n_idle == 2
+    for pool in results:
+        assert len(pool) > 0
+        predictions = np.array(clf.predict(np.vstack(pool)), dtype=np.int64)
+        assert np.all(predictions == target)
+
+
+def test_async_shared_solver() -> None:
+    # The CP explainers of a pool cannot share the default solver.
+    data, y, mapper = generate_data(42, 200, 2)
+    clf = RandomForestClassifier(random_state=42, n_estimators=5, max_depth=3)
+    clf.fit(data, y)
+    with pytest.raises(ValueError, match="share a solver"):
+        _ = AsyncExplainer(
+            ConstraintProgrammingExplainer(clf, mapper=mapper) for _ in range(2)
+        )
+
+
+def test_async_admission() -> None:
+    data, y, mapper = generate_data(42, 500, 2)
+    clf = RandomForestClassifier(
+        random_state=42,
+        n_estimators=50,
+        max_depth=8,
+    )
+    clf.fit(data, y)
+    explainer = AsyncExplainer(
+        [ConstraintProgrammingExplainer(clf, mapper=mapper)],
+        max_waiting=0,
+    )
+    x = data.iloc[0, :].to_numpy().astype(float).flatten()
+    target = 1 - int(np.array(clf.predict(data.iloc[:1]), dtype=np.int64)[0])
+
+    async def main() -> None:
+        task = asyncio.create_task(explainer.explain(x, y=target, norm=1))
+        await asyncio.sleep(0)
+        with pytest.raises(ExplainerBusyError):
+            await explainer.explain(x, y=target, norm=1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        while explainer.n_idle == 0:  # noqa: ASYNC110
+            await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    explainer.shutdown()
+    assert explainer.n_idle == 1
+
+
+def test_async_cancel() -> None:
+    data, y, mapper = generate_data(42, 500, 2)
+    clf = RandomForestClassifier(
+        random_state=42,
+        n_estimators=100,
+        max_depth=10,
+    )
+    clf.fit(data, y)
+    explainer = AsyncExplainer([
+        ConstraintProgrammingExplainer(clf, mapper=mapper, solver=cp.CpSolver())
+    ])
+    x = data.iloc[0, :].to_numpy().astype(float).flatten()
+    target = 1 - int(np.array(clf.predict(data.iloc[:1]), dtype=np.int64)[0])
+
+    async def main() -> float:
+        start = time.time()
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(
+                explainer.explain(x, y=target, norm=1, max_time=60),
+                timeout=0.5,
+            )
+        while explainer.n_idle == 0:  # noqa: ASYNC110
+            await asyncio.sleep(0.01)
+        return time.time() - start
+
+    elapsed = asyncio.run(main())
+    explainer.shutdown()
+    assert elapsed < 30
+    assert explainer.n_idle == 1
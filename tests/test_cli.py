@@ -0,0 +1,127 @@
+import json
+import pickle  # noqa: S403
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from ocean.cli import Checkpoint, main
+
+from .utils import generate_data
+
+N_SAMPLES = 12
+
+
+@pytest.fixture
+def job(tmp_path: Path) -> tuple[Path, Path, pd.DataFrame]:
+    data, y, mapper = generate_data(42, 200, 2)
+    clf = RandomForestClassifier(random_state=42, n_estimators=5, max_depth=3)
+    clf.fit(data, y)
+    model = tmp_path / "model.pkl"
+    _ = model.write_bytes(pickle.dumps({"ensemble": clf, "mapper": mapper}))
+    queries = data.iloc[:N_SAMPLES]
+    path = tmp_path / "queries.csv"
+    queries.to_csv(path, index=False)
+    return model, path, queries
+
+
+def read(path: Path) -> list[dict[str, Any]]:
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_cli_explain(
+    job: tuple[Path, Path, pd.DataFrame],
+    tmp_path: Path,
+    n_workers: int,
+) -> None:
+    model, path, queries = job
+    output = tmp_path / "output.jsonl"
+    argv = [
+        "explain",
+        str(model),
+        str(path),
+        str(output),
+        "--engine",
+        "cp",
+        "--chunk-size",
+        "5",
+        "--workers",
+        str(n_workers),
+    ]
+    assert main(argv) == 0
+    records = read(output)
+    assert [r["index"] for r in records] == list(range(N_SAMPLES))
+    for record in records:
+        assert record["status"] == "OPTIMAL"
+        assert len(record["counterfactual"]) == queries.shape[1]
+        assert record["objective"] > 0
+    assert not output.with_name("output.jsonl.checkpoint").exists()
+
+
+def test_cli_resume(
+    job: tuple[Path, Path, pd.DataFrame],
+    tmp_path: Path,
+) -> None:
+    model, path, _ = job
+    output = tmp_path / "output.jsonl"
+    argv = ["explain", str(model), str(path), str(output), "--engine", "cp"]
+    assert main(argv) == 0
+    records = read(output)
+
+    # An interrupted job: five rows done, then a partial record.
+    lines = output.read_text(encoding="utf-8").splitlines(keepends=True)
+    content = "".join(lines[:5])
+    _ = output.write_text(content + lines[5][:10], encoding="utf-8")
+    checkpoint = output.with_name("output.jsonl.checkpoint")
+    Checkpoint(n_rows=5, size=len(content.encode())).dump(checkpoint)
+
+    assert main(argv) == 0
+    resumed = read(output)
+    assert [r["index"] for r in resumed] == list(range(N_SAMPLES))
+    assert resumed[:5] == records[:5]
+    for record, other in zip(resumed, records, strict=True):
+        assert record["objective"] == pytest.approx(other["objective"])
+
+
+def test_cli_overwrite(
+    job: tuple[Path, Path, pd.DataFrame],
+    tmp_path: Path,
+) -> None:
+    model, path, _ = job
+    output = tmp_path / "output.jsonl"
+    argv = ["explain", str(model), str(path), str(output), "--engine", "cp"]
+    assert main(argv) == 0
+    content = output.read_text(encoding="utf-8")
+
+    # Without a checkpoint, the output is only overwritten on restart.
+    with pytest.raises(FileExistsError, match="--restart"):
+        _ = main(argv)
+    assert output.read_text(encoding="utf-8") == content
+    assert main([*argv, "--restart"]) == 0
+    assert [r["index"] for r in read(output)] == list(range(N_SAMPLES))
+
+
+def test_cli_target_column(
+    job: tuple[Path, Path, pd.DataFrame],
+    tmp_path: Path,
+) -> None:
+    model, _, queries = job
+    path = tmp_path / "targets.csv"
+    queries.assign(target=1).to_csv(path, index=False)
+    output = tmp_path / "output.jsonl"
+    argv = [
+        "explain",
+        str(model),
+        str(path),
+        str(output),
+        "--engine",
+        "cp",
+        "--target-column",
+        "target",
+    ]
+    assert main(argv) == 0
+    assert all(r["target"] == 1 for r in read(output))
@@ -1,11 +1,65 @@
 import gurobipy as gp
+import numpy as np
+import pandas as pd
 import pytest
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
 
 from ocean import ConstraintProgrammingExplainer, MixedIntegerProgramExplainer
+from ocean.abc import Mapper
+from ocean.feature import Feature, parse_features
+from ocean.tree import Forest
+from ocean.typing import Array, IntArray1D, NonNegativeArray1D
 
 from .utils import ENV, generate_data
 
+type Explainer = MixedIntegerProgramExplainer | ConstraintProgrammingExplainer
+
+ENGINES = ["mip", "cp"]
+
+
+def fit(
+    seed: int,
+    n_classes: int,
+) -> tuple[RandomForestClassifier, pd.DataFrame, Mapper[Feature]]:
+    data, y, mapper = generate_data(seed, 200, n_classes)
+    clf = RandomForestClassifier(
+        random_state=seed,
+        n_estimators=5,
+        max_depth=3,
+    )
+    clf.fit(data, y)
+    return clf, data, mapper
+
+
+def build(
+    engine: str,
+    clf: RandomForestClassifier,
+    mapper: Mapper[Feature],
+    *,
+    weights: NonNegativeArray1D | None = None,
+    isolation: IsolationForest | None = None,
+) -> Explainer:
+    if engine == "mip":
+        return MixedIntegerProgramExplainer(
+            clf,
+            mapper=mapper,
+            weights=weights,
+            isolation=isolation,
+            env=ENV,
+        )
+    return ConstraintProgrammingExplainer(
+        clf,
+        mapper=mapper,
+        weights=weights,
+        isolation=isolation,
+    )
+
+
+def predict(clf: RandomForestClassifier, x: Array | pd.DataFrame) -> IntArray1D:
+    if isinstance(x, np.ndarray) and x.ndim == 1:
+        x = x.reshape(1, -1)
+    return np.array(clf.predict(x), dtype=np.int64)
+
 
 @pytest.mark.parametrize("seed", [42, 43, 44])
 @pytest.mark.parametrize("n_estimators", [5])
@@ -30,19 +84,23 @@ def test_mip_explain(
     clf.fit(data, y)
     model = MixedIntegerProgramExplainer(clf, mapper=mapper, env=ENV)
 
-    x = data.iloc[0, :].to_numpy().astype(float).flatten()
-    # pyright: ignore[reportUnknownVariableType]
+    # The query must not already be classified as the target,
+    # otherwise it is answered by the prechecks without solving.
+    i = int(np.flatnonzero(predict(clf, data) != 0)[0])
+    x = data.iloc[i, :].to_numpy().astype(float).flatten()
 
     try:
-        model.explain(x, y=0, norm=1,
-                      num_workers=num_workers,
-                      random_seed=seed)
+        model.explain(x, y=0, norm=1, num_workers=num_workers, random_seed=seed)
         assert model.Status == gp.GRB.OPTIMAL
         model.cleanup()
-        model.explain(x, y=0, norm=1,
-                      return_callback=True,
-                      num_workers=num_workers,
-                      random_seed=seed)
+        model.explain(
+            x,
+            y=0,
+            norm=1,
+            return_callback=True,
+            num_workers=num_workers,
+            random_seed=seed,
+        )
         assert len(model.callback.sollist) != 0
 
     except gp.GurobiError as e:
@@ -72,20 +130,288 @@ def test_cp_explain(
     clf.fit(data, y)
     model = ConstraintProgrammingExplainer(clf, mapper=mapper)
 
-    x = data.iloc[0, :].to_numpy().astype(float).flatten()
-    # pyright: ignore[reportUnknownVariableType]
+    # The query must not already be classified as the target,
+    # otherwise it is answered by the prechecks without solving.
+    i = int(np.flatnonzero(predict(clf, data) != 0)[0])
+    x = data.iloc[i, :].to_numpy().astype(float).flatten()
 
     try:
-        _ = model.explain(x, y=0, norm=1,
-                          return_callback=False,
-                          num_workers=num_workers,
-                          random_seed=seed)
+        _ = model.explain(
+            x,
+            y=0,
+            norm=1,
+            return_callback=False,
+            num_workers=num_workers,
+            random_seed=seed,
+        )
         assert model.callback is None or len(model.callback.sollist) == 0
         model.cleanup()
-        _ = model.explain(x, y=0, norm=1,
-                          return_callback=True,
-                          num_workers=num_workers,
-                          random_seed=seed)
+        _ = model.explain(
+            x,
+            y=0,
+            norm=1,
+            return_callback=True,
+            num_workers=num_workers,
+            random_seed=seed,
+        )
         assert model.callback is None or len(model.callback.sollist) != 0
     except gp.GurobiError as e:
         pytest.skip(f"Skipping test due to {e}")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize("k", [1, 3])
+@pytest.mark.parametrize("min_distance", [0.0, 0.5])
+def test_explain_pool(
+    engine: str,
+    seed: int,
+    n_classes: int,
+    k: int,
+    min_distance: float,
+) -> None:
+    clf, data, mapper = fit(seed, n_classes)
+    model = build(engine, clf, mapper)
+    x = data.iloc[0, :].to_numpy().astype(float).flatten()
+    target = (int(predict(clf, data.iloc[:1])[0]) + 1) % n_classes
+
+    try:
+        explanations = model.explain(
+            x, y=target, norm=1, k=k, min_distance=min_distance
+        )
+    except gp.GurobiError as e:
+        pytest.skip(f"Skipping test due to {e}")
+
+    assert 0 < len(explanations) <= k
+    distances = [float(np.abs(e.x - x).sum()) for e in explanations]
+    assert np.all(np.diff(distances) >= -1e-6)
+    for i, explanation in enumerate(explanations):
+        assert predict(clf, explanation.x)[0] == target
+        for other in explanations[:i]:
+            distance = float(np.abs(explanation.x - other.x).sum())
+            assert distance > 0.0
+            assert distance >= min_distance
+    model.cleanup()
+
+
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("k", [5, 10])
+def test_explain_pool_engines(seed: int, k: int) -> None:
+    # On binary and one-hot encoded features, both engines measure
+    # the L1 distance exactly: they find the same k best objectives.
+    generator = np.random.default_rng(seed)
+    binaries = {f"binary_{i}": generator.integers(0, 2, 200) for i in range(4)}
+    data, mapper = parse_features(
+        pd.DataFrame({
+            **binaries,
+            "encoded_0": generator.choice(["a", "b", "c", "d"], 200),
+            "encoded_1": generator.choice(["a", "b", "c"], 200),
+        })
+    )
+    clf = RandomForestClassifier(random_state=seed, n_estimators=5, max_depth=3)
+    clf.fit(data, generator.integers(0, 2, 200))
+    x = data.iloc[0, :].to_numpy().astype(float).flatten()
+    target = 1 - int(predict(clf, data.iloc[:1])[0])
+
+    objectives: list[list[float]] = []
+    for engine in ENGINES:
+        model = build(engine, clf, mapper)
+        explanations = model.explain(x, y=target, norm=1, k=k)
+        objectives.append([float(np.abs(e.x - x).sum()) for e in explanations])
+        for explanation in explanations:
+            assert predict(clf, explanation.x)[0] == target
+        assert np.isclose(model.get_objective_value(), objectives[-1][0])
+    assert len(objectives[1]) == k
+    assert np.allclose(objectives[0], objectives[1])
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_explain_iter(engine: str, seed: int, n_classes: int) -> None:
+    clf, data, mapper = fit(seed, n_classes)
+    model = build(engine, clf, mapper)
+    x = data.iloc[0, :].to_numpy().astype(float).flatten()
+    target = (int(predict(clf, data.iloc[:1])[0]) + 1) % n_classes
+
+    try:
+        incumbents = list(model.explain_iter(x, y=target, norm=1))
+    except gp.GurobiError as e:
+        pytest.skip(f"Skipping test due to {e}")
+
+    assert model.get_solving_status() == "OPTIMAL"
+    assert len(incumbents) > 0
+    objectives = [incumbent.objective for incumbent in incumbents]
+    assert np.all(np.diff(objectives) <= 1e-6)
+    assert np.isclose(objectives[-1], model.get_objective_value())
+    for incumbent in incumbents:
+        assert incumbent.bound <= incumbent.objective + 1e-6
+        assert predict(clf, incumbent.explanation.x)[0] == target
+    model.cleanup()
+
+    for _ in model.explain_iter(x, y=target, norm=1):
+        break
+    model.cleanup()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("mip_gap", [0.1, 0.5])
+def test_explain_gap(engine: str, seed: int, mip_gap: float) -> None:
+    clf, data, mapper = fit(seed, 2)
+    model = build(engine, clf, mapper)
+    x = data.iloc[0, :].to_numpy().astype(float).flatten()
+    target = 1 - int(predict(clf, data.iloc[:1])[0])
+
+    try:
+        explanation = model.explain(x, y=target, norm=1)
+        assert explanation is not None
+        optimum = model.get_objective_value()
+        assert explanation.gap is not None
+        assert explanation.bound is not None
+        assert np.isclose(explanation.bound, optimum, atol=1e-6)
+        model.cleanup()
+
+        explanation = model.explain(x, y=target, norm=1, mip_gap=mip_gap)
+        assert explanation is not None
+        assert explanation.gap is not None
+        assert explanation.bound is not None
+        assert explanation.gap <= mip_gap + 1e-6
+        assert explanation.bound <= optimum + 1e-6
+        model.cleanup()
+
+        with pytest.warns(UserWarning, match="cutoff"):
+            explanation = model.explain(
+                x, y=target, norm=1, objective_cutoff=optimum / 2
+            )
+        assert explanation is None
+        model.cleanup()
+
+        explanation = model.explain(
+            x, y=target, norm=1, objective_cutoff=2 * optimum
+        )
+        assert explanation is not None
+        assert np.isclose(model.get_objective_value(), optimum)
+    except gp.GurobiError as e:
+        pytest.skip(f"Skipping test due to {e}")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_explain_precheck(engine: str, seed: int, n_classes: int) -> None:
+    clf, data, mapper = fit(seed, n_classes)
+    x = data.iloc[0, :].to_numpy().astype(float).flatten()
+    prediction = int(predict(clf, data.iloc[:1])[0])
+
+    model = build(engine, clf, mapper)
+    explanation = model.explain(x, y=prediction, norm=1)
+    assert model.precheck == Forest.Precheck.TRIVIAL
+    assert model.get_solving_status() == "TRIVIAL"
+    assert np.isclose(model.get_objective_value(), 0.0)
+    assert explanation is not None
+    assert np.allclose(explanation.x, x)
+    incumbents = list(model.explain_iter(x, y=prediction, norm=1))
+    assert len(incumbents) == 1
+    assert np.allclose(incumbents[0].explanation.x, x)
+
+    weights = np.zeros(5, dtype=np.float64)
+    model = build(engine, clf, mapper, weights=weights)
+    with pytest.warns(UserWarning, match="cannot be reached"):
+        explanation = model.explain(x, y=n_classes - 1, norm=1)
+    assert explanation is None
+    assert model.get_solving_status() == "UNREACHABLE"
+    with pytest.warns(UserWarning, match="cannot be reached"):
+        explanations = model.explain(x, y=n_classes - 1, norm=1, k=2)
+    assert explanations == ()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("seed", [42, 43, 44])
+def test_explain_precheck_isolation(engine: str, seed: int) -> None:
+    # A query classified as the target is only answered by itself
+    # when the isolators find it plausible: its anomaly score is
+    # above -0.5 when its mean path length is above the minimum.
+    clf, data, mapper = fit(seed, 2)
+    ilf = IsolationForest(
+        random_state=seed,
+        n_estimators=3,
+        max_samples=8,  # pyright: ignore[reportArgumentType]
+    )
+    ilf.fit(data)
+    scores = np.array(ilf.score_samples(data), dtype=np.float64)
+    predictions = predict(clf, data)
+    model = build(engine, clf, mapper, isolation=ilf)
+
+    i = int(np.argmin(scores))
+    x = data.iloc[i, :].to_numpy().astype(float).flatten()
+    explanation = model.explain(x, y=int(predictions[i]), norm=1)
+    assert model.precheck == Forest.Precheck.PASSED
+    assert model.get_solving_status() == "OPTIMAL"
+    assert model.get_objective_value() > 0.0
+    assert explanation is not None
+    score = np.array(
+        ilf.score_samples(explanation.x.reshape(1, -1)), dtype=np.float64
+    )
+    assert score[0] >= -0.5 - 1e-6
+    model.cleanup()
+
+    i = int(np.argmax(scores))
+    x = data.iloc[i, :].to_numpy().astype(float).flatten()
+    _ = model.explain(x, y=int(predictions[i]), norm=1)
+    assert model.precheck == Forest.Precheck.TRIVIAL
+
+
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize(
+    ("norm", "l2_type"),
+    [
+        (2, MixedIntegerProgramExplainer.L2Type.QUADRATIC),
+        (2, MixedIntegerProgramExplainer.L2Type.PIECEWISE_LINEAR),
+        (np.inf, MixedIntegerProgramExplainer.L2Type.PIECEWISE_LINEAR),
+    ],
+)
+def test_explain_norm_engines(
+    seed: int,
+    n_classes: int,
+    norm: float,
+    l2_type: MixedIntegerProgramExplainer.L2Type,
+) -> None:
+    # With a small margin at the splits of the MIP, both engines
+    # find the distance to the closest counterfactual: the squared
+    # distance for L2, and the maximum distance for L-infinity.
+    clf, data, mapper = fit(seed, n_classes)
+    i = int(np.flatnonzero(predict(clf, data) != 0)[0])
+    x = data.iloc[i, :].to_numpy().astype(float).flatten()
+
+    cp_model = ConstraintProgrammingExplainer(clf, mapper=mapper)
+    explanation = cp_model.explain(x, y=0, norm=norm)
+    assert cp_model.get_solving_status() == "OPTIMAL"
+    assert explanation is not None
+    assert predict(clf, explanation.x)[0] == 0
+
+    try:
+        mip_model = MixedIntegerProgramExplainer(
+            clf,
+            mapper=mapper,
+            env=ENV,
+            num_epsilon=1e-4,
+            l2_type=l2_type,
+        )
+        mip_explanation = mip_model.explain(x, y=0, norm=norm)
+    except gp.GurobiError as e:
+        pytest.skip(f"Skipping test due to {e}")
+    assert mip_model.get_solving_status() == "OPTIMAL"
+    assert mip_explanation is not None
+    assert predict(clf, mip_explanation.x)[0] == 0
+    if l2_type == MixedIntegerProgramExplainer.L2Type.PIECEWISE_LINEAR:
+        assert not mip_model.IsQP
+
+    assert np.isclose(
+        cp_model.get_objective_value(),
+        mip_model.get_objective_value(),
+        rtol=1e-3,
+        atol=1e-3,
+    )
@@ -0,0 +1,136 @@
+from dataclasses import asdict
+
+import gurobipy as gp
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+
+from ocean import (
+    ConstraintProgrammingExplainer,
+    Footprint,
+    MixedIntegerProgramExplainer,
+)
+from ocean.mip import TreeVar
+
+from .utils import ENV, generate_data
+
+GROUPS = ("estimators", "isolators", "features", "query")
+
+
+@pytest.mark.parametrize("seed", [42, 43])
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize("isolation", [False, True])
+@pytest.mark.parametrize(
+    "flow_type",
+    [TreeVar.FlowType.CONTINUOUS, TreeVar.FlowType.BINARY],
+)
+def test_footprint_mip(
+    seed: int,
+    n_classes: int,
+    *,
+    isolation: bool,
+    flow_type: TreeVar.FlowType,
+) -> None:
+    data, y, mapper = generate_data(seed, 200, n_classes)
+    clf = RandomForestClassifier(random_state=seed, n_estimators=5, max_depth=4)
+    clf.fit(data, y)
+    iso = None
+    if isolation:
+        iso = IsolationForest(
+            random_state=seed,
+            n_estimators=3,
+            max_samples=32,  # pyright: ignore[reportArgumentType]
+        )
+        iso.fit(data)
+    estimate = MixedIntegerProgramExplainer.estimate_footprint(
+        clf,
+        mapper=mapper,
+        isolation=iso,
+        flow_type=flow_type,
+    )
+    try:
+        explainer = MixedIntegerProgramExplainer(
+            clf,
+            mapper=mapper,
+            isolation=iso,
+            env=ENV,
+            flow_type=flow_type,
+        )
+        before = explainer.measure()
+        footprint = explainer.footprint()
+    except gp.GurobiError as e:
+        pytest.skip(f"Skipping test due to {e}")
+
+    assert explainer.measure() == before
+    assert_footprint(footprint, estimate, before, isolation=isolation)
+
+
+@pytest.mark.parametrize("seed", [42, 43])
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize("isolation", [False, True])
+def test_footprint_cp(seed: int, n_classes: int, *, isolation: bool) -> None:
+    data, y, mapper = generate_data(seed, 200, n_classes)
+    clf = RandomForestClassifier(random_state=seed, n_estimators=5, max_depth=4)
+    clf.fit(data, y)
+    iso = None
+    if isolation:
+        iso = IsolationForest(
+            random_state=seed,
+            n_estimators=3,
+            max_samples=32,  # pyright: ignore[reportArgumentType]
+        )
+        iso.fit(data)
+    estimate = ConstraintProgrammingExplainer.estimate_footprint(
+        clf,
+        mapper=mapper,
+        isolation=iso,
+    )
+    explainer = ConstraintProgrammingExplainer(
+        clf,
+        mapper=mapper,
+        isolation=iso,
+    )
+    before = explainer.measure()
+    footprint = explainer.footprint()
+    assert_footprint(footprint, estimate, before, isolation=isolation)
+
+
+def assert_footprint(
+    footprint: Footprint,
+    estimate: Footprint,
+    measure: tuple[int, int, int],
+    *,
+    isolation: bool,
+) -> None:
+    for group in GROUPS:
+        assert asdict(getattr(footprint, group)) == asdict(
+            getattr(estimate, group)
+        )
+    build = footprint.estimators + footprint.isolators + footprint.features
+    assert (build.n_vars, build.n_constrs, build.n_nonzeros) == measure
+    assert (footprint.isolators.n_constrs > 0) == isolation
+    assert footprint.query.n_constrs > 0
+    assert footprint.total.n_bytes > 0
+    assert set(footprint.to_dict()) == {*GROUPS, "total"}
+
+
+@pytest.mark.parametrize("engine", ["mip", "cp"])
+def test_footprint_during_query(engine: str) -> None:
+    data, y, mapper = generate_data(42, 200, 2)
+    clf = RandomForestClassifier(random_state=42, n_estimators=5, max_depth=3)
+    clf.fit(data, y)
+    try:
+        explainer = (
+            MixedIntegerProgramExplainer(clf, mapper=mapper, env=ENV)
+            if engine == "mip"
+            else ConstraintProgrammingExplainer(clf, mapper=mapper)
+        )
+        x = data.iloc[0, :].to_numpy().astype(float).flatten()
+        p = int(np.array(clf.predict(data.iloc[:1]), dtype=np.int64)[0])
+        _ = explainer.explain(x, y=1 - p, norm=1)
+    except gp.GurobiError as e:
+        pytest.skip(f"Skipping test due to {e}")
+    with pytest.raises(ValueError, match="during a query"):
+        _ = explainer.footprint()
+    explainer.cleanup()
+    assert explainer.footprint().query.n_constrs > 0
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Any
+
+import numpy as np
+import pytest
+from ortools.sat.python import cp_model as cp
+from sklearn.ensemble import RandomForestClassifier
+
+from ocean import ConstraintProgrammingExplainer, ExplanationServer
+from ocean.abc import Mapper
+from ocean.feature import Feature
+from ocean.typing import Array1D, BaseExplanation, NonNegativeInt, Norm
+
+from .utils import generate_data
+
+type Query = dict[str, object]
+type Response = tuple[int, dict[str, Any]]
+
+
+async def request(
+    port: int,
+    method: str,
+    path: str,
+    payload: Query | None = None,
+) -> Response:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else json.dumps(payload).encode()
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+    head += f"Content-Length: {len(body)}\r\n\r\n"
+    writer.write(head.encode() + body)
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    status, _, content = data.partition(b"\r\n\r\n")
+    return int(status.split()[1]), json.loads(content)
+
+
+class BlockingExplainer(ConstraintProgrammingExplainer):
+    # Holds each solve until it is released by the test.
+    released: threading.Event
+
+    def explain(  # type: ignore[override]
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        max_time: int = 60,
+    ) -> BaseExplanation | None:
+        _ = self.released.wait()
+        return super().explain(x, y=y, norm=norm, max_time=max_time)
+
+
+class SlowExplainer(ConstraintProgrammingExplainer):
+    # Takes a fixed time per solve and records the solves.
+    delay: float
+    n_solved: int
+
+    def explain(  # type: ignore[override]
+        self,
+        x: Array1D,
+        *,
+        y: NonNegativeInt,
+        norm: Norm,
+        max_time: int = 60,
+    ) -> BaseExplanation | None:
+        time.sleep(self.delay)
+        self.n_solved += 1
+        return super().explain(x, y=y, norm=norm, max_time=max_time)
+
+
+def fit(
+    n_estimators: int = 5,
+) -> tuple[RandomForestClassifier, Mapper[Feature], list[Query]]:
+    data, y, mapper = generate_data(42, 200, 2)
+    clf = RandomForestClassifier(
+        random_state=42,
+        n_estimators=n_estimators,
+        max_depth=3,
+    )
+    clf.fit(data, y)
+    predictions = np.array(clf.predict(data.iloc[:6]), dtype=np.int64)
+    queries: list[Query] = [
+        {"x": data.iloc[i, :].to_numpy().astype(float).tolist(), "y": 1 - p}
+        for i, p in enumerate(map(int, predictions))
+    ]
+    return clf, mapper, queries
+
+
+@pytest.mark.parametrize("n_explainers", [1, 2])
+def test_server_explain(n_explainers: int) -> None:
+    clf, mapper, queries = fit()
+    explainers = [
+        ConstraintProgrammingExplainer(
+            clf,
+            mapper=mapper,
+            solver=cp.CpSolver(),
+        )
+        for _ in range(n_explainers)
+    ]
+
+    async def main() -> tuple[list[Response], Response]:
+        async with ExplanationServer(explainers, max_claim=4) as server:
+            responses = await asyncio.gather(
+                *(
+                    request(server.port, "POST", "/explain", query)
+                    for query in queries
+                )
+            )
+            metrics = await request(server.port, "GET", "/metrics")
+        return responses, metrics
+
+    responses, (status, metrics) = asyncio.run(main())
+    for query, (code, result) in zip(queries, responses, strict=True):
+        assert code == 200
+        assert result["status"] == "OPTIMAL"
+        x = np.asarray(result["counterfactual"]).reshape(1, -1)
+        prediction = np.array(clf.predict(x), dtype=np.int64)
+        assert int(prediction[0]) == query["y"]
+    assert status == 200
+    assert metrics["n_completed"] == len(queries)
+    assert metrics["n_rejected"] == 0
+    assert 1 <= metrics["n_claims"] <= len(queries)
+    assert set(metrics["latency"]) == {"p50", "p95", "p99"}
+    assert metrics["throughput"] > 0
+
+
+def test_server_backpressure() -> None:
+    clf, mapper, queries = fit()
+    explainer = BlockingExplainer(clf, mapper=mapper, solver=cp.CpSolver())
+    explainer.released = threading.Event()
+
+    async def main() -> list[Response]:
+        server = ExplanationServer([explainer], max_pending=1, max_claim=1)
+        async with server:
+            first = asyncio.create_task(
+                request(server.port, "POST", "/explain", queries[0])
+            )
+            while server.metrics["n_busy"] == 0:  # noqa: ASYNC110
+                await asyncio.sleep(0.01)
+            second = asyncio.create_task(
+                request(server.port, "POST", "/explain", queries[1])
+            )
+            while server.metrics["n_pending"] == 0:  # noqa: ASYNC110
+                await asyncio.sleep(0.01)
+            rejected = await request(
+                server.port, "POST", "/explain", queries[2]
+            )
+            explainer.released.set()
+            return [await first, await second, rejected]
+
+    (first, _), (second, _), (rejected, error) = asyncio.run(main())
+    assert (first, second, rejected) == (200, 200, 503)
+    assert "busy" in str(error["error"])
+
+
+def test_server_dispatch() -> None:
+    # The concurrent requests are spread over the idle explainers
+    # before any of them claims a request.
+    clf, mapper, queries = fit()
+    explainers: list[SlowExplainer] = []
+    for _ in range(4):
+        explainer = SlowExplainer(
+            clf,
+            mapper=mapper,
+            solver=cp.CpSolver(),
+        )
+        explainer.delay = 0.2
+        explainer.n_solved = 0
+        explainers.append(explainer)
+
+    async def main() -> list[Response]:
+        async with ExplanationServer(explainers, max_claim=8) as server:
+            return await asyncio.gather(
+                *(
+                    request(server.port, "POST", "/explain", query)
+                    for query in queries[:4]
+                )
+            )
+
+    start = time.perf_counter()
+    responses = asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    assert all(code == 200 for code, _ in responses)
+    assert [explainer.n_solved for explainer in explainers] == [1, 1, 1, 1]
+    assert elapsed < 0.8
+    for _, result in responses:
+        assert 0.0 <= result["queue_time"] < 0.2
+        assert result["time"] >= 0.2
+
+
+def test_server_errors() -> None:
+    clf, mapper, queries = fit()
+    explainer = ConstraintProgrammingExplainer(
+        clf,
+        mapper=mapper,
+        solver=cp.CpSolver(),
+    )
+
+    async def main() -> list[Response]:
+        async with ExplanationServer([explainer]) as server:
+            expired = {**queries[0], "max_time": 0}
+            invalid = {**queries[0], "y": 5}
+            return [
+                await request(server.port, "POST", "/explain", expired),
+                await request(server.port, "POST", "/explain", invalid),
+                await request(server.port, "POST", "/explain", {"y": 0}),
+                await request(server.port, "GET", "/unknown"),
+                await request(server.port, "GET", "/metrics"),
+            ]
+
+    expired, invalid, missing, unknown, (_, metrics) = asyncio.run(main())
+    assert expired[0] == 504
+    assert invalid[0] == 400
+    assert "class" in str(invalid[1]["error"])
+    assert missing[0] == 400
+    assert unknown[0] == 404
+    assert metrics["n_expired"] == 1
+    assert metrics["n_completed"] == 0
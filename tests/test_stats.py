@@ -0,0 +1,118 @@
+import json
+from pathlib import Path
+
+import gurobipy as gp
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from ocean import (
+    ConstraintProgrammingExplainer,
+    MixedIntegerProgramExplainer,
+    Stats,
+)
+from ocean.typing import Array1D
+
+from .utils import ENV, generate_data
+
+Explainer = MixedIntegerProgramExplainer | ConstraintProgrammingExplainer
+
+BUILD_STAGES = {"parse", "features", "trees", "builder", "isolation"}
+QUERY_STAGES = {"precheck", "setup", "solve", "extract"}
+
+
+def explainer_factory(
+    engine: str,
+    seed: int,
+    stats: Stats | None,
+) -> tuple[Explainer, list[tuple[Array1D, int]]]:
+    data, y, mapper = generate_data(seed, 200, 2)
+    clf = RandomForestClassifier(
+        random_state=seed,
+        n_estimators=5,
+        max_depth=3,
+    )
+    clf.fit(data, y)
+    explainer: Explainer = (
+        MixedIntegerProgramExplainer(clf, mapper=mapper, env=ENV, stats=stats)
+        if engine == "mip"
+        else ConstraintProgrammingExplainer(clf, mapper=mapper, stats=stats)
+    )
+    predictions = np.array(clf.predict(data.iloc[:3]), dtype=np.int64)
+    queries = [
+        (data.iloc[i, :].to_numpy().astype(float).flatten(), int(p))
+        for i, p in enumerate(predictions)
+    ]
+    return explainer, queries
+
+
+@pytest.mark.parametrize("seed", [42, 43])
+@pytest.mark.parametrize("engine", ["mip", "cp"])
+def test_stats(seed: int, engine: str, tmp_path: Path) -> None:
+    records: list[dict[str, object]] = []
+    stats = Stats(callback=records.append)
+    explainer, queries = explainer_factory(engine, seed, stats)
+    assert set(stats.build) >= BUILD_STAGES
+    assert stats.build["trees"].n_vars > 0
+    assert stats.build["builder"].n_constrs > 0
+    assert all(stage.n_calls == 1 for stage in stats.build.values())
+
+    try:
+        for x, p in queries:
+            _ = explainer.explain(x, y=1 - p, norm=1)
+            explainer.cleanup()
+        # A query already classified as the target is trivial.
+        x, p = queries[0]
+        _ = explainer.explain(x, y=p, norm=1)
+        explainer.cleanup()
+    except gp.GurobiError as e:
+        pytest.skip(f"Skipping test due to {e}")
+
+    assert len(stats.queries) == len(records) == len(queries) + 1
+    for record in stats.queries[:-1]:
+        assert record["status"] == "OPTIMAL"
+        assert set(record["stages"]) == QUERY_STAGES
+        assert record["stages"]["setup"]["n_nonzeros"] > 0
+        assert record["solver"]["runtime"] >= 0
+    assert stats.last is not None
+    assert stats.last["status"] == "TRIVIAL"
+    assert set(stats.last["stages"]) == {"precheck"}
+    assert stats.last["solver"] == {}
+
+    path = tmp_path / "stats.jsonl"
+    stats.dump(path)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == len(queries) + 2
+    assert set(json.loads(lines[0])["build"]) == set(stats.build)
+    assert json.loads(lines[-1]) == stats.last
+
+
+@pytest.mark.parametrize("engine", ["mip", "cp"])
+def test_stats_disabled(engine: str) -> None:
+    explainer, queries = explainer_factory(engine, 42, None)
+    stats = explainer.stats
+    assert not stats.enabled
+    assert stats.build == {}
+
+    x, p = queries[0]
+    for enabled in (False, True):
+        if enabled:
+            stats.enable()
+        try:
+            _ = explainer.explain(x, y=1 - p, norm=1)
+        except gp.GurobiError as e:
+            pytest.skip(f"Skipping test due to {e}")
+        explainer.cleanup()
+        assert len(stats.queries) == int(enabled)
+    assert stats.build == {}
+
+
+def test_stats_error() -> None:
+    stats = Stats()
+    explainer, queries = explainer_factory("cp", 42, stats)
+    x, _ = queries[0]
+    with pytest.raises(ValueError, match="class"):
+        _ = explainer.explain(x, y=5, norm=1)
+    assert stats.last is not None
+    assert stats.last["status"] == "ERROR"
+    assert "class" in stats.last["error"]
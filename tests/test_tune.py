@@ -0,0 +1,121 @@
+import pickle  # noqa: S403
+from pathlib import Path
+
+import numpy as np
+import pytest
+from ortools.sat.python import cp_model as cp
+from sklearn.ensemble import RandomForestClassifier
+
+from ocean import (
+    ConstraintProgrammingExplainer,
+    MixedIntegerProgramExplainer,
+    Profile,
+    tune,
+)
+from ocean.abc import Mapper
+from ocean.cli import Artifact, main
+from ocean.feature import Feature
+from ocean.typing import Array1D
+
+from .utils import ENV, generate_data
+
+N_QUERIES = 3
+
+
+type Query = tuple[Array1D, int]
+
+
+def fit() -> tuple[RandomForestClassifier, Mapper[Feature], list[Query]]:
+    data, y, mapper = generate_data(42, 200, 2)
+    clf = RandomForestClassifier(random_state=42, n_estimators=5, max_depth=3)
+    clf.fit(data, y)
+    x = data.iloc[:N_QUERIES].to_numpy().astype(float)
+    predictions = np.array(clf.predict(data.iloc[:N_QUERIES]), dtype=np.int64)
+    targets = 1 - predictions
+    return clf, mapper, list(zip(x, map(int, targets), strict=True))
+
+
+def test_tune(tmp_path: Path) -> None:
+    clf, mapper, queries = fit()
+    explainer = ConstraintProgrammingExplainer(
+        clf,
+        mapper=mapper,
+        solver=cp.CpSolver(),
+    )
+    candidates = [{}, {"num_workers": 1}, {"linearization_level": 0}]
+    path = tmp_path / "profile.json"
+    profile = tune(
+        explainer,
+        queries,
+        max_time=5,
+        candidates=candidates,
+        path=path,
+    )
+    assert profile.engine == "cp"
+    assert profile.params in candidates
+    assert profile.n_queries == N_QUERIES
+    assert 0.0 < profile.median <= profile.tail
+    assert explainer.profile == profile
+    assert Profile.load(path) == profile
+
+    msg = r"At least one sample query is required."
+    with pytest.raises(ValueError, match=msg):
+        tune(explainer, [])
+
+
+def test_profile_cp() -> None:
+    clf, mapper, queries = fit()
+    explainer = ConstraintProgrammingExplainer(
+        clf,
+        mapper=mapper,
+        solver=cp.CpSolver(),
+    )
+    x, y = queries[0]
+    explainer.profile = Profile("cp", {"num_workers": 1, "symmetry_level": 0})
+    _ = explainer.explain(x, y=y, norm=1)
+    explainer.cleanup()
+    assert explainer.solver.parameters.num_workers == 1
+    assert explainer.solver.parameters.symmetry_level == 0
+    explainer.profile = Profile("cp", {"num_workers": 2})
+    _ = explainer.explain(x, y=y, norm=1)
+    explainer.cleanup()
+    assert explainer.solver.parameters.num_workers == 2
+    assert explainer.solver.parameters.symmetry_level == 2
+
+    msg = r"Expected a profile of the cp engine, got mip."
+    with pytest.raises(ValueError, match=msg):
+        explainer.profile = Profile("mip", {"MIPFocus": 1})
+
+
+def test_profile_mip() -> None:
+    clf, mapper, queries = fit()
+    explainer = MixedIntegerProgramExplainer(clf, mapper=mapper, env=ENV)
+    x, y = queries[0]
+    explainer.profile = Profile("mip", {"MIPFocus": 2, "Cuts": 0})
+    _ = explainer.explain(x, y=y, norm=1)
+    explainer.cleanup()
+    assert explainer.Params.MIPFocus == 2
+    assert explainer.Params.Cuts == 0
+    explainer.profile = None
+    _ = explainer.explain(x, y=y, norm=1)
+    explainer.cleanup()
+    assert explainer.Params.MIPFocus == 0
+    assert explainer.Params.Cuts == -1
+
+
+def test_cli_tune(tmp_path: Path) -> None:
+    data, y, mapper = generate_data(42, 200, 2)
+    clf = RandomForestClassifier(random_state=42, n_estimators=5, max_depth=3)
+    clf.fit(data, y)
+    model = tmp_path / "model.pkl"
+    _ = model.write_bytes(pickle.dumps({"ensemble": clf, "mapper": mapper}))
+    path = tmp_path / "queries.csv"
+    data.iloc[:10].to_csv(path, index=False)
+    argv = ["tune", str(model), str(path), "--engine", "cp", "--queries", "2"]
+    assert main(argv) == 0
+    profile = Profile.load(tmp_path / "model.pkl.cp.profile.json")
+    assert profile.n_queries == 2
+    assert profile.params in ConstraintProgrammingExplainer.PROFILES
+    artifact = Artifact.load(model)
+    assert artifact.profiles == {"cp": profile}
+    assert artifact.build("cp").profile == profile
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+
+from ocean.tree import Forest, parse_trees
+
+from ..utils import generate_data
+
+
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("n_estimators", [1, 5, 20])
+@pytest.mark.parametrize("max_depth", [2, 4, 8])
+@pytest.mark.parametrize("n_classes", [2, 3, 4])
+def test_forest_apply(
+    seed: int,
+    n_estimators: int,
+    max_depth: int,
+    n_classes: int,
+) -> None:
+    data, y, mapper = generate_data(seed, 200, n_classes)
+    clf = RandomForestClassifier(
+        random_state=seed,
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+    )
+    clf.fit(data, y)
+    forest = Forest(parse_trees(clf, mapper=mapper), mapper=mapper)
+    X = data.to_numpy().astype(float)
+    leaves = clf.apply(data)
+    predictions = np.array(clf.predict(data), dtype=np.int64)
+    for i in range(X.shape[0]):
+        assert (forest.apply(X[i]) == leaves[i]).all()
+        scores = forest.scores(X[i])
+        assert int(np.argmax(scores[0])) == int(predictions[i])
+
+
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("n_classes", [2, 3, 4])
+def test_forest_precheck(seed: int, n_classes: int) -> None:
+    data, y, mapper = generate_data(seed, 200, n_classes)
+    clf = RandomForestClassifier(
+        random_state=seed,
+        n_estimators=5,
+        max_depth=3,
+    )
+    clf.fit(data, y)
+    forest = Forest(parse_trees(clf, mapper=mapper), mapper=mapper)
+    X = data.to_numpy().astype(float)
+    predictions = np.array(clf.predict(data), dtype=np.int64)
+    for i in range(10):
+        prediction = int(predictions[i])
+        precheck = forest.precheck(X[i], prediction, epsilon=1e-4)
+        assert precheck in {Forest.Precheck.TRIVIAL, Forest.Precheck.PASSED}
+        for class_ in range(n_classes):
+            if class_ == prediction:
+                continue
+            precheck = forest.precheck(X[i], class_, epsilon=1e-4)
+            assert precheck != Forest.Precheck.TRIVIAL
+
+
+def test_forest_precheck_unreachable() -> None:
+    data, y, mapper = generate_data(42, 200, 2)
+    clf = RandomForestClassifier(random_state=42, n_estimators=5, max_depth=3)
+    clf.fit(data, y)
+    trees = parse_trees(clf, mapper=mapper)
+    forest = Forest(trees, mapper=mapper)
+    x = data.to_numpy().astype(float)[0]
+
+    margins = forest.max_margins(1)
+    assert margins[1] == 0.0
+    weights = np.zeros(len(trees))
+    forest = Forest(trees, mapper=mapper, weights=weights)
+    # All the scores are null: class 0 wins the ties but
+    # class 1 can never beat class 0 by a positive margin.
+    precheck = forest.precheck(x, 0, epsilon=1e-4)
+    assert precheck == Forest.Precheck.PASSED
+    precheck = forest.precheck(x, 1, epsilon=1e-4)
+    assert precheck == Forest.Precheck.UNREACHABLE
+
+    with pytest.raises(ValueError, match="Expected class"):
+        forest.precheck(x, 2, epsilon=1e-4)
+    with pytest.raises(ValueError, match="Expected"):
+        forest.apply(x[:-1])
+
+
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("max_samples", [4, 8, 32])
+def test_forest_length(seed: int, max_samples: int) -> None:
+    data, _, mapper = generate_data(seed, 200, 2)
+    ilf = IsolationForest(
+        random_state=seed,
+        n_estimators=4,
+        max_samples=max_samples,  # pyright: ignore[reportArgumentType]
+    )
+    ilf.fit(data)
+    trees = parse_trees(ilf, mapper=mapper)
+    forest = Forest(trees, mapper=mapper, isolation=True)
+    # The mean path length reproduces the anomaly scores.
+    average = trees[0].root.length
+    X = data.to_numpy().astype(float)
+    for x in X[:10]:
+        depth = forest.length(x) / len(trees)
+        score = -(2 ** (-depth / average))
+        scores = np.array(ilf.score_samples(x.reshape(1, -1)), dtype=np.float64)
+        assert np.isclose(score, scores[0])
+
+    forest = Forest(trees, mapper=mapper)
+    with pytest.raises(ValueError, match="only kept for the isolators"):
+        _ = forest.length(X[0])
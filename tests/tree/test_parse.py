@@ -1,14 +1,28 @@
+import importlib
+from typing import TYPE_CHECKING
+
+import numpy as np
 import pytest
 from pydantic import ValidationError
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
 from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
 
 from ocean.abc import Mapper
 from ocean.feature import Feature
-from ocean.tree import Node, parse_tree
-from ocean.typing import SKLearnTree
+from ocean.tree import (
+    Forest,
+    Node,
+    parse_ensembles,
+    parse_tree,
+    parse_trees,
+)
+from ocean.typing import Array1D, SKLearnTree
 
 from ..utils import generate_data
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 
 def _check_tree(
     root: Node,
@@ -87,3 +101,63 @@ def test_parse_regressor(seed: int, n_samples: int, max_depth: int) -> None:
     assert tree.max_depth == dt.tree_.max_depth  # pyright: ignore[reportAttributeAccessIssue]
     assert tree.shape == (1, 1)
     _check_tree(tree.root, dt.tree_, mapper=mapper)  # pyright: ignore[reportArgumentType, reportUnknownArgumentType]
+
+
+@pytest.mark.parametrize("seed", [42, 43, 44])
+@pytest.mark.parametrize("max_samples", [4, 8, 32])
+def test_parse_isolation(seed: int, max_samples: int) -> None:
+    data, _, mapper = generate_data(seed, 200, 2)
+    ilf = IsolationForest(
+        random_state=seed,
+        n_estimators=4,
+        max_samples=max_samples,  # pyright: ignore[reportArgumentType]
+    )
+    ilf.fit(data)
+    trees = parse_trees(ilf, mapper=mapper)
+    for tree in trees:
+        assert tree.lengths.shape == (len(tree.leaves),)
+        for leaf, length in zip(tree.leaves, tree.lengths, strict=True):
+            assert np.isclose(leaf.length, length)
+
+    # The path lengths of the leaves reproduce the anomaly scores.
+    forest = Forest(trees, mapper=mapper)
+    lengths: list[dict[int, float]] = []
+    for tree in trees:
+        leaves = [leaf.node_id for leaf in tree.leaves]
+        lengths.append(dict(zip(leaves, tree.lengths, strict=True)))
+    # The root holds all the samples drawn by the isolators.
+    average = trees[0].root.length
+    for x in data.to_numpy()[:10]:
+        nodes = forest.apply(x)
+        depth = np.mean([lengths[t][int(n)] for t, n in enumerate(nodes)])
+        score = -(2 ** (-depth / average))
+        scores = np.array(ilf.score_samples(x.reshape(1, -1)), dtype=np.float64)
+        assert np.isclose(score, scores[0])
+
+
+def test_parse_lengths(monkeypatch: pytest.MonkeyPatch) -> None:
+    data, y, mapper = generate_data(42, 200, 2)
+    parse = importlib.import_module("ocean.tree._parse")
+    original: Callable[[Array1D], Array1D] = parse.average_lengths
+    calls: list[int] = []
+
+    def average_lengths(n: Array1D) -> Array1D:
+        calls.append(n.size)
+        return original(n)
+
+    monkeypatch.setattr(parse, "average_lengths", average_lengths)
+    clf = RandomForestClassifier(random_state=42, n_estimators=4)
+    clf.fit(data, y)
+    ilf = IsolationForest(
+        random_state=42,
+        n_estimators=4,
+        max_samples=8,  # pyright: ignore[reportArgumentType]
+    )
+    ilf.fit(data)
+
+    # The lengths are only computed for the isolators, in one pass.
+    _ = parse_ensembles(clf, mapper=mapper)
+    assert calls == []
+    trees = parse_ensembles(clf, ilf, mapper=mapper)
+    n_leaves = sum(len(tree.leaves) for tree in trees[4:])
+    assert calls == [n_leaves]